@@ -0,0 +1,199 @@
+"""
+Single-pass multi-metric aggregation kernel.
+
+aggregate() computes any number of per-group metrics of a trade frame in
+one call. Group keys are turned into integer codes once, every source
+column is read once, and the partial sums it needs (count, sum, sum of
+squares) are shared by all metrics on that column and reduced with
+np.bincount. The result matches DataFrame.groupby(by).agg(**metrics).
+"""
+
+import numpy as np
+import pandas as pd
+
+# Up to this many groups, medians are selected per group rather than sorted
+MEDIAN_SELECT_GROUPS = 4096
+
+AGGREGATIONS = ['size', 'count', 'sum', 'mean', 'std', 'var', 'min', 'max', 'first', 'last', 'median']
+
+
+def group_codes(df, by):
+    """
+    Return (codes, n_groups, index) for the group keys `by` (column names
+    or Series). Codes are 0..n_groups-1 for the observed key combinations
+    in sorted order, and n_groups for rows with a missing key.
+    """
+    keys = [by] if isinstance(by, (str, pd.Series)) else list(by)
+    keys = [df[key] if isinstance(key, str) else key for key in keys]
+
+    combined = None
+    missing = None
+    levels = []
+    for key in keys:
+        if isinstance(key.dtype, pd.CategoricalDtype):
+            codes = key.cat.codes.to_numpy()
+            labels = pd.CategoricalIndex(key.cat.categories, dtype=key.dtype)
+        else:
+            codes, labels = pd.factorize(key, sort=True)
+            labels = pd.Index(labels)
+        if (codes < 0).any():
+            missing = codes < 0 if missing is None else missing | (codes < 0)
+        combined = codes.astype(np.int64) if combined is None else combined * len(labels) + codes
+        levels.append(labels.rename(key.name))
+
+    # Keep the observed combinations only, in key order
+    radix = int(np.prod([len(labels) for labels in levels], dtype=np.float64))
+    if missing is not None:
+        combined[missing] = 0
+    valid = combined if missing is None else combined[~missing]
+    if radix <= 1 << 24:
+        observed = np.flatnonzero(np.bincount(valid, minlength=radix))
+        remap = np.zeros(radix, dtype=np.int64)
+        remap[observed] = np.arange(len(observed))
+        codes = remap[combined]
+    else:
+        observed = np.unique(valid)
+        codes = np.searchsorted(observed, combined)
+    n_groups = len(observed)
+    if missing is not None:
+        codes[missing] = n_groups
+
+    arrays = []
+    for labels in reversed(levels):
+        arrays.append(labels.take(observed % len(labels)))
+        observed = observed // len(labels)
+    arrays.reverse()
+    index = arrays[0] if len(arrays) == 1 else pd.MultiIndex.from_arrays(arrays)
+    return codes, n_groups, index
+
+
+class _ColumnStats:
+    """Per-group partial results of one column, computed on first request"""
+
+    def __init__(self, series, codes, n_groups):
+        self.series = series
+        self.codes = codes
+        self.n_groups = n_groups
+        self.cache = {}
+
+    def _bincount(self, weights=None):
+        # The extra bucket n_groups collects rows with a missing key
+        return np.bincount(self.codes, weights=weights, minlength=self.n_groups + 1)[:-1]
+
+    def get(self, name):
+        if name not in self.cache:
+            self.cache[name] = getattr(self, '_' + name)()
+        return self.cache[name]
+
+    def _values(self):
+        return self.series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+    def _valid(self):
+        return ~np.isnan(self.get('values'))
+
+    def _filled(self):
+        # Values with NaN replaced by 0, so they drop out of sums
+        values, valid = self.get('values'), self.get('valid')
+        return values if valid.all() else np.where(valid, values, 0.0)
+
+    def _size(self):
+        return self._bincount().astype(np.int64)
+
+    def _count(self):
+        if pd.api.types.is_numeric_dtype(self.series) or pd.api.types.is_bool_dtype(self.series):
+            valid = self.get('valid')
+            return self.get('size') if valid.all() else self._bincount(valid).astype(np.int64)
+        return self._bincount(self.series.notna().to_numpy()).astype(np.int64)
+
+    def _sum(self):
+        return self._bincount(self.get('filled'))
+
+    def _sumsq(self):
+        filled = self.get('filled')
+        return self._bincount(filled * filled)
+
+    def _mean(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.get('sum') / self.get('count')
+
+    def _var(self):
+        count, total = self.get('count'), self.get('sum')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            squares = np.maximum(self.get('sumsq') - total * total / count, 0)
+            return np.where(count > 1, squares / (count - 1), np.nan)
+
+    def _std(self):
+        return np.sqrt(self.get('var'))
+
+    def _extreme(self, ufunc, empty):
+        result = np.full(self.n_groups + 1, empty)
+        ufunc.at(result, self.codes, self.get('values'))
+        return np.where(np.isinf(result[:-1]) & (self.get('count') == 0), np.nan, result[:-1])
+
+    def _min(self):
+        return self._extreme(np.fmin, np.inf)
+
+    def _max(self):
+        return self._extreme(np.fmax, -np.inf)
+
+    def _position(self, ufunc, empty):
+        # Row of the first / last non-null value of each group
+        valid = self.get('valid')
+        rows = np.full(self.n_groups + 1, empty)
+        ufunc.at(rows, self.codes[valid], np.flatnonzero(valid))
+        rows = rows[:-1]
+        found = self.get('count') > 0
+        return np.where(found, self.get('values')[np.where(found, rows, 0)], np.nan)
+
+    def _first(self):
+        return self._position(np.minimum, len(self.codes))
+
+    def _last(self):
+        return self._position(np.maximum, -1)
+
+    def _median(self):
+        valid = self.get('valid') & (self.codes < self.n_groups)
+        values, codes = self.get('values')[valid], self.codes[valid]
+        count = self.get('count')
+        bounds = np.append(0, np.cumsum(count))
+        if self.n_groups < np.iinfo(np.int16).max:
+            # Stable sort of int16 codes is a radix sort
+            codes = codes.astype(np.int16)
+        values = values[np.argsort(codes, kind='stable')]
+
+        if self.n_groups <= MEDIAN_SELECT_GROUPS:
+            # Few groups: a linear-time selection within each group
+            return np.array([
+                np.median(values[start:stop]) if stop > start else np.nan
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ])
+
+        # Many groups: sort values within groups once and pick the middle
+        values = values[np.lexsort((values, np.repeat(np.arange(self.n_groups), count)))]
+        found = count > 0
+        lower = np.where(found, bounds[:-1] + (count - 1) // 2, 0)
+        upper = np.where(found, bounds[:-1] + count // 2, 0)
+        if len(values) == 0:
+            return np.full(self.n_groups, np.nan)
+        return np.where(found, (values[lower] + values[upper]) / 2, np.nan)
+
+
+def aggregate(df, by, metrics):
+    """
+    Compute `metrics` ({output_name: (column, aggregation)}) per group of
+    `by` in one pass, like df.groupby(by).agg(**metrics) with observed
+    groups only. Aggregations: size, count, sum, mean, std, var, min, max,
+    first, last and median.
+    """
+    for column, aggregation in metrics.values():
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f"Unsupported aggregation: {aggregation}")
+
+    codes, n_groups, index = group_codes(df, by)
+    columns = {}
+    result = {}
+    for name, (column, aggregation) in metrics.items():
+        if column not in columns:
+            columns[column] = _ColumnStats(df[column], codes, n_groups)
+        result[name] = columns[column].get(aggregation)
+    return pd.DataFrame(result, index=index)
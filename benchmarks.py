@@ -0,0 +1,1012 @@
+"""
+Performance benchmarks for the dashboard's data pipeline and analytics.
+
+Runs each benchmark on synthetic trade data shaped like the merged dataset
+and compares the current implementation against the code it replaced.
+
+Usage:
+    python benchmarks.py features
+    python benchmarks.py features --rows 1000000 10000000
+    python benchmarks.py memory
+    python benchmarks.py sessions
+    python benchmarks.py filters
+    python benchmarks.py cube
+    python benchmarks.py kernel
+    python benchmarks.py streaks
+    python benchmarks.py drawdowns
+    python benchmarks.py rolling --rows 1000 10000
+    python benchmarks.py significance
+    python benchmarks.py ranks
+    python benchmarks.py posthoc
+    python benchmarks.py bootstrap
+    python benchmarks.py permutation
+    python benchmarks.py tail_risk
+    python benchmarks.py equity
+    python benchmarks.py downsample --rows 100000 1000000
+    python benchmarks.py boxes
+    python benchmarks.py histograms
+    python benchmarks.py figures
+"""
+
+import argparse
+import pickle
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from scipy import stats
+
+from aggregation import aggregate
+from bootstrap import bootstrap_ci
+from box_summary import box_summaries
+from data_pipeline import DatasetHandle
+from downsample import MAX_POINTS, downsample
+from drawdowns import find_drawdowns
+from equity_sim import simulate_equity
+from figure_cache import FigureCache, fingerprint
+from filter_index import BitmapIndex, DayIndex, bitmap_from_range
+from histograms import histograms
+from permutation import permutation_test
+from posthoc import posthoc_table
+from rolling_stats import MAX_WINDOW, RollingStats
+from sentiment_cube import SentimentCube
+from significance import RankTests, chi_square_independence, one_way_anova, profitability_table
+from streaks import find_streaks
+from tail_risk import PATHS_PER_TASK, monte_carlo_var, tail_risk
+from trade_features import SENTIMENT_ORDER, add_trade_features
+from trade_schema import apply_schema, memory_report
+
+
+def make_synthetic_trades(n_rows, seed=42, daily_sentiment=False):
+    """
+    Build a merged-like trade frame with `n_rows` random trades. With
+    `daily_sentiment`, all trades of a day share one index reading, as
+    they do after the real sentiment join.
+    """
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2023-05-01').value // 10**9
+    end = pd.Timestamp('2025-05-01').value // 10**9
+    timestamps = pd.to_datetime(np.sort(rng.integers(start, end, n_rows)), unit='s')
+    size_usd = rng.lognormal(6, 1.5, n_rows)
+    fee = size_usd * 0.00035
+    closed_pnl = np.where(rng.random(n_rows) < 0.5, 0.0, rng.normal(0, 1, n_rows) * size_usd * 0.05)
+    value = rng.integers(5, 95, n_rows).astype(np.float64)
+    classification = rng.choice(SENTIMENT_ORDER, n_rows)
+    if daily_sentiment:
+        day = (timestamps.normalize() - timestamps[0].normalize()).days.to_numpy()
+        value, classification = value[day], classification[day]
+
+    return pd.DataFrame({
+        'Account': rng.choice([f'0x{i:040x}' for i in range(32)], n_rows),
+        'Coin': rng.choice(['BTC', 'ETH', 'SOL', 'HYPE', 'DOGE', '@107'], n_rows),
+        'Size USD': size_usd,
+        'Side': rng.choice(['BUY', 'SELL'], n_rows),
+        'Direction': rng.choice(['Open Long', 'Close Long', 'Open Short', 'Close Short'], n_rows),
+        'Timestamp IST': timestamps,
+        'Closed PnL': closed_pnl,
+        'Fee': fee,
+        'Date': timestamps.normalize(),
+        'value': value,
+        'classification': classification,
+    })
+
+
+def time_call(func, *args, repeat=1):
+    """Return (best wall time in seconds, last result) over `repeat` runs"""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+# =============================================================================
+# FEATURE ENGINEERING
+# =============================================================================
+
+def legacy_trade_features(merged_df):
+    """Row-wise feature engineering as load_data() did it before trade_features"""
+    merged_df['Net_PnL'] = merged_df['Closed PnL'] - merged_df['Fee']
+    merged_df['is_profitable'] = merged_df['Net_PnL'] > 0
+    merged_df['Hour'] = merged_df['Timestamp IST'].dt.hour
+    merged_df['DayOfWeek'] = merged_df['Timestamp IST'].dt.dayofweek
+    merged_df['Month'] = merged_df['Timestamp IST'].dt.month
+    merged_df['Week'] = merged_df['Timestamp IST'].dt.isocalendar().week
+
+    def categorize_sentiment(classification):
+        sentiment_map = {
+            'Extreme Fear': 'Extreme Fear',
+            'Fear': 'Fear',
+            'Neutral': 'Neutral',
+            'Greed': 'Greed',
+            'Extreme Greed': 'Extreme Greed'
+        }
+        return sentiment_map.get(classification, 'Neutral')
+
+    merged_df['sentiment_category'] = merged_df['classification'].apply(categorize_sentiment)
+    merged_df['PnL_Percentage'] = (merged_df['Net_PnL'] / merged_df['Size USD']) * 100
+    merged_df['Fee_Ratio'] = (merged_df['Fee'] / merged_df['Size USD']) * 100
+
+    sentiment_score_map = {
+        'Extreme Fear': 1,
+        'Fear': 2,
+        'Neutral': 3,
+        'Greed': 4,
+        'Extreme Greed': 5
+    }
+    merged_df['sentiment_score'] = merged_df['sentiment_category'].map(sentiment_score_map)
+
+    def get_trading_session(hour):
+        if 0 <= hour < 8:
+            return 'Asian'
+        elif 8 <= hour < 16:
+            return 'European'
+        else:
+            return 'American'
+
+    merged_df['Trading_Session'] = merged_df['Hour'].apply(get_trading_session)
+    merged_df['Win_Loss_Magnitude'] = merged_df['Net_PnL'].abs()
+    return merged_df
+
+
+def bench_features(rows):
+    """Compare row-wise .apply feature engineering with trade_features"""
+    print(f"{'Rows':>12} {'Row-wise (s)':>14} {'Vectorized (s)':>16} {'Speedup':>9}")
+    for n_rows in rows:
+        trades = make_synthetic_trades(n_rows)
+        legacy_time, legacy = time_call(legacy_trade_features, trades.copy())
+        vector_time, vector = time_call(add_trade_features, trades.copy())
+
+        # Both implementations must agree before their timings mean anything
+        for column in ['sentiment_category', 'Trading_Session']:
+            assert (legacy[column].to_numpy() == vector[column].astype(str).to_numpy()).all()
+        assert (legacy['sentiment_score'].to_numpy() == vector['sentiment_score']).all()
+
+        print(f"{n_rows:>12,} {legacy_time:>14.3f} {vector_time:>16.3f} "
+              f"{legacy_time / vector_time:>8.1f}x")
+
+
+# =============================================================================
+# MEMORY FOOTPRINT
+# =============================================================================
+
+def bench_memory(rows):
+    """Report merged_df memory with the previous dtypes and with trade_schema"""
+    for n_rows in rows:
+        legacy = legacy_trade_features(make_synthetic_trades(n_rows))
+        typed = apply_schema(add_trade_features(make_synthetic_trades(n_rows)))
+        compact = apply_schema(add_trade_features(make_synthetic_trades(n_rows)), float32_ratios=True)
+
+        report = memory_report(legacy, typed)
+        print(f"\n{n_rows:,} rows")
+        print(report.round(2).to_string())
+
+        legacy_mb = report.loc['TOTAL', 'Before_MB']
+        compact_mb = compact.memory_usage(deep=True, index=False).sum() / 1024**2
+        print(f"\nWith float32 ratios: {compact_mb:,.2f} MB "
+              f"({100 * (1 - compact_mb / legacy_mb):.1f}% below the previous dtypes)")
+
+
+# =============================================================================
+# SHARED DATASET HANDLE
+# =============================================================================
+
+def pickle_rerun(fear_greed_df, merged_df):
+    """What st.cache_data does on every rerun: unpickle a fresh copy"""
+    return pickle.loads(pickle.dumps((fear_greed_df, merged_df), protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def session_memory(func, *args):
+    """Return (MB newly allocated by one call, result) while the result is alive"""
+    tracemalloc.start()
+    result = func(*args)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return allocated / 1024**2, result
+
+
+def bench_sessions(rows):
+    """Compare per-rerun cost of st.cache_data copies with DatasetHandle views"""
+    print(f"{'Rows':>12} {'Dataset MB':>11} {'Copy (ms)':>10} {'View (ms)':>10} "
+          f"{'Copy MB/session':>16} {'View MB/session':>16}")
+    for n_rows in rows:
+        merged = apply_schema(add_trade_features(make_synthetic_trades(n_rows)))
+        fear_greed = merged[['Date', 'value', 'classification']].drop_duplicates('Date')
+        handle = DatasetHandle(fear_greed, merged, (), [])
+        dataset_mb = merged.memory_usage(deep=True, index=False).sum() / 1024**2
+
+        copy_time, _ = time_call(pickle_rerun, fear_greed, merged, repeat=3)
+        view_time, _ = time_call(handle.views, repeat=3)
+        copy_mb, copies = session_memory(pickle_rerun, fear_greed, merged)
+        view_mb, views = session_memory(handle.views)
+
+        # A session adding a column to its view must not touch the shared frame
+        views[1]['Scratch'] = 0.0
+        views[1].loc[0, 'Net_PnL'] = np.nan
+        assert 'Scratch' not in merged.columns and not np.isnan(merged.loc[0, 'Net_PnL'])
+        del copies, views
+
+        print(f"{n_rows:>12,} {dataset_mb:>11,.1f} {copy_time * 1000:>10.1f} "
+              f"{view_time * 1000:>10.2f} {copy_mb:>16,.1f} {view_mb:>16,.2f}")
+
+
+# =============================================================================
+# SIDEBAR FILTERS
+# =============================================================================
+
+def legacy_filter(merged_df, start_date, end_date, sentiments, sides, pnl_filter):
+    """The sidebar filter block before the bitmap index: one frame per mask"""
+    filtered_df = merged_df[
+        (merged_df['Date'].dt.date >= start_date) &
+        (merged_df['Date'].dt.date <= end_date)
+    ]
+    filtered_df = filtered_df[filtered_df['sentiment_category'].isin(sentiments)]
+    filtered_df = filtered_df[filtered_df['Side'].isin(sides)]
+    if pnl_filter == 'Profitable Only':
+        filtered_df = filtered_df[filtered_df['is_profitable']]
+    return filtered_df
+
+
+def bitmap_filter(filter_index, day_index, merged_df, start_date, end_date, sentiments, sides, pnl_filter):
+    """The sidebar filter block resolved through a BitmapIndex and a DayIndex"""
+    date_rows = bitmap_from_range(*day_index.row_range(start_date, end_date), len(merged_df))
+    pnl_values = [True] if pnl_filter == 'Profitable Only' else [True, False]
+    selected_rows = filter_index.select({
+        'sentiment_category': sentiments,
+        'Side': sides,
+        'is_profitable': pnl_values,
+    }, base=date_rows)
+    return merged_df.take(filter_index.rows(selected_rows))
+
+
+def legacy_day_count(filtered_df):
+    """The sidebar day count before the DayIndex"""
+    return len(filtered_df['Date'].dt.date.unique())
+
+
+def bench_filters(rows):
+    """Compare chained boolean masks with a bitmap selection over a date row range"""
+    start_date = pd.Timestamp('2024-01-01').date()
+    end_date = pd.Timestamp('2024-12-31').date()
+    args = (start_date, end_date, ['Fear', 'Greed', 'Extreme Greed'], ['BUY'], 'Profitable Only')
+
+    print(f"{'Rows':>12} {'Index build (s)':>16} {'Masks (ms)':>11} {'Bitmap (ms)':>12} "
+          f"{'Speedup':>9} {'Day count (ms)':>15} {'Offsets (ms)':>13}")
+    for n_rows in rows:
+        merged = apply_schema(add_trade_features(make_synthetic_trades(n_rows)))
+        start = time.perf_counter()
+        filter_index, day_index = BitmapIndex(merged), DayIndex(merged['Date'])
+        build_time = time.perf_counter() - start
+
+        legacy_time, legacy = time_call(legacy_filter, merged, *args, repeat=3)
+        bitmap_time, selected = time_call(bitmap_filter, filter_index, day_index, merged, *args, repeat=3)
+        assert legacy.index.equals(selected.index)
+
+        positions = selected.index.to_numpy()
+        count_time, legacy_days = time_call(legacy_day_count, legacy, repeat=3)
+        offsets_time, days = time_call(day_index.day_count, positions, repeat=3)
+        assert legacy_days == days
+
+        print(f"{n_rows:>12,} {build_time:>16.3f} {legacy_time * 1000:>11.1f} "
+              f"{bitmap_time * 1000:>12.1f} {legacy_time / bitmap_time:>8.1f}x "
+              f"{count_time * 1000:>15.1f} {offsets_time * 1000:>13.2f}")
+
+
+# =============================================================================
+# SENTIMENT CUBE
+# =============================================================================
+
+def legacy_panels(filtered_df):
+    """The dashboard's per-panel groupbys over the filtered trades"""
+    return [
+        filtered_df.groupby('sentiment_category').agg({
+            'Net_PnL': ['sum', 'mean', 'std', 'min', 'max'],
+            'Size USD': ['sum', 'mean', 'std'],
+            'Fee': 'sum',
+            'is_profitable': 'mean',
+            'Account': 'count'
+        }),
+        filtered_df.groupby('Side').agg({'Net_PnL': ['sum', 'mean', 'std'], 'Fee': 'sum'}),
+        filtered_df.groupby('Hour')['Net_PnL'].sum(),
+        filtered_df.groupby('Date')['Net_PnL'].sum(),
+        filtered_df.pivot_table(values='Net_PnL', index='Trading_Session',
+                                columns='sentiment_category', aggfunc='mean'),
+    ]
+
+
+def cube_panels(cube, start_date, end_date, selections):
+    """The same panels rolled up from the cube"""
+    view = cube.select(start_date, end_date, selections)
+    return [
+        view.rollup('sentiment_category'),
+        view.rollup('Side'),
+        view.rollup('Hour')['Net_PnL_sum'],
+        view.rollup('Date')['Net_PnL_sum'],
+        view.rollup(['Trading_Session', 'sentiment_category'])['Net_PnL_mean'].unstack(),
+    ]
+
+
+def bench_cube(rows):
+    """Compare per-panel groupbys on filtered trades with cube roll-ups"""
+    start_date = pd.Timestamp('2024-01-01').date()
+    end_date = pd.Timestamp('2024-12-31').date()
+    selections = {'sentiment_category': ['Fear', 'Greed', 'Extreme Greed'], 'Side': ['BUY']}
+
+    print(f"{'Rows':>12} {'Cells':>9} {'Cube build (s)':>15} {'Groupbys (ms)':>14} "
+          f"{'Cube (ms)':>10} {'Speedup':>9}")
+    for n_rows in rows:
+        merged = apply_schema(add_trade_features(make_synthetic_trades(n_rows, daily_sentiment=True)))
+        filtered = legacy_filter(merged, start_date, end_date, selections['sentiment_category'],
+                                 selections['Side'], 'All Trades')
+        build_time, cube = time_call(SentimentCube, merged)
+        legacy_time, legacy = time_call(legacy_panels, filtered, repeat=3)
+        cube_time, rolled = time_call(cube_panels, cube, start_date, end_date, selections, repeat=3)
+
+        # Same numbers, whichever way they were computed
+        by_sentiment = legacy[0].reindex(rolled[0].index)
+        assert np.allclose(by_sentiment[('Net_PnL', 'std')], rolled[0]['Net_PnL_std'])
+        assert np.allclose(by_sentiment[('is_profitable', 'mean')], rolled[0]['win_rate'])
+        assert np.allclose(legacy[3], rolled[3])
+
+        print(f"{n_rows:>12,} {cube.n_cells:>9,} {build_time:>15.3f} "
+              f"{legacy_time * 1000:>14.1f} {cube_time * 1000:>10.1f} {legacy_time / cube_time:>8.1f}x")
+
+
+# =============================================================================
+# AGGREGATION KERNEL
+# =============================================================================
+
+def legacy_dashboard(filtered_df):
+    """The Dashboard page's per-chart scans of filtered_df before the cube"""
+    return {
+        'sentiment_dist': filtered_df['sentiment_category'].value_counts(),
+        'pnl_by_sentiment': filtered_df.groupby('sentiment_category')['Net_PnL'].sum(),
+        'performance': filtered_df.groupby('sentiment_category').agg({
+            'Net_PnL': ['sum', 'mean', 'std'],
+            'Size USD': ['sum', 'mean'],
+            'Fee': 'sum',
+            'is_profitable': 'mean',
+            'Account': 'count'
+        }),
+        'win_rate': filtered_df.groupby('sentiment_category')['is_profitable'].mean(),
+        'avg_pnl': filtered_df.groupby('sentiment_category')['Net_PnL'].mean(),
+        'trade_counts': filtered_df['sentiment_category'].value_counts(),
+        'avg_position': filtered_df.groupby('sentiment_category')['Size USD'].mean(),
+    }
+
+
+def kernel_dashboard(filtered_df):
+    """The same Dashboard metrics from a single aggregate() call"""
+    return aggregate(filtered_df, 'sentiment_category', {
+        'Trades': ('Net_PnL', 'size'),
+        'Total_PnL': ('Net_PnL', 'sum'),
+        'Avg_PnL': ('Net_PnL', 'mean'),
+        'Std_PnL': ('Net_PnL', 'std'),
+        'Total_Volume': ('Size USD', 'sum'),
+        'Avg_Trade_Size': ('Size USD', 'mean'),
+        'Total_Fees': ('Fee', 'sum'),
+        'Win_Rate': ('is_profitable', 'mean'),
+        'Trade_Count': ('Account', 'count'),
+    })
+
+
+def bench_kernel(rows):
+    """Compare the Dashboard's per-chart groupbys with one aggregation kernel call"""
+    print(f"{'Rows':>12} {'Per-chart (ms)':>15} {'Kernel (ms)':>12} {'Speedup':>9}")
+    for n_rows in rows:
+        merged = apply_schema(add_trade_features(make_synthetic_trades(n_rows)))
+        legacy_time, legacy = time_call(legacy_dashboard, merged, repeat=3)
+        kernel_time, kernel = time_call(kernel_dashboard, merged, repeat=3)
+
+        performance = legacy['performance'].reindex(kernel.index)
+        assert np.allclose(performance[('Net_PnL', 'std')], kernel['Std_PnL'])
+        assert np.allclose(performance[('is_profitable', 'mean')], kernel['Win_Rate'])
+        assert (legacy['trade_counts'].reindex(kernel.index) == kernel['Trades']).all()
+
+        print(f"{n_rows:>12,} {legacy_time * 1000:>15.1f} {kernel_time * 1000:>12.1f} "
+              f"{legacy_time / kernel_time:>8.1f}x")
+
+
+# =============================================================================
+# STREAKS
+# =============================================================================
+
+def legacy_streaks(filtered_df):
+    """The streak tab before the run-length engine: groupby with a mode lambda"""
+    sorted_df = filtered_df.sort_values('Timestamp IST', kind='stable').reset_index(drop=True)
+    sorted_df['streak_id'] = (sorted_df['is_profitable'] != sorted_df['is_profitable'].shift()).cumsum()
+    streak_analysis = sorted_df.groupby('streak_id').agg({
+        'is_profitable': 'first',
+        'Net_PnL': ['sum', 'count'],
+        'sentiment_category': lambda x: x.mode()[0] if len(x.mode()) > 0 else x.iloc[0]
+    })
+    streak_analysis.columns = ['is_win_streak', 'total_pnl', 'streak_length', 'dominant_sentiment']
+    return streak_analysis
+
+
+def bench_streaks(rows):
+    """Compare the mode-lambda streak groupby with find_streaks"""
+    print(f"{'Rows':>12} {'Streaks':>9} {'Lambda (s)':>11} {'RLE (ms)':>9} {'Speedup':>9} "
+          f"{'Per Account+Coin (ms)':>22}")
+    for n_rows in rows:
+        merged = apply_schema(add_trade_features(make_synthetic_trades(n_rows)))
+        legacy_time, legacy = time_call(legacy_streaks, merged)
+        rle_time, streaks = time_call(find_streaks, merged, repeat=3)
+        grouped_time, _ = time_call(find_streaks, merged, 'is_profitable', 'Net_PnL',
+                                    'sentiment_category', ['Account', 'Coin'], repeat=3)
+
+        assert (legacy['streak_length'].to_numpy() == streaks['length'].to_numpy()).all()
+        assert (legacy['dominant_sentiment'].astype(str).to_numpy()
+                == streaks['dominant'].astype(str).to_numpy()).all()
+        assert np.allclose(legacy['total_pnl'], streaks['total_pnl'])
+
+        print(f"{n_rows:>12,} {len(streaks):>9,} {legacy_time:>11.2f} {rle_time * 1000:>9.1f} "
+              f"{legacy_time / rle_time:>8.0f}x {grouped_time * 1000:>22.1f}")
+
+
+# =============================================================================
+# DRAWDOWNS
+# =============================================================================
+
+def legacy_max_drawdown(daily_pnl):
+    """The drawdown tab before the episode engine: maximum drawdown and a recovery rescan"""
+    cumulative_pnl = daily_pnl.cumsum()
+    running_max = cumulative_pnl.expanding().max()
+    drawdown = cumulative_pnl - running_max
+    max_dd_date = drawdown.idxmin()
+    recovery_dates = cumulative_pnl[cumulative_pnl.index > max_dd_date]
+    recovered = recovery_dates[recovery_dates >= running_max.loc[max_dd_date]]
+    return drawdown.min(), recovered.index[0] if len(recovered) > 0 else None
+
+
+def legacy_drawdowns(filtered_df, by):
+    """Legacy maximum drawdown repeated for every group of `by`"""
+    daily = filtered_df.groupby([by, 'Date'], observed=True)['Net_PnL'].sum()
+    return {key: legacy_max_drawdown(group.droplevel(0)) for key, group in daily.groupby(level=0, observed=True)}
+
+
+def bench_drawdowns(rows):
+    """Compare per-group maximum drawdowns with the full episode catalogue"""
+    print(f"{'Rows':>12} {'Curves':>8} {'Episodes':>9} {'Legacy max DD (ms)':>19} "
+          f"{'Episodes (ms)':>14} {'Speedup':>9}")
+    for n_rows in rows:
+        merged = apply_schema(add_trade_features(make_synthetic_trades(n_rows)))
+        legacy_time, legacy = time_call(legacy_drawdowns, merged, 'Account')
+        engine_time, episodes = time_call(find_drawdowns, merged, 'Account', repeat=3)
+
+        deepest = episodes.groupby('Account', observed=True)['depth'].min()
+        assert np.allclose([legacy[key][0] for key in deepest.index], deepest.to_numpy())
+
+        print(f"{n_rows:>12,} {len(legacy):>8,} {len(episodes):>9,} {legacy_time * 1000:>19.1f} "
+              f"{engine_time * 1000:>14.1f} {legacy_time / engine_time:>8.1f}x")
+
+
+# =============================================================================
+# ROLLING STATISTICS
+# =============================================================================
+
+def bench_rolling(rows):
+    """Sweep every slider window with pandas rolling() and with prefix sums"""
+    print(f"{'Days':>12} {'pandas (ms)':>12} {'Prefix build (ms)':>18} {'Prefix sweep (ms)':>18} {'Speedup':>9}")
+    rng = np.random.default_rng(42)
+    for n_days in rows:
+        daily_pnl = pd.Series(rng.normal(500, 20_000, n_days))
+        windows = range(1, MAX_WINDOW + 1)
+
+        def pandas_sweep():
+            return [(daily_pnl.rolling(window).mean(), daily_pnl.rolling(window).std()) for window in windows]
+
+        def prefix_sweep(rolling_stats):
+            return [(rolling_stats.mean(window), rolling_stats.std(window)) for window in windows]
+
+        pandas_time, expected = time_call(pandas_sweep)
+        build_time, rolling_stats = time_call(RollingStats, daily_pnl.to_numpy(), repeat=3)
+        sweep_time, result = time_call(prefix_sweep, rolling_stats)
+        for (mean, std), (prefix_mean, prefix_std) in zip(expected, result):
+            assert np.allclose(mean, prefix_mean, equal_nan=True) and np.allclose(std, prefix_std, equal_nan=True)
+
+        print(f"{n_days:>12,} {pandas_time * 1000:>12.1f} {build_time * 1000:>18.2f} "
+              f"{sweep_time * 1000:>18.1f} {pandas_time / sweep_time:>8.1f}x")
+
+
+# =============================================================================
+# SIGNIFICANCE TESTS
+# =============================================================================
+
+def legacy_significance(filtered_df):
+    """ANOVA and chi-square as the Statistical Significance tab ran them on raw trades"""
+    sentiment_groups = {}
+    for sentiment in SENTIMENT_ORDER:
+        if sentiment in filtered_df['sentiment_category'].values:
+            sentiment_groups[sentiment] = filtered_df[filtered_df['sentiment_category'] == sentiment]['Net_PnL'].dropna()
+    f_stat, p_value = stats.f_oneway(*sentiment_groups.values())
+    contingency_table = pd.crosstab(filtered_df['sentiment_category'], filtered_df['is_profitable'])
+    chi2, p_value_chi, _, _ = stats.chi2_contingency(contingency_table)
+    return f_stat, p_value, chi2, p_value_chi
+
+
+def cube_significance(cube):
+    """The same tests from the cube's per-sentiment sufficient statistics"""
+    by_sentiment = cube.select().rollup('sentiment_category')
+    f_stat, p_value, _, _ = one_way_anova(
+        by_sentiment['Net_PnL_n'], by_sentiment['Net_PnL_sum'], by_sentiment['Net_PnL_sumsq'])
+    chi2, p_value_chi, _, _ = chi_square_independence(profitability_table(by_sentiment))
+    return f_stat, p_value, chi2, p_value_chi
+
+
+def bench_significance(rows):
+    """Compare the raw-trade tests with tests on sufficient statistics"""
+    print(f"{'Rows':>12} {'Raw trades (ms)':>16} {'Cube (ms)':>10} {'Speedup':>9}")
+    for n_rows in rows:
+        merged = apply_schema(add_trade_features(make_synthetic_trades(n_rows, daily_sentiment=True)))
+        cube = SentimentCube(merged)
+        legacy_time, legacy = time_call(legacy_significance, merged, repeat=3)
+        cube_time, result = time_call(cube_significance, cube, repeat=3)
+        assert np.allclose(legacy, result)
+
+        print(f"{n_rows:>12,} {legacy_time * 1000:>16.1f} {cube_time * 1000:>10.2f} "
+              f"{legacy_time / cube_time:>8.0f}x")
+
+
+def legacy_rank_tests(filtered_df):
+    """Kruskal-Wallis and every pairwise Mann-Whitney test, each ranking its own inputs"""
+    sentiment_groups = {
+        sentiment: group['Net_PnL'].dropna()
+        for sentiment, group in filtered_df.groupby('sentiment_category', observed=True)
+    }
+    labels = list(sentiment_groups)
+    pairs = [
+        stats.mannwhitneyu(sentiment_groups[first], sentiment_groups[second], alternative='two-sided')
+        for i, first in enumerate(labels) for second in labels[i + 1:]
+    ]
+    return stats.kruskal(*sentiment_groups.values()), pairs
+
+
+def shared_rank_tests(filtered_df):
+    """The same tests from one shared ranking"""
+    rank_tests = RankTests(filtered_df['Net_PnL'], filtered_df['sentiment_category'])
+    return rank_tests.kruskal(), rank_tests.pairwise()
+
+
+def bench_ranks(rows):
+    """Compare independently ranked tests with RankTests"""
+    print(f"{'Rows':>12} {'Pairs':>6} {'scipy (s)':>10} {'Shared ranks (s)':>17} {'Speedup':>9}")
+    for n_rows in rows:
+        merged = apply_schema(add_trade_features(make_synthetic_trades(n_rows, daily_sentiment=True)))
+        legacy_time, (kruskal, pairs) = time_call(legacy_rank_tests, merged)
+        shared_time, (h_test, pairwise) = time_call(shared_rank_tests, merged, repeat=3)
+        assert np.allclose(kruskal, h_test)
+        assert np.allclose([pair.statistic for pair in pairs], pairwise['U'])
+        assert np.allclose([pair.pvalue for pair in pairs], pairwise['p_value'])
+
+        print(f"{n_rows:>12,} {len(pairs):>6} {legacy_time:>10.2f} {shared_time:>17.2f} "
+              f"{legacy_time / shared_time:>8.1f}x")
+
+
+# =============================================================================
+# POST-HOC TESTS
+# =============================================================================
+
+def legacy_posthoc(filtered_df):
+    """Mann-Whitney and Welch's t for every sentiment pair, one scipy call each"""
+    sentiment_groups = {
+        sentiment: group['Net_PnL'].dropna()
+        for sentiment, group in filtered_df.groupby('sentiment_category', observed=True)
+    }
+    labels = list(sentiment_groups)
+    results = []
+    for i, first in enumerate(labels):
+        for second in labels[i + 1:]:
+            results.append((
+                stats.mannwhitneyu(sentiment_groups[first], sentiment_groups[second]).pvalue,
+                stats.ttest_ind(sentiment_groups[first], sentiment_groups[second], equal_var=False).pvalue,
+            ))
+    return results
+
+
+def batched_posthoc(filtered_df, cube):
+    """All pairs of all three tests from shared ranks and cube statistics"""
+    rank_tests = RankTests(filtered_df['Net_PnL'], filtered_df['sentiment_category'])
+    group_stats = cube.select().rollup('sentiment_category').reindex(rank_tests.labels)
+    return posthoc_table(rank_tests, group_stats['Net_PnL_n'], group_stats['Net_PnL_mean'],
+                         group_stats['Net_PnL_std'] ** 2)
+
+
+def bench_posthoc(rows):
+    """Compare per-pair scipy calls with the batched post-hoc table"""
+    print(f"{'Rows':>12} {'Pairs':>6} {'scipy (s)':>10} {'Batched (s)':>12} {'Speedup':>9}")
+    for n_rows in rows:
+        merged = apply_schema(add_trade_features(make_synthetic_trades(n_rows, daily_sentiment=True)))
+        cube = SentimentCube(merged)
+        legacy_time, legacy = time_call(legacy_posthoc, merged)
+        batched_time, table = time_call(batched_posthoc, merged, cube, repeat=3)
+        assert np.allclose(legacy, table[['mann_whitney_p', 'welch_p']].to_numpy())
+
+        print(f"{n_rows:>12,} {len(table):>6} {legacy_time:>10.2f} {batched_time:>12.2f} "
+              f"{legacy_time / batched_time:>8.1f}x")
+
+
+# =============================================================================
+# BOOTSTRAP
+# =============================================================================
+
+BOOTSTRAP_RESAMPLES = 200
+
+
+def loop_bootstrap(filtered_df, n_resamples, seed=42):
+    """Per-resample pandas bootstrap of mean PnL, win rate and Sharpe per sentiment"""
+    rng = np.random.default_rng(seed)
+    intervals = {}
+    trades = filtered_df[['sentiment_category', 'Net_PnL', 'is_profitable']]
+    for sentiment, group in trades.groupby('sentiment_category', observed=True):
+        metrics = []
+        for _ in range(n_resamples):
+            sample = group.sample(frac=1, replace=True, random_state=rng)
+            mean = sample['Net_PnL'].mean()
+            metrics.append((mean, sample['is_profitable'].mean(), mean / sample['Net_PnL'].std()))
+        intervals[sentiment] = np.quantile(np.array(metrics), [0.025, 0.975], axis=0)
+    return intervals
+
+
+def bench_bootstrap(rows):
+    """Compare a per-resample pandas loop with batched bootstrap CIs"""
+    print(f"{'Rows':>12} {'Resamples':>10} {'pandas loop (s)':>16} {'Batched (s)':>12} {'Speedup':>9}")
+    for n_rows in rows:
+        merged = apply_schema(add_trade_features(make_synthetic_trades(n_rows, daily_sentiment=True)))
+        loop_time, loop = time_call(loop_bootstrap, merged, BOOTSTRAP_RESAMPLES)
+        batched_time, intervals = time_call(bootstrap_ci, merged, 'sentiment_category', 'Net_PnL',
+                                            'is_profitable', BOOTSTRAP_RESAMPLES)
+        # Different random draws, so only check that the intervals agree loosely
+        for sentiment, (low, high) in loop.items():
+            width = high[0] - low[0]
+            assert abs(intervals.loc[sentiment, 'Avg_PnL_low'] - low[0]) < width
+
+        print(f"{n_rows:>12,} {BOOTSTRAP_RESAMPLES:>10} {loop_time:>16.2f} {batched_time:>12.2f} "
+              f"{loop_time / batched_time:>8.1f}x")
+
+
+# =============================================================================
+# PERMUTATION TESTS
+# =============================================================================
+
+PERMUTATIONS = 200
+
+
+def loop_permutation(filtered_df, n_permutations, seed=42):
+    """Per-permutation label shuffle and scipy ANOVA"""
+    rng = np.random.default_rng(seed)
+    trades = filtered_df[['sentiment_category', 'Net_PnL']].dropna()
+    labels = trades['sentiment_category'].to_numpy()
+    observed = stats.f_oneway(*[group for _, group in trades.groupby('sentiment_category', observed=True)['Net_PnL']])
+    extreme = 0
+    for _ in range(n_permutations):
+        shuffled = trades['Net_PnL'].groupby(rng.permutation(labels), observed=True)
+        extreme += stats.f_oneway(*[group for _, group in shuffled]).statistic >= observed.statistic
+    return (extreme + 1) / (n_permutations + 1)
+
+
+def bench_permutation(rows):
+    """Compare a per-permutation scipy loop with batched permutations, and early stopping"""
+    print(f"{'Rows':>12} {'Perms':>6} {'scipy loop (s)':>15} {'Batched (s)':>12} {'Speedup':>9} "
+          f"{'Early stop (s)':>15} {'Perms used':>11}")
+    for n_rows in rows:
+        merged = apply_schema(add_trade_features(make_synthetic_trades(n_rows, daily_sentiment=True)))
+        loop_time, loop_p = time_call(loop_permutation, merged, PERMUTATIONS)
+        batched_time, (batched_p, _, std_error) = time_call(
+            permutation_test, merged['Net_PnL'], merged['sentiment_category'], PERMUTATIONS, 0
+        )
+        # Different random shuffles, so the p-values only agree within sampling error
+        assert abs(loop_p - batched_p) < 5 * max(std_error, 1 / PERMUTATIONS)
+        early_time, (_, used, _) = time_call(
+            permutation_test, merged['Net_PnL'], merged['sentiment_category'], 10 * PERMUTATIONS, 0.01
+        )
+        print(f"{n_rows:>12,} {PERMUTATIONS:>6} {loop_time:>15.2f} {batched_time:>12.2f} "
+              f"{loop_time / batched_time:>8.1f}x {early_time:>15.2f} {used:>11,}")
+
+
+# =============================================================================
+# TAIL RISK
+# =============================================================================
+
+VAR_PATHS = 10_000
+VAR_HORIZON = 10
+
+
+def legacy_tail_risk(filtered_df, by):
+    """Per-group sorted quantile VaR and tail-mean CVaR at 95% and 99%"""
+    rows = {}
+    for group, pnl in filtered_df.groupby(by, observed=True)['Net_PnL']:
+        ordered = np.sort(pnl.dropna().to_numpy())
+        row = {}
+        for level in (95, 99):
+            tail = max(int(np.ceil((100 - level) / 100 * len(ordered) - 1e-9)), 1)
+            row[f'VaR_{level}'], row[f'CVaR_{level}'] = -ordered[tail - 1], -ordered[:tail].mean()
+        rows[group] = row
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+def loop_monte_carlo(daily, n_paths, horizon, seed=42):
+    """
+    One path at a time: draw `horizon` days of a regime and add them up.
+    Seeds are split per regime and per PATHS_PER_TASK paths as in
+    monte_carlo_var, so both see the same draws
+    """
+    regimes = [(regime, pnl.dropna().to_numpy()) for regime, pnl
+               in daily.groupby('sentiment_category', observed=True)['Net_PnL_sum']]
+    n_tasks = -(-n_paths // PATHS_PER_TASK)
+    rows = {}
+    for (regime, pnl), regime_seed in zip(regimes, np.random.SeedSequence(seed).spawn(len(regimes))):
+        totals = []
+        for task, task_seed in enumerate(regime_seed.spawn(n_tasks)):
+            rng = np.random.Generator(np.random.SFC64(task_seed))
+            for _ in range(min(PATHS_PER_TASK, n_paths - task * PATHS_PER_TASK)):
+                totals.append(pnl[rng.integers(0, len(pnl), size=horizon)].sum())
+        ordered = np.sort(totals)
+        rows[regime] = -ordered[max(int(np.ceil(0.05 * len(ordered) - 1e-9)), 1) - 1]
+    return pd.Series(rows)
+
+
+def bench_tail_risk(rows):
+    """Compare sorted per-group VaR with partitioned VaR, and a per-path loop with batched Monte Carlo"""
+    print(f"{'Rows':>12} {'Sorted VaR (s)':>15} {'Partition (s)':>14} {'Speedup':>9} "
+          f"{'MC loop (s)':>12} {'Batched MC (s)':>15} {'Speedup':>9}")
+    for n_rows in rows:
+        merged = apply_schema(add_trade_features(make_synthetic_trades(n_rows, daily_sentiment=True)))
+        sorted_time, legacy = time_call(
+            lambda: [legacy_tail_risk(merged, by) for by in ('sentiment_category', 'Side', 'Account')], repeat=3
+        )
+        partition_time, current = time_call(
+            lambda: [tail_risk(merged, by) for by in ('sentiment_category', 'Side', 'Account')], repeat=3
+        )
+        for old, new in zip(legacy, current):
+            np.testing.assert_allclose(new[old.columns].to_numpy(), old.reindex(new.index).to_numpy())
+
+        daily = SentimentCube(merged).select().rollup(['Date', 'sentiment_category']).reset_index()
+        loop_time, loop = time_call(loop_monte_carlo, daily, VAR_PATHS // 10, VAR_HORIZON)
+        batched_time, simulated = time_call(
+            monte_carlo_var, daily['Net_PnL_sum'], daily['sentiment_category'], VAR_HORIZON, VAR_PATHS
+        )
+        # Same seeded draws, so the loop's paths must give the same VaR as a batched run of as many
+        same_paths = monte_carlo_var(daily['Net_PnL_sum'], daily['sentiment_category'], VAR_HORIZON, VAR_PATHS // 10)
+        np.testing.assert_allclose(same_paths['VaR_95'].reindex(loop.index).to_numpy(), loop.to_numpy(), rtol=1e-9)
+        # The loop runs a tenth of the paths, so compare per path
+        loop_time *= 10
+
+        print(f"{n_rows:>12,} {sorted_time:>15.3f} {partition_time:>14.3f} {sorted_time / partition_time:>8.1f}x "
+              f"{loop_time:>12.2f} {batched_time:>15.3f} {loop_time / batched_time:>8.1f}x")
+
+
+# =============================================================================
+# EQUITY SIMULATION
+# =============================================================================
+
+SIM_TRADES = 1000
+SIM_PATHS = 2_000
+SIM_LARGE_PATHS = 100_000
+
+
+def loop_equity(pnl, n_paths, n_trades, capital=10_000, ruin_level=5_000, seed=42):
+    """One path at a time: resample trades, build the equity curve, scan its drawdown"""
+    rng = np.random.default_rng(seed)
+    pnl = pd.Series(pnl)
+    max_drawdowns, ruined = [], 0
+    for _ in range(n_paths):
+        equity = capital + pnl.sample(n_trades, replace=True, random_state=rng).cumsum()
+        peaks = equity.cummax().clip(lower=capital)
+        max_drawdowns.append((peaks - equity).max())
+        ruined += equity.min() <= ruin_level
+    return np.array(max_drawdowns), ruined / n_paths
+
+
+def bench_equity(rows):
+    """Compare a per-path pandas loop with the chunked equity simulator"""
+    print(f"{'Rows':>12} {'Paths':>7} {'pandas loop (s)':>16} {'Vectorized (s)':>15} {'Speedup':>9} "
+          f"{f'{SIM_LARGE_PATHS:,} paths (s)':>18} {'Peak MB':>8}")
+    for n_rows in rows:
+        merged = apply_schema(add_trade_features(make_synthetic_trades(n_rows, daily_sentiment=True)))
+        pnl, regimes = merged['Net_PnL'].to_numpy(), merged['sentiment_category']
+        loop_time, (loop_drawdowns, loop_ruin) = time_call(loop_equity, pnl, SIM_PATHS, SIM_TRADES)
+        vector_time, (paths, _) = time_call(simulate_equity, pnl, regimes, SIM_TRADES, SIM_PATHS, 1, None,
+                                            10_000, 5_000)
+        # Different random draws, so only check that the drawdown distributions agree loosely
+        assert np.isclose(paths['max_drawdown'].median(), np.median(loop_drawdowns), rtol=0.1)
+        assert abs(paths['ruined'].mean() - loop_ruin) < 0.05
+
+        tracemalloc.start()
+        large_time, _ = time_call(simulate_equity, pnl, regimes, SIM_TRADES, SIM_LARGE_PATHS)
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+        print(f"{n_rows:>12,} {SIM_PATHS:>7,} {loop_time:>16.2f} {vector_time:>15.2f} "
+              f"{loop_time / vector_time:>8.1f}x {large_time:>18.2f} {peak_mb:>8.0f}")
+
+
+# =============================================================================
+# DOWNSAMPLING
+# =============================================================================
+
+def drawdown_figure(x, cumulative, running_max, drawdown):
+    """The Drawdown tab's three time series as one serialized figure"""
+    fig = go.Figure()
+    for y in (cumulative, running_max, drawdown):
+        fig.add_trace(go.Scatter(x=x, y=y))
+    return fig.to_json()
+
+
+def downsampled_drawdown_figure(x, cumulative, running_max, drawdown):
+    """The same figure with every trace downsampled to MAX_POINTS"""
+    traces = [downsample(x, y, MAX_POINTS) for y in (cumulative, running_max, drawdown)]
+    fig = go.Figure()
+    for trace_x, trace_y in traces:
+        fig.add_trace(go.Scatter(x=trace_x, y=trace_y))
+    return fig.to_json()
+
+
+def bench_downsample(rows):
+    """Compare full and LTTB-downsampled drawdown charts: build time and JSON payload"""
+    print(f"{'Points':>12} {'Full (s)':>9} {'Full MB':>8} {'LTTB (s)':>9} {'LTTB MB':>8} {'Smaller':>8}")
+    rng = np.random.default_rng(42)
+    for n_points in rows:
+        x = pd.date_range('2020-01-01', periods=n_points, freq='min')
+        cumulative = np.cumsum(rng.normal(0, 50, n_points))
+        running_max = np.maximum.accumulate(cumulative)
+        drawdown = cumulative - running_max
+        full_time, full = time_call(drawdown_figure, x, cumulative, running_max, drawdown)
+        lttb_time, lttb = time_call(downsampled_drawdown_figure, x, cumulative, running_max, drawdown)
+        # The deepest drawdown must survive downsampling
+        assert downsample(x, drawdown)[1].min() == drawdown.min()
+        print(f"{n_points:>12,} {full_time:>9.2f} {len(full) / 1e6:>8.1f} {lttb_time:>9.3f} "
+              f"{len(lttb) / 1e6:>8.2f} {len(full) / len(lttb):>7.0f}x")
+
+
+# =============================================================================
+# BOX PLOTS
+# =============================================================================
+
+def raw_box_figure(merged):
+    """Position size box plot with every trade sent to Plotly"""
+    fig = go.Figure()
+    for sentiment, sizes in merged.groupby('sentiment_category', observed=True)['Size USD']:
+        fig.add_trace(go.Box(y=sizes, name=sentiment, boxmean='sd'))
+    return fig.to_json()
+
+
+def summary_box_figure(merged):
+    """The same box plot drawn from box_summaries() and outlier samples"""
+    summary, outliers = box_summaries(merged, 'Size USD', 'sentiment_category')
+    fig = go.Figure()
+    for sentiment, box in summary.iterrows():
+        fig.add_trace(go.Box(
+            x=[sentiment], q1=[box['q1']], median=[box['median']], q3=[box['q3']],
+            lowerfence=[box['lowerfence']], upperfence=[box['upperfence']],
+            mean=[box['mean']], sd=[box['sd']], name=sentiment, boxmean='sd', boxpoints=False
+        ))
+        fig.add_trace(go.Scatter(x=[sentiment] * len(outliers[sentiment]), y=outliers[sentiment], mode='markers'))
+    return fig.to_json()
+
+
+def bench_boxes(rows):
+    """Compare raw-value box plots with precomputed box summaries: build time and JSON payload"""
+    print(f"{'Rows':>12} {'Raw (s)':>8} {'Raw MB':>7} {'Summary (s)':>12} {'Summary KB':>11} {'Smaller':>8}")
+    for n_rows in rows:
+        merged = apply_schema(add_trade_features(make_synthetic_trades(n_rows, daily_sentiment=True)))
+        raw_time, raw = time_call(raw_box_figure, merged)
+        summary_time, summary = time_call(summary_box_figure, merged)
+        # Quartiles match what Plotly would compute from the raw values
+        quartiles = merged.groupby('sentiment_category', observed=True)['Size USD'].quantile([0.25, 0.5, 0.75])
+        boxes, _ = box_summaries(merged, 'Size USD', 'sentiment_category')
+        np.testing.assert_allclose(boxes[['q1', 'median', 'q3']].to_numpy().ravel(), quartiles.to_numpy())
+        print(f"{n_rows:>12,} {raw_time:>8.2f} {len(raw) / 1e6:>7.1f} {summary_time:>12.3f} "
+              f"{len(summary) / 1e3:>11.1f} {len(raw) / len(summary):>7.0f}x")
+
+
+# =============================================================================
+# HISTOGRAMS
+# =============================================================================
+
+def raw_histogram_figure(streaks):
+    """Streak length histogram with every streak sent to Plotly"""
+    fig = go.Figure()
+    for is_win, lengths in streaks.groupby('is_win')['length']:
+        fig.add_trace(go.Histogram(x=lengths, name=str(is_win), nbinsx=20))
+    return fig.to_json()
+
+
+def binned_histogram_figure(streaks):
+    """The same histogram binned with histograms() and drawn as bars"""
+    hist = histograms({is_win: lengths for is_win, lengths in streaks.groupby('is_win')['length']},
+                      bins=20, integer=True)
+    fig = go.Figure()
+    for column in hist.columns[4:]:
+        fig.add_trace(go.Bar(x=hist['center'], y=hist[column], width=hist['width'], name=str(column)))
+    return fig.to_json()
+
+
+def bench_histograms(rows):
+    """Compare client-side and server-side binning of the streak histogram: build time and JSON payload"""
+    print(f"{'Rows':>12} {'Streaks':>10} {'Raw (s)':>8} {'Raw MB':>7} {'Binned (s)':>11} "
+          f"{'Binned KB':>10} {'Smaller':>8}")
+    for n_rows in rows:
+        merged = apply_schema(add_trade_features(make_synthetic_trades(n_rows, daily_sentiment=True)))
+        streaks = find_streaks(merged)
+        raw_time, raw = time_call(raw_histogram_figure, streaks)
+        binned_time, binned = time_call(binned_histogram_figure, streaks)
+        hist = histograms({'all': streaks['length']}, bins=20, integer=True)
+        assert hist['all'].sum() == len(streaks)
+        print(f"{n_rows:>12,} {len(streaks):>10,} {raw_time:>8.2f} {len(raw) / 1e6:>7.1f} {binned_time:>11.3f} "
+              f"{len(binned) / 1e3:>10.1f} {len(raw) / len(binned):>7.0f}x")
+
+
+# =============================================================================
+# FIGURE CACHE
+# =============================================================================
+
+def size_scatter_figure(merged):
+    """The Risk Analysis position size vs PnL scatter, one trace per sentiment"""
+    fig = go.Figure()
+    for sentiment, trades in merged.groupby('sentiment_category', observed=True):
+        fig.add_trace(go.Scatter(x=trades['Size USD'], y=trades['Net_PnL'], mode='markers', name=sentiment))
+    return fig
+
+
+def bench_figures(rows):
+    """Compare rebuilding a figure on every rerun with a FigureCache hit"""
+    print(f"{'Rows':>12} {'Rebuild (s)':>12} {'Cache hit (s)':>14} {'Speedup':>9} {'Cached MB':>10}")
+    for n_rows in rows:
+        merged = apply_schema(add_trade_features(make_synthetic_trades(n_rows, daily_sentiment=True)))
+        cache = FigureCache()
+        key = fingerprint('position_size_vs_pnl', n_rows)
+        # What a rerun paid before: build the figure and serialize it for the browser
+        rebuild_time, _ = time_call(lambda: size_scatter_figure(merged).to_json(), repeat=3)
+        cache.figure(key, lambda: size_scatter_figure(merged))
+        # A hit hands back the built figure; only Streamlit's own serialization is left
+        hit_time, _ = time_call(lambda: cache.figure(key, None).to_json(), repeat=3)
+        assert cache.hits == 3 and len(cache) == 1
+        print(f"{n_rows:>12,} {rebuild_time:>12.2f} {hit_time:>14.2f} {rebuild_time / hit_time:>8.1f}x "
+              f"{cache.nbytes / 1e6:>10.1f}")
+
+
+BENCHMARKS = {
+    'features': (bench_features, [1_000_000, 10_000_000]),
+    'memory': (bench_memory, [1_000_000]),
+    'sessions': (bench_sessions, [1_000_000]),
+    'filters': (bench_filters, [1_000_000, 5_000_000]),
+    'cube': (bench_cube, [1_000_000, 5_000_000]),
+    'kernel': (bench_kernel, [1_000_000, 5_000_000]),
+    # The legacy lambda runs once per streak, so keep its inputs small
+    'streaks': (bench_streaks, [100_000, 200_000]),
+    'drawdowns': (bench_drawdowns, [1_000_000, 5_000_000]),
+    # Daily series: rows are days here
+    'rolling': (bench_rolling, [1_000, 10_000]),
+    'significance': (bench_significance, [1_000_000, 5_000_000]),
+    'ranks': (bench_ranks, [1_000_000, 5_000_000]),
+    'posthoc': (bench_posthoc, [1_000_000, 5_000_000]),
+    'bootstrap': (bench_bootstrap, [200_000, 1_000_000]),
+    'permutation': (bench_permutation, [100_000, 200_000]),
+    'tail_risk': (bench_tail_risk, [1_000_000, 5_000_000]),
+    'equity': (bench_equity, [1_000_000]),
+    # Points per time series here
+    'downsample': (bench_downsample, [100_000, 1_000_000]),
+    'boxes': (bench_boxes, [1_000_000, 5_000_000]),
+    'histograms': (bench_histograms, [1_000_000, 5_000_000]),
+    'figures': (bench_figures, [200_000, 1_000_000]),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('--rows', type=int, nargs='+',
+                        help='synthetic dataset sizes (default depends on the benchmark)')
+    args = parser.parse_args()
+
+    bench, default_rows = BENCHMARKS[args.benchmark]
+    print(f"📊 Benchmark: {args.benchmark}")
+    print("-" * 60)
+    bench(args.rows or default_rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Bootstrap confidence intervals for per-group trade metrics.
+
+Each resample draws a group's trades with replacement. Resamples are drawn
+in batches as (resamples x trades) index matrices, so one NumPy gather and
+one row-wise reduction give a whole batch of resampled sums. A group's
+winning trades are placed first, so a resample's win count is a comparison
+on the index matrix rather than a second gather. Resamples are
+split into fixed-size tasks with their own seeds spawned from one seed, so
+the result is the same whether the tasks run in this process or, for large
+resample counts, across a thread pool. Every task reads the same grouped
+trades in place and names only its group's slice, size and seed.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from task_pool import task_pool
+
+BOOTSTRAP_METRICS = ['Avg_PnL', 'Win_Rate', 'Sharpe_Ratio', 'Profit_Factor']
+
+# Resamples per task; tasks are the unit of seeding and of parallel work
+RESAMPLES_PER_TASK = 250
+
+# Index matrix elements per batch (resamples x trades), about 32 MB of int64
+BATCH_ELEMENTS = 1 << 22
+
+# Resample draws (resamples x trades, all groups) from which a thread pool pays off
+PARALLEL_DRAWS = 50_000_000
+
+
+def _resample_sums(values, n_wins, n_resamples, seed):
+    """
+    Return (sum, sum of squares, wins) of `n_resamples` resamples of one
+    group whose `values` list its n_wins winning trades first
+    """
+    # SFC64 draws bounded integers faster than the default PCG64
+    rng = np.random.Generator(np.random.SFC64(seed))
+    n_values = len(values)
+    sums, squares, win_counts = (np.empty(n_resamples) for _ in range(3))
+    batch = max(1, BATCH_ELEMENTS // max(n_values, 1))
+    for start in range(0, n_resamples, batch):
+        stop = min(start + batch, n_resamples)
+        rows = rng.integers(0, n_values, size=(stop - start, n_values))
+        sample = values[rows]
+        sums[start:stop] = sample.sum(axis=1)
+        squares[start:stop] = np.einsum('ij,ij->i', sample, sample)
+        # Winning trades are the first n_wins, so no second gather is needed
+        win_counts[start:stop] = np.count_nonzero(rows < n_wins, axis=1)
+    return sums, squares, win_counts
+
+
+def _metrics(n, sums, squares, win_counts):
+    """Metric values from resampled sums, with the dashboard's definitions"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = sums / n
+        std = np.sqrt(np.maximum(squares - sums * mean, 0) / (n - 1))
+        return {
+            'Avg_PnL': mean,
+            'Win_Rate': win_counts / n,
+            'Sharpe_Ratio': mean / std,
+            # Total PnL over trades x volatility, as in the Advanced Metrics table
+            'Profit_Factor': sums / (n * std),
+        }
+
+
+def bootstrap_ci(df, by='sentiment_category', value='Net_PnL', outcome='is_profitable',
+                 n_resamples=1000, confidence=0.95, seed=42, workers=None):
+    """
+    Percentile bootstrap confidence intervals of BOOTSTRAP_METRICS per
+    group of `by`, one row per group with '{metric}_low' and
+    '{metric}_high' columns. Trades with a missing `value` are left out.
+    `workers` caps the thread pool (default: CPU count); the pool is
+    only used when the resampling work is large.
+    """
+    values = df[value].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values)
+    groups = pd.Categorical(df[by])
+    codes = groups.codes[valid]
+    values = values[valid]
+    wins = df[outcome].to_numpy(dtype=bool)[valid]
+
+    # Trades laid out group by group, each group's winning trades first
+    order = np.lexsort((~wins, codes))
+    bounds = np.searchsorted(codes[order], np.arange(len(groups.categories) + 1))
+    present = [code for code in range(len(groups.categories)) if bounds[code + 1] > bounds[code]]
+    grouped = values[order]
+
+    # One task per RESAMPLES_PER_TASK resamples of a group, each with its own seed
+    n_tasks = -(-n_resamples // RESAMPLES_PER_TASK)
+    group_seeds = np.random.SeedSequence(seed).spawn(len(present))
+    tasks = []
+    for code, group_seed in zip(present, group_seeds):
+        n_wins = int(wins[order[bounds[code]:bounds[code + 1]]].sum())
+        for task, task_seed in enumerate(group_seed.spawn(n_tasks)):
+            size = min(RESAMPLES_PER_TASK, n_resamples - task * RESAMPLES_PER_TASK)
+            tasks.append((bounds[code], bounds[code + 1], n_wins, size, task_seed))
+
+    def run_task(task):
+        start, stop, n_wins, size, task_seed = task
+        return _resample_sums(grouped[start:stop], n_wins, size, task_seed)
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers > 1 and n_resamples * len(values) >= PARALLEL_DRAWS:
+        with task_pool(workers) as pool:
+            results = list(pool.map(run_task, tasks))
+    else:
+        results = [run_task(task) for task in tasks]
+
+    alpha = (1 - confidence) / 2
+    rows = []
+    for position, code in enumerate(present):
+        parts = results[position * n_tasks:(position + 1) * n_tasks]
+        sums, squares, win_counts = (np.concatenate(part) for part in zip(*parts))
+        n = bounds[code + 1] - bounds[code]
+        row = {}
+        for metric, samples in _metrics(n, sums, squares, win_counts).items():
+            row[f'{metric}_low'], row[f'{metric}_high'] = np.nanquantile(samples, [alpha, 1 - alpha])
+        rows.append(row)
+
+    index = pd.Index(groups.categories[present], name=by)
+    if isinstance(df[by].dtype, pd.CategoricalDtype):
+        index = pd.CategoricalIndex(index, dtype=df[by].dtype, name=by)
+    columns = [f'{metric}_{side}' for metric in BOOTSTRAP_METRICS for side in ('low', 'high')]
+    return pd.DataFrame(rows, index=index, columns=columns)
@@ -0,0 +1,72 @@
+"""
+Box-plot summaries computed on the server.
+
+Given raw values, Plotly ships every one of them to the browser and works
+out the quartiles there. box_summaries() computes what a box plot draws
+(quartiles, whiskers, mean and standard deviation) per group, plus a capped
+sample of the outliers, so a box trace costs the same whatever the number
+of trades. Quartiles use linear interpolation and whiskers reach the most
+extreme values within 1.5 IQR of the box, as in Plotly.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Outlier points kept per group; the most extreme on each side are always kept
+MAX_OUTLIERS = 200
+
+BOX_COLUMNS = ['count', 'q1', 'median', 'q3', 'lowerfence', 'upperfence', 'mean', 'sd']
+
+
+def box_stats(values, whisker=1.5, max_outliers=MAX_OUTLIERS, seed=42):
+    """
+    Return (dict of BOX_COLUMNS, outlier sample array) of one array;
+    missing values are left out
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return dict.fromkeys(BOX_COLUMNS, np.nan) | {'count': 0}, np.empty(0)
+
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    low, high = q1 - whisker * (q3 - q1), q3 + whisker * (q3 - q1)
+    inside = (values >= low) & (values <= high)
+    stats = {
+        'count': len(values),
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'lowerfence': values[inside].min(),
+        'upperfence': values[inside].max(),
+        'mean': values.mean(),
+        'sd': values.std(ddof=1) if len(values) > 1 else 0.0,
+    }
+
+    outliers = values[~inside]
+    if len(outliers) > max_outliers:
+        extremes = [outliers.argmin(), outliers.argmax()]
+        rest = np.delete(np.arange(len(outliers)), extremes)
+        sample = np.random.default_rng(seed).choice(rest, max_outliers - 2, replace=False)
+        outliers = outliers[np.sort(np.r_[extremes, sample])]
+    return stats, outliers
+
+
+def box_summaries(df, value, by, whisker=1.5, max_outliers=MAX_OUTLIERS, seed=42):
+    """
+    Box statistics of `value` per group of `by`: (DataFrame of
+    BOX_COLUMNS indexed by group, dict of group to outlier sample)
+    """
+    values = df[value].to_numpy(dtype=np.float64)
+    groups = pd.Categorical(df[by])
+    order = np.argsort(groups.codes, kind='stable')
+    bounds = np.searchsorted(groups.codes[order], np.arange(len(groups.categories) + 1))
+
+    rows, labels, outliers = [], [], {}
+    for code, label in enumerate(groups.categories):
+        if bounds[code + 1] == bounds[code]:
+            continue
+        stats, outliers[label] = box_stats(values[order[bounds[code]:bounds[code + 1]]],
+                                           whisker, max_outliers, seed)
+        rows.append(stats)
+        labels.append(label)
+    return pd.DataFrame(rows, index=pd.Index(labels, name=by), columns=BOX_COLUMNS), outliers
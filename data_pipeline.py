@@ -0,0 +1,236 @@
+"""
+Data loading and preprocessing pipeline for the sentiment dashboard.
+
+Builds the Fear & Greed and merged trade DataFrames used by
+streamlit_app_final.py, with the merged trades converted to the declared
+dtypes of trade_schema.py, and keeps a columnar snapshot of the engineered
+result so unchanged inputs reload without re-running the pipeline. Rows
+appended to historical_data.csv since the snapshot are parsed and
+engineered on their own and added to it.
+
+DatasetHandle holds the loaded frames once per process and hands out
+zero-copy views, so every Streamlit session shares a single copy.
+"""
+
+import io
+import os
+import time
+
+import pandas as pd
+
+from filter_index import BitmapIndex, DayIndex
+from sentiment_cube import SentimentCube
+from sentiment_join import attach_sentiment, build_sentiment_lookup
+from snapshot_store import (
+    append_snapshot,
+    file_digest,
+    load_snapshot,
+    read_appended,
+    read_manifest,
+    save_snapshot,
+)
+from trade_features import add_trade_features
+from trade_schema import apply_schema, concat_trades
+
+FEAR_GREED_PATH = 'fear_greed_index.csv'
+HISTORICAL_PATH = 'historical_data.csv'
+SNAPSHOT_DIR = '.snapshot'
+
+# Copy-on-Write turns shallow copies into views that can never write back
+# into the shared frames (always on from pandas 3.0)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+def load_fear_greed(path=FEAR_GREED_PATH):
+    """Load the Fear & Greed Index sorted by date"""
+    fear_greed_df = pd.read_csv(path)
+    fear_greed_df['date'] = pd.to_datetime(fear_greed_df['date'])
+    return fear_greed_df.sort_values('date').reset_index(drop=True)
+
+
+def clean_trades(historical_df):
+    """Parse timestamps and numeric columns of raw trade rows"""
+    historical_df['Timestamp IST'] = pd.to_datetime(
+        historical_df['Timestamp IST'],
+        format='%d-%m-%Y %H:%M',
+        errors='coerce'
+    )
+    historical_df['Date'] = historical_df['Timestamp IST'].dt.date
+    historical_df['Date'] = pd.to_datetime(historical_df['Date'])
+
+    # Clean numeric columns
+    historical_df['Closed PnL'] = pd.to_numeric(historical_df['Closed PnL'], errors='coerce')
+    historical_df['Size USD'] = pd.to_numeric(historical_df['Size USD'], errors='coerce')
+    historical_df['Fee'] = pd.to_numeric(historical_df['Fee'], errors='coerce')
+    return historical_df.dropna(subset=['Date'])
+
+
+def sort_trades(merged_df):
+    """Order trades by 'Timestamp IST' so every day is a contiguous block of rows"""
+    if merged_df['Timestamp IST'].is_monotonic_increasing:
+        return merged_df
+    return merged_df.sort_values('Timestamp IST', kind='stable').reset_index(drop=True)
+
+
+def build_merged(historical_df, fear_greed_df):
+    """Attach sentiment, engineer features and apply the declared dtypes"""
+    lookup = build_sentiment_lookup(fear_greed_df)
+    merged_df = apply_schema(add_trade_features(attach_sentiment(historical_df, lookup)))
+    return sort_trades(merged_df)
+
+
+def ingest_appended(tail, columns, fear_greed_df, merged_df):
+    """
+    Run the pipeline on CSV rows appended after the snapshot and return
+    (raw_row_count, engineered_rows) ready to be added to merged_df.
+    """
+    historical_tail = pd.read_csv(io.BytesIO(tail), header=None, names=columns)
+    raw_rows = len(historical_tail)
+    merged_tail = build_merged(clean_trades(historical_tail), fear_greed_df)
+
+    # Categories may grow with new rows; every other column keeps its dtype
+    dtypes = {
+        column: dtype for column, dtype in merged_df.dtypes.items()
+        if not isinstance(dtype, pd.CategoricalDtype)
+    }
+    return raw_rows, merged_tail.astype(dtypes)
+
+
+def load_datasets(fear_greed_path=FEAR_GREED_PATH, historical_path=HISTORICAL_PATH,
+                  snapshot_dir=SNAPSHOT_DIR, incremental=True):
+    """
+    Return (fear_greed_df, merged_df), reusing the snapshot when the CSV
+    files are unchanged.
+
+    If historical_data.csv only grew since the snapshot was written and
+    `incremental` is set, just the appended rows are parsed and engineered,
+    so the refresh cost follows the number of new trades. Any other change
+    to either file triggers a full rebuild.
+    """
+    fear_greed_digest = file_digest(fear_greed_path)
+    manifest = read_manifest(snapshot_dir)
+
+    if manifest is not None and manifest['fear_greed_digest'] == fear_greed_digest:
+        appended = read_appended(
+            historical_path, manifest['historical_offset'], manifest['historical_digest']
+        )
+        snapshot = load_snapshot(snapshot_dir, manifest) if appended is not None else None
+        if snapshot is not None:
+            fear_greed_df, merged_df = snapshot
+            # Appended parts are stored in arrival order
+            merged_df = sort_trades(merged_df)
+            tail, offset, digest = appended
+            if not tail.strip():
+                return fear_greed_df, merged_df
+
+            merged_tail = None
+            if incremental:
+                try:
+                    raw_rows, merged_tail = ingest_appended(
+                        tail, manifest['historical_columns'], fear_greed_df, merged_df
+                    )
+                except (ValueError, TypeError):
+                    # Appended rows that do not fit the stored dtypes force a rebuild
+                    merged_tail = None
+            if merged_tail is not None:
+                source = {
+                    'historical_digest': digest,
+                    'historical_offset': offset,
+                    'historical_rows': manifest['historical_rows'] + raw_rows,
+                }
+                if append_snapshot(snapshot_dir, manifest, source, merged_tail):
+                    # Late-arriving trades may interleave with stored ones
+                    return fear_greed_df, sort_trades(concat_trades([merged_df, merged_tail]))
+
+    # Parse the same bytes that are hashed so the manifest matches the data
+    csv_bytes, historical_offset, historical_digest = read_appended(historical_path, 0, None)
+    raw_df = pd.read_csv(io.BytesIO(csv_bytes))
+    del csv_bytes
+
+    fear_greed_df = load_fear_greed(fear_greed_path)
+    historical_columns = list(raw_df.columns)
+    historical_rows = len(raw_df)
+    merged_df = build_merged(clean_trades(raw_df), fear_greed_df)
+    del raw_df
+
+    save_snapshot(snapshot_dir, {
+        'fear_greed_digest': fear_greed_digest,
+        'historical_digest': historical_digest,
+        'historical_offset': historical_offset,
+        'historical_rows': historical_rows,
+        'historical_columns': historical_columns,
+    }, fear_greed_df, merged_df)
+    return fear_greed_df, merged_df
+
+
+def _source_stats(paths):
+    """Return (size, mtime_ns) per source file, None for missing files"""
+    stats = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            stats.append((stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            stats.append(None)
+    return stats
+
+
+class DatasetHandle:
+    """
+    Process-wide, read-only holder of the loaded datasets.
+
+    The frames are never handed out directly: views() returns shallow
+    copies that share the column arrays, so each session can add columns
+    or filter freely while Copy-on-Write keeps the shared data unchanged.
+    is_stale() compares the source files' size and mtime with the ones seen
+    at load time, so callers can invalidate explicitly when they change.
+    """
+
+    def __init__(self, fear_greed_df, merged_df, source_paths, source_stats):
+        self._fear_greed_df = fear_greed_df
+        self._merged_df = merged_df
+        self._filter_index = None
+        self._day_index = None
+        self._cube = None
+        self.source_paths = tuple(source_paths)
+        self.source_stats = source_stats
+        self.loaded_at = time.time()
+
+    @classmethod
+    def load(cls, fear_greed_path=FEAR_GREED_PATH, historical_path=HISTORICAL_PATH,
+             snapshot_dir=SNAPSHOT_DIR):
+        """Load the datasets through the snapshot layer into a new handle"""
+        paths = (fear_greed_path, historical_path)
+        # Stat before loading so a write during the load shows up as stale
+        stats = _source_stats(paths)
+        fear_greed_df, merged_df = load_datasets(fear_greed_path, historical_path, snapshot_dir)
+        return cls(fear_greed_df, merged_df, paths, stats)
+
+    def is_stale(self):
+        """True when a source file changed on disk since the handle was loaded"""
+        return _source_stats(self.source_paths) != self.source_stats
+
+    @property
+    def filter_index(self):
+        """Bitmap index over merged_df's filter columns, built on first use"""
+        if self._filter_index is None:
+            self._filter_index = BitmapIndex(self._merged_df)
+        return self._filter_index
+
+    @property
+    def day_index(self):
+        """Day-boundary offset table of merged_df, built on first use"""
+        if self._day_index is None:
+            self._day_index = DayIndex(self._merged_df['Date'])
+        return self._day_index
+
+    @property
+    def cube(self):
+        """Pre-aggregated sentiment cube of merged_df, built on first use"""
+        if self._cube is None:
+            self._cube = SentimentCube(self._merged_df)
+        return self._cube
+
+    def views(self):
+        """Return zero-copy (fear_greed_df, merged_df) views for one session"""
+        return self._fear_greed_df.copy(deep=False), self._merged_df.copy(deep=False)
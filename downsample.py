@@ -0,0 +1,86 @@
+"""
+Downsampling of long time series for charts.
+
+A line chart cannot show more points than it has pixels, but Plotly ships
+and draws every point it is given. downsample() cuts a series to a point
+budget with Largest-Triangle-Three-Buckets (LTTB), which keeps the points
+that shape the line, and adds each bucket's minimum and maximum so spikes
+and troughs (such as the deepest drawdown) are never smoothed away. Gaps
+(NaN runs) stay gaps.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Default points per trace; a chart is rarely wider than this in pixels
+MAX_POINTS = 2000
+
+
+def _as_float(x):
+    """Numeric positions of `x` values (datetimes as nanoseconds)"""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x, y, n_buckets):
+    """
+    Positions of the points LTTB picks from finite (x, y) with `n_buckets`
+    interior buckets, plus each bucket's minimum and maximum; the first and
+    last points are always kept
+    """
+    n_points = len(y)
+    if n_points <= n_buckets + 2:
+        return np.arange(n_points)
+
+    # Interior points split into n_buckets nearly equal buckets
+    edges = 1 + np.arange(n_buckets + 1) * (n_points - 2) // n_buckets
+    mean_x = np.add.reduceat(x[1:-1], edges[:-1] - 1) / np.diff(edges)
+    mean_y = np.add.reduceat(y[1:-1], edges[:-1] - 1) / np.diff(edges)
+    mean_x = np.append(mean_x, x[-1])
+    mean_y = np.append(mean_y, y[-1])
+
+    picked = np.empty(n_buckets * 3 + 2, dtype=np.int64)
+    picked[0], picked[-1] = 0, n_points - 1
+    previous = 0
+    for bucket in range(n_buckets):
+        start, stop = edges[bucket], edges[bucket + 1]
+        # Triangle between the last pick, each candidate and the next bucket's mean
+        area = np.abs(
+            (x[previous] - mean_x[bucket + 1]) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (mean_y[bucket + 1] - y[previous])
+        )
+        previous = start + int(area.argmax())
+        picked[1 + 3 * bucket:4 + 3 * bucket] = (
+            previous, start + int(y[start:stop].argmin()), start + int(y[start:stop].argmax())
+        )
+    return np.unique(picked)
+
+
+def downsample_indices(x, y, max_points=MAX_POINTS):
+    """Sorted positions of the points of (x, y) to draw within `max_points`"""
+    y = np.asarray(y, dtype=np.float64)
+    if len(y) <= max_points:
+        return np.arange(len(y))
+    finite = np.isfinite(y)
+    positions = np.flatnonzero(finite)
+    # Keep one NaN at the start of each gap so the line still breaks there
+    gaps = np.flatnonzero(~finite & np.r_[True, finite[:-1]])
+    n_buckets = max((max_points - 2 - len(gaps)) // 3, 1)
+    kept = positions[lttb_indices(_as_float(x)[positions], y[positions], n_buckets)]
+    return np.union1d(kept, gaps)
+
+
+def downsample(x, y, max_points=MAX_POINTS):
+    """Return (x, y) cut to at most `max_points` points, keeping their types"""
+    positions = downsample_indices(x, y, max_points)
+    if len(positions) == len(y):
+        return x, y
+    return _take(x, positions), _take(y, positions)
+
+
+def _take(values, positions):
+    if isinstance(values, (pd.Series, pd.Index)):
+        return values.take(positions)
+    return np.asarray(values)[positions]
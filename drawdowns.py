@@ -0,0 +1,143 @@
+"""
+Drawdown episodes of daily cumulative P&L curves.
+
+A drawdown episode starts when a cumulative P&L curve falls below its
+running maximum (the peak), reaches its lowest point (the trough) and ends
+when the curve gets back to the peak (the recovery). find_drawdowns() builds
+one daily curve per segment (sentiment, Account, Coin, ...) from the trades,
+and drawdown_episodes() catalogues every episode of every curve at once:
+segments are laid out end to end and cumulative sums and maxima restart at
+each segment boundary, so no curve is ever rescanned.
+"""
+
+import numpy as np
+import pandas as pd
+
+from aggregation import group_codes
+from streaks import dominant_codes
+
+
+def drawdown_curve(pnl, starts=None):
+    """
+    Return (cumulative, running_max, drawdown) arrays for the P&L values
+    `pnl`. With `starts` (sorted positions where each segment begins), every
+    segment is its own curve.
+    """
+    pnl = np.nan_to_num(np.asarray(pnl, dtype=np.float64))
+    starts = np.zeros(min(len(pnl), 1), dtype=np.int64) if starts is None else np.asarray(starts)
+    cumulative = np.cumsum(pnl)
+    if len(pnl) == 0:
+        return cumulative, cumulative.copy(), cumulative.copy()
+    lengths = np.diff(np.append(starts, len(pnl)))
+    if len(starts) > 1:
+        # Restart the sum at each segment by removing what came before it
+        cumulative -= np.repeat(np.append(0.0, cumulative[starts[1:] - 1]), lengths)
+
+    if len(starts) == 1:
+        running_max = np.maximum.accumulate(cumulative)
+    else:
+        # Lift each segment above all earlier ones so a single running maximum
+        # restarts at every segment boundary
+        shifted = cumulative + np.repeat(np.arange(len(starts)) * (np.ptp(cumulative) + 1), lengths)
+        record = shifted == np.maximum.accumulate(shifted)
+        # Read the maximum back from the day that set it, so no offset rounding remains
+        running_max = cumulative[np.maximum.accumulate(np.where(record, np.arange(len(pnl)), 0))]
+    return cumulative, running_max, cumulative - running_max
+
+
+def drawdown_episodes(pnl, dates, starts=None, sentiment=None):
+    """
+    Catalogue every drawdown episode of the daily P&L curve(s) `pnl`, one
+    row per episode in curve order. `dates` are the days of the values,
+    `starts` the segment starts as for drawdown_curve() and `sentiment` an
+    optional Categorical of each day's sentiment, reported at the trough.
+    The peak and trough columns are positions in `pnl`.
+    """
+    cumulative, running_max, drawdown = drawdown_curve(pnl, starts)
+    n_days = len(drawdown)
+    dates = pd.DatetimeIndex(dates)
+    starts = np.zeros(min(n_days, 1), dtype=np.int64) if starts is None else np.asarray(starts)
+    segment_stops = np.append(starts[1:], n_days)
+
+    # Episodes are runs of days below the running maximum. A segment's first
+    # day is its own maximum, so every run has its peak on the previous day.
+    underwater = drawdown < 0
+    edges = np.diff(np.r_[False, underwater, False].astype(np.int8))
+    run_starts = np.flatnonzero(edges == 1)
+    run_stops = np.flatnonzero(edges == -1)
+
+    # Trough: the first day of each run at the run's deepest drawdown
+    run_ids = np.repeat(np.arange(len(run_starts)), run_stops - run_starts)
+    days = np.flatnonzero(underwater)
+    depth = np.minimum.reduceat(drawdown, run_starts) if len(run_starts) else drawdown[:0]
+    at_depth = drawdown[days] == depth[run_ids]
+    troughs = np.full(len(run_starts), n_days)
+    np.minimum.at(troughs, run_ids[at_depth], days[at_depth])
+
+    # A run ends at its recovery day unless it reaches the end of its segment
+    peaks = run_starts - 1
+    segment_stop = segment_stops[np.searchsorted(segment_stops, run_starts, side='right')]
+    recovered = run_stops < segment_stop
+    last_day = np.where(recovered, run_stops, segment_stop - 1)
+    peak_value = running_max[troughs]
+
+    episodes = pd.DataFrame({
+        'peak': peaks,
+        'trough': troughs,
+        'peak_date': dates[peaks],
+        'trough_date': dates[troughs],
+        'recovery_date': dates[last_day].where(recovered),
+        'peak_pnl': peak_value,
+        'trough_pnl': cumulative[troughs],
+        'depth': depth,
+        'depth_pct': depth / np.where(peak_value != 0, peak_value, np.nan) * 100,
+        # Days from the peak to the recovery, or to the last day if still underwater
+        'duration_days': (dates[last_day] - dates[peaks]).days,
+        'recovery_days': (dates[last_day] - dates[troughs]).days.where(recovered),
+        'recovered': recovered,
+    })
+    if sentiment is not None:
+        episodes['trough_sentiment'] = pd.Categorical(sentiment).take(troughs)
+    return episodes
+
+
+def find_drawdowns(df, by=None, value='Net_PnL', date_column='Date', category='sentiment_category'):
+    """
+    Daily drawdown episodes of the trades in `df`. The trades' `value` is
+    summed per day into one cumulative curve, or one curve per group of
+    `by` (column names) whose keys are added to the result. The sentiment
+    at the trough is the most frequent `category` of the trough day.
+    """
+    keys = [] if by is None else ([by] if isinstance(by, str) else list(by))
+    days, n_days, index = group_codes(df, keys + [date_column])
+    valid = days < n_days
+    days = days[valid]
+    values = df[value].to_numpy(dtype=np.float64)[valid]
+    pnl = np.bincount(days, weights=np.where(np.isnan(values), 0.0, values), minlength=n_days)
+
+    changes = np.zeros(min(n_days, 1), dtype=np.int64)
+    dates = index
+    if keys:
+        # Days are ordered by group first, so each group is a contiguous segment
+        group_levels = np.array(index.codes[:-1])
+        changes = np.flatnonzero(np.r_[n_days > 0, (np.diff(group_levels, axis=1) != 0).any(axis=0)])
+        dates = index.get_level_values(date_column)
+    episodes = drawdown_episodes(pnl, dates, changes)
+
+    # Sentiment of the trough days, counted over their trades only
+    troughs = np.full(n_days, -1)
+    troughs[episodes['trough'].to_numpy()] = np.arange(len(episodes))
+    trough_of_row = troughs[days]
+    at_trough = trough_of_row >= 0
+    categories = pd.Categorical(df[category])
+    episodes['trough_sentiment'] = pd.Categorical.from_codes(
+        dominant_codes(trough_of_row[at_trough], categories.codes.astype(np.int64)[valid][at_trough],
+                       len(episodes), len(categories.categories)),
+        dtype=categories.dtype)
+
+    if keys:
+        labels = index.droplevel(date_column).take(episodes['peak'].to_numpy())
+        for position, key in enumerate(keys):
+            level = labels if len(keys) == 1 else labels.get_level_values(key)
+            episodes.insert(position, key, level)
+    return episodes
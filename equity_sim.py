@@ -0,0 +1,161 @@
+"""
+Monte Carlo equity curves and risk of ruin.
+
+simulate_equity() bootstraps the realized trade sequence into synthetic
+equity curves: each path strings together blocks of consecutive trades
+(block_size 1 is a plain bootstrap; longer blocks keep win/loss streaks
+intact), with each block's sentiment regime drawn from a chosen regime mix.
+Every path then yields its final equity, maximum drawdown, the trades it
+took to recover from that drawdown and whether equity hit the ruin level.
+
+Paths are simulated in chunks of at most CHUNK_ELEMENTS trades, each chunk
+with its own seed, and only the per-path results are kept, so memory stays
+bounded however many paths are asked for. Large simulations spread the
+chunks over a thread pool that reads the trades in place, with the same
+result as running them one by one.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from task_pool import task_pool
+
+# Simulated trades (paths x trades) per chunk, about 8 MB per float64 matrix
+CHUNK_ELEMENTS = 1 << 20
+
+# Simulated trades (paths x trades, all chunks) from which a thread pool pays off
+PARALLEL_ELEMENTS = 1 << 24
+
+PATH_COLUMNS = ['final_equity', 'max_drawdown', 'max_drawdown_pct', 'recovery_trades', 'ruined']
+
+
+def _path_indices(rng, n_paths, n_trades, block_size, offsets, lengths, mix):
+    """(paths x trades) positions into the regime-ordered trades, block by block"""
+    n_blocks = -(-n_trades // block_size)
+    regimes = rng.choice(len(mix), size=(n_paths, n_blocks), p=mix)
+    # Blocks wrap around the end of their regime's trades (circular block bootstrap)
+    regime_lengths = lengths[regimes]
+    starts = (rng.random((n_paths, n_blocks)) * regime_lengths).astype(np.int64)
+    positions = starts[..., None] + np.arange(block_size)
+    positions %= regime_lengths[..., None]
+    positions += offsets[regimes][..., None]
+    return positions.reshape(n_paths, n_blocks * block_size)[:, :n_trades]
+
+
+def _path_results(equity, capital, ruin_level):
+    """PATH_COLUMNS arrays of a (paths x trades) equity matrix starting from `capital`"""
+    n_paths, n_trades = equity.shape
+    # Running peak (never below the starting capital), turned into the drawdown in place
+    drawdown = np.maximum.accumulate(equity, axis=1)
+    np.maximum(drawdown, capital, out=drawdown)
+    np.subtract(drawdown, equity, out=drawdown)
+    trough = drawdown.argmax(axis=1)
+    rows = np.arange(n_paths)
+    max_drawdown = drawdown[rows, trough]
+    peak = equity[rows, trough] + max_drawdown
+    del drawdown
+
+    # First trade after the trough that is back at the peak before it
+    recovered = (equity >= peak[:, None]) & (np.arange(n_trades) > trough[:, None])
+    recovery = recovered.argmax(axis=1)
+    recovery_trades = np.where(recovered[rows, recovery] & (max_drawdown > 0),
+                               recovery - trough, np.nan)
+    recovery_trades[max_drawdown == 0] = 0
+
+    return {
+        'final_equity': equity[:, -1].copy(),
+        'max_drawdown': max_drawdown,
+        'max_drawdown_pct': max_drawdown / peak * 100,
+        'recovery_trades': recovery_trades,
+        'ruined': equity.min(axis=1) <= ruin_level,
+    }
+
+
+def _simulate_chunk(pnl, offsets, lengths, mix, n_trades, block_size, capital, ruin_level,
+                    n_paths, keep_paths, seed):
+    """
+    Return (PATH_COLUMNS arrays, first `keep_paths` equity curves) of one
+    chunk of `n_paths` paths drawn from the regime-ordered trades `pnl`
+    """
+    rng = np.random.Generator(np.random.SFC64(seed))
+    positions = _path_indices(rng, n_paths, n_trades, block_size, offsets, lengths, mix)
+    equity = pnl[positions]
+    del positions
+    np.cumsum(equity, axis=1, out=equity)
+    equity += capital
+    return _path_results(equity, capital, ruin_level), equity[:keep_paths].copy()
+
+
+def simulate_equity(pnl, regimes, n_trades=1000, n_paths=10_000, block_size=1, mix=None,
+                    capital=10_000, ruin_level=0, seed=42, keep_paths=0, workers=None):
+    """
+    Simulate `n_paths` equity curves of `n_trades` trades each from the
+    trade PnL `pnl` (in time order) and each trade's regime in `regimes`.
+    `mix` maps regime to weight (default: the regimes' share of trades).
+    Returns (DataFrame of PATH_COLUMNS, one row per path; array of the
+    first `keep_paths` equity curves, starting at `capital`). `workers`
+    caps the thread pool (default: CPU count), used only for large
+    simulations.
+    """
+    if capital <= ruin_level:
+        raise ValueError(f"Starting capital {capital} must be above the ruin level {ruin_level}")
+    pnl = np.asarray(pnl, dtype=np.float64)
+    groups = pd.Categorical(regimes)
+    valid = ~np.isnan(pnl) & (groups.codes >= 0)
+    codes = groups.codes[valid]
+    pnl = pnl[valid]
+
+    # Trades grouped by regime, keeping time order within each regime
+    order = np.argsort(codes, kind='stable')
+    pnl = pnl[order]
+    lengths = np.bincount(codes, minlength=len(groups.categories))
+    offsets = np.cumsum(lengths) - lengths
+
+    weights = lengths.astype(np.float64) if mix is None else np.array(
+        [mix.get(label, 0) for label in groups.categories], dtype=np.float64
+    )
+    weights[lengths == 0] = 0
+    if weights.sum() <= 0:
+        raise ValueError("The regime mix needs a positive weight on a regime with trades")
+    weights /= weights.sum()
+
+    # One task per chunk: its path count, how many of its curves to keep and its seed
+    chunk_paths = max(1, CHUNK_ELEMENTS // n_trades)
+    n_chunks = -(-n_paths // chunk_paths)
+    tasks = []
+    for chunk, chunk_seed in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        first = chunk * chunk_paths
+        size = min(chunk_paths, n_paths - first)
+        tasks.append((size, min(max(keep_paths - first, 0), size), chunk_seed))
+
+    def run_task(task):
+        return _simulate_chunk(pnl, offsets, lengths, weights, n_trades, block_size, capital,
+                               ruin_level, *task)
+
+    workers = min(workers or os.cpu_count() or 1, n_chunks)
+    if workers > 1 and n_paths * n_trades >= PARALLEL_ELEMENTS:
+        with task_pool(workers) as pool:
+            chunks = list(pool.map(run_task, tasks))
+    else:
+        chunks = [run_task(task) for task in tasks]
+
+    paths = pd.DataFrame({
+        column: np.concatenate([results[column] for results, _ in chunks]) for column in PATH_COLUMNS
+    })
+    kept = np.concatenate([curves for _, curves in chunks])
+    curves = np.column_stack([np.full(len(kept), float(capital)), kept])
+    return paths, curves
+
+
+def ruin_summary(paths):
+    """Headline figures of simulate_equity() paths as a Series"""
+    return pd.Series({
+        'probability_of_ruin': paths['ruined'].mean(),
+        'median_max_drawdown': paths['max_drawdown'].median(),
+        'p95_max_drawdown': paths['max_drawdown'].quantile(0.95),
+        'median_recovery_trades': paths['recovery_trades'].median(),
+        'unrecovered_share': paths['recovery_trades'].isna().mean(),
+        'median_final_equity': paths['final_equity'].median(),
+    })
@@ -0,0 +1,75 @@
+"""
+Cache of built Plotly figures.
+
+Streamlit reruns the whole script on every interaction, rebuilding every
+figure on the page even when only one chart's widget changed. A chart's
+figure depends only on the dataset, the filter state and the chart's own
+widgets, so FigureCache keeps each built figure under a fingerprint of
+exactly those and rebuilds it only when one of them changes. A hit hands
+back the same figure object, so nothing is parsed again. Entries are
+evicted least recently used first once their total size, measured as the
+length of their JSON when stored, passes a byte budget.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+# Total JSON size of the cached figures, shared by every session of the process
+MAX_BYTES = 256 * 1024 * 1024
+
+
+def fingerprint(chart_id, *parts):
+    """Stable key of a chart and the values its figure depends on"""
+    return hashlib.blake2b(repr((chart_id,) + parts).encode(), digest_size=16).hexdigest()
+
+
+class FigureCache:
+    """Figures by fingerprint, evicting the least recently used beyond `max_bytes`"""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        # Sessions run in threads of one process and share the cache
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """Figure cached under `key` (now the most recently used), or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, figure, size):
+        """Store `figure` of JSON length `size` under `key`, evicting old entries to stay within max_bytes"""
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.nbytes -= self.entries.pop(key)[1]
+            self.entries[key] = (figure, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def figure(self, key, build):
+        """The figure cached under `key`, or build() it and cache it"""
+        figure = self.get(key)
+        if figure is not None:
+            return figure
+        figure = build()
+        self.put(key, figure, len(pio.to_json(figure, validate=False)))
+        return figure
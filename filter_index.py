@@ -0,0 +1,157 @@
+"""
+Bitmap index over the dashboard's filter dimensions.
+
+Every value of an indexed column gets a bitset with one bit per row of
+merged_df, packed into uint64 words. A sidebar selection is resolved by
+OR-ing the bitsets of the selected values within each dimension and AND-ing
+the dimensions together; the rows are then taken from merged_df once, so
+no intermediate DataFrame is built per filter.
+
+merged_df is kept sorted by trade time, so DayIndex maps each calendar day
+to a contiguous block of rows and a date range becomes a row range found
+with searchsorted.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Columns indexed by default; all are low-cardinality categoricals or bools
+INDEXED_COLUMNS = ['sentiment_category', 'Side', 'is_profitable', 'Trading_Session', 'Coin']
+
+WORD_BITS = 64
+
+
+def _n_words(n_rows):
+    return (n_rows + WORD_BITS - 1) // WORD_BITS
+
+
+def bitmap_from_mask(mask):
+    """Pack a boolean row mask into a uint64 bitset"""
+    mask = np.asarray(mask, dtype=bool)
+    packed = np.packbits(mask, bitorder='little')
+    words = np.zeros(_n_words(len(mask)) * 8, dtype=np.uint8)
+    words[:len(packed)] = packed
+    return words.view('<u8')
+
+
+def bitmap_from_positions(positions, n_rows):
+    """Build a bitset with the bits of the given sorted row positions set"""
+    words = np.zeros(_n_words(n_rows), dtype=np.uint64)
+    if len(positions):
+        positions = np.asarray(positions, dtype=np.int64)
+        word = positions >> 6
+        bits = np.left_shift(np.uint64(1), (positions & 63).astype(np.uint64))
+        # Positions are sorted, so the bits of one word are contiguous
+        starts = np.flatnonzero(np.r_[True, word[1:] != word[:-1]])
+        words[word[starts]] = np.bitwise_or.reduceat(bits, starts)
+    return words
+
+
+def bitmap_from_range(start, stop, n_rows):
+    """Build a bitset selecting the contiguous rows start:stop"""
+    words = np.zeros(_n_words(n_rows), dtype=np.uint64)
+    if stop > start:
+        first, last = start // WORD_BITS, (stop - 1) // WORD_BITS
+        words[first:last + 1] = np.uint64(0xFFFFFFFFFFFFFFFF)
+        words[first] &= np.uint64(0xFFFFFFFFFFFFFFFF) << np.uint64(start % WORD_BITS)
+        words[last] &= np.uint64(0xFFFFFFFFFFFFFFFF) >> np.uint64(WORD_BITS - 1 - (stop - 1) % WORD_BITS)
+    return words
+
+
+class BitmapIndex:
+    """
+    Per-value bitsets for the filter columns of one DataFrame.
+
+    The index refers to rows by position, so it is only valid for the frame
+    it was built from (or views sharing its row order).
+    """
+
+    def __init__(self, df, columns=INDEXED_COLUMNS):
+        self.n_rows = len(df)
+        self.bitmaps = {}
+        for column in columns:
+            if column in df.columns:
+                self.bitmaps[column] = self._build(df[column])
+
+    def _build(self, series):
+        """Return {value: bitset} for one column with a single stable sort"""
+        categories = pd.Categorical(series)
+        codes = categories.codes
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(categories.categories) + 1))
+        return {
+            value: bitmap_from_positions(order[bounds[code]:bounds[code + 1]], self.n_rows)
+            for code, value in enumerate(categories.categories)
+        }
+
+    def all_rows(self):
+        """Bitset selecting every row"""
+        return bitmap_from_mask(np.ones(self.n_rows, dtype=bool))
+
+    def bitmap(self, column, values):
+        """Bitset of the rows whose `column` is any of `values` (OR)"""
+        result = np.zeros(_n_words(self.n_rows), dtype=np.uint64)
+        for value in values:
+            bitmap = self.bitmaps[column].get(value)
+            if bitmap is not None:
+                np.bitwise_or(result, bitmap, out=result)
+        return result
+
+    def select(self, selections, base=None):
+        """
+        Combine {column: selected values} into one bitset (AND across
+        columns), optionally restricted to a `base` bitset. Columns whose
+        selection covers every indexed value are skipped.
+        """
+        result = self.all_rows() if base is None else base.copy()
+        for column, values in selections.items():
+            if set(self.bitmaps[column]) <= set(values):
+                continue
+            np.bitwise_and(result, self.bitmap(column, values), out=result)
+        return result
+
+    def rows(self, bitmap):
+        """Sorted row positions selected by a bitset"""
+        bits = np.unpackbits(bitmap.view(np.uint8), bitorder='little', count=self.n_rows)
+        return np.flatnonzero(bits)
+
+
+class DayIndex:
+    """
+    Day-boundary offset table of a frame sorted by date: days[i] is the
+    i-th distinct day (days since epoch) and its rows are
+    offsets[i]:offsets[i + 1].
+    """
+
+    def __init__(self, dates):
+        days = np.asarray(dates, dtype='datetime64[ns]').astype('datetime64[D]').view(np.int64)
+        if len(days) and (np.diff(days) < 0).any():
+            raise ValueError("DayIndex needs rows sorted by date")
+        starts = np.flatnonzero(np.r_[len(days) > 0, days[1:] != days[:-1]])
+        self.days = days[starts]
+        self.offsets = np.append(starts, len(days))
+
+    @property
+    def first_date(self):
+        """Earliest day as a datetime.date"""
+        return self.days[0].astype('datetime64[D]').item()
+
+    @property
+    def last_date(self):
+        """Latest day as a datetime.date"""
+        return self.days[-1].astype('datetime64[D]').item()
+
+    def row_range(self, start_date, end_date):
+        """Return (start, stop) of the rows dated start_date..end_date inclusive"""
+        first = np.searchsorted(self.days, np.datetime64(start_date, 'D').astype(np.int64), side='left')
+        last = np.searchsorted(self.days, np.datetime64(end_date, 'D').astype(np.int64), side='right')
+        return int(self.offsets[first]), int(self.offsets[max(last, first)])
+
+    def day_count(self, rows=None):
+        """Number of distinct days among the sorted row positions `rows` (all rows if None)"""
+        if rows is None:
+            return len(self.days)
+        if len(rows) == 0:
+            return 0
+        day_ids = np.searchsorted(self.offsets, rows, side='right') - 1
+        return int(np.count_nonzero(day_ids[1:] != day_ids[:-1])) + 1
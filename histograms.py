@@ -0,0 +1,65 @@
+"""
+Histogram binning on the server.
+
+go.Histogram ships every value to the browser and bins it there, so the
+payload grows with the data. histograms() picks bin edges once (Freedman-
+Diaconis by default, or a fixed bin count), counts each series into the
+same edges with np.histogram, and returns one row per bin, ready to draw
+as go.Bar. Integer data such as streak lengths gets whole-number bins
+centred on the integers.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Upper bound on the bin count, however small the Freedman-Diaconis width
+MAX_BINS = 200
+
+
+def bin_edges(values, bins='fd', integer=False, max_bins=MAX_BINS):
+    """
+    Bin edges for `values`: 'fd' for the Freedman-Diaconis width
+    (2 IQR / n^(1/3), Sturges' rule when the IQR is 0) or a bin count
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return np.array([0.0, 1.0])
+    low, high = values.min(), values.max()
+    if bins == 'fd':
+        q1, q3 = np.quantile(values, [0.25, 0.75])
+        width = 2 * (q3 - q1) / np.cbrt(len(values))
+        n_bins = int(np.ceil((high - low) / width)) if width > 0 else int(np.ceil(np.log2(len(values)))) + 1
+    else:
+        n_bins = int(bins)
+    n_bins = min(max(n_bins, 1), max_bins)
+
+    if integer:
+        # Whole-number widths, with each integer in the middle of its bin
+        n_values = int(high - low) + 1
+        width = -(-n_values // n_bins)
+        return low - 0.5 + width * np.arange(-(-n_values // width) + 1)
+    if high == low:
+        low, high = low - 0.5, high + 0.5
+    return np.linspace(low, high, n_bins + 1)
+
+
+def histograms(series, bins='fd', integer=False, max_bins=MAX_BINS):
+    """
+    Counts of each array in `series` ({name: values}) over shared bin
+    edges chosen from all of them: one row per bin with left, right,
+    center and width columns and one count column per name
+    """
+    arrays = {name: np.asarray(values, dtype=np.float64) for name, values in series.items()}
+    pooled = np.concatenate([values for values in arrays.values()] or [np.empty(0)])
+    edges = bin_edges(pooled, bins, integer, max_bins)
+
+    table = pd.DataFrame({
+        'left': edges[:-1],
+        'right': edges[1:],
+        'center': (edges[:-1] + edges[1:]) / 2,
+        'width': np.diff(edges),
+    })
+    for name, values in arrays.items():
+        table[name] = np.histogram(values[np.isfinite(values)], edges)[0]
+    return table
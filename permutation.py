@@ -0,0 +1,114 @@
+"""
+Permutation tests of between-group differences.
+
+A permutation test shuffles the group labels against the values many times
+and reports how often a shuffled between-group statistic is at least as
+large as the observed one, without the large-sample approximations of the
+F and chi-square distributions. For one-way ANOVA (on values) and
+Kruskal-Wallis (on ranks) the total sum of squares is the same under every
+shuffle, so both tests reduce to the statistic sum(S_g^2 / n_g) of the
+group sums S_g.
+
+Permutations run in batches: a (permutations x values) matrix is shuffled
+row by row, and with the groups laid out as contiguous blocks one
+np.add.reduceat gives every permutation's group sums. Batches form tasks
+with their own seeds, tasks can be spread over a thread pool (every task
+reads the same values in place; a task is only a count and a seed), and
+the test stops once the p-value is known to the requested precision.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from task_pool import task_pool
+
+# Permutations per task; tasks are the unit of seeding, parallel work and early stopping
+PERMUTATIONS_PER_TASK = 100
+
+# Shuffled matrix elements per batch (permutations x values), about 32 MB
+BATCH_ELEMENTS = 1 << 22
+
+# Values from which spreading tasks over a thread pool pays off
+PARALLEL_VALUES = 100_000
+
+# Shuffled statistics within this relative distance of the observed one count as ties
+TIE_TOLERANCE = 1e-12
+
+
+def between_group_statistic(sums, n):
+    """sum(S_g^2 / n_g) over the last axis of the group sums"""
+    return (sums * sums / n).sum(axis=-1)
+
+
+def _permuted_statistics(values, starts, n, n_permutations, seed):
+    """Between-group statistic of `n_permutations` shuffles of `values`"""
+    rng = np.random.Generator(np.random.SFC64(seed))
+    statistics = np.empty(n_permutations)
+    batch = max(1, min(n_permutations, BATCH_ELEMENTS // max(len(values), 1)))
+    shuffled = np.empty((batch, len(values)))
+    for start in range(0, n_permutations, batch):
+        stop = min(start + batch, n_permutations)
+        rows = shuffled[:stop - start]
+        rows[:] = values
+        rng.permuted(rows, axis=1, out=rows)
+        statistics[start:stop] = between_group_statistic(np.add.reduceat(rows, starts, axis=1), n)
+    return statistics
+
+
+def permutation_test(values, groups, max_permutations=10_000, precision=0.005, seed=42, workers=None):
+    """
+    Permutation p-value of the between-group statistic of `values` split
+    by `groups` (pass ranks for Kruskal-Wallis). Missing values and values
+    without a group are left out. Permutations stop at `max_permutations`,
+    or earlier once the p-value's standard error is at most `precision`.
+    Returns (p_value, n_permutations, standard_error).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    codes = pd.Categorical(groups).codes
+    valid = ~np.isnan(values) & (codes >= 0)
+    values, codes = values[valid], codes[valid]
+
+    # Lay the groups out as contiguous blocks
+    order = np.argsort(codes, kind='stable')
+    values, codes = values[order], codes[order]
+    starts = np.flatnonzero(np.r_[len(codes) > 0, codes[1:] != codes[:-1]])
+    n = np.diff(np.append(starts, len(values))).astype(np.float64)
+    if len(starts) < 2:
+        return np.nan, 0, np.nan
+
+    observed = between_group_statistic(np.add.reduceat(values, starts), n)
+    threshold = observed * (1 - TIE_TOLERANCE)
+
+    n_tasks = -(-max_permutations // PERMUTATIONS_PER_TASK)
+    seeds = np.random.SeedSequence(seed).spawn(n_tasks)
+    tasks = [
+        (min(PERMUTATIONS_PER_TASK, max_permutations - task * PERMUTATIONS_PER_TASK), task_seed)
+        for task, task_seed in enumerate(seeds)
+    ]
+
+    def run_task(task):
+        return _permuted_statistics(values, starts, n, *task)
+
+    workers = min(workers or os.cpu_count() or 1, n_tasks)
+    pool = task_pool(workers) if workers > 1 and len(values) >= PARALLEL_VALUES else None
+    done = extreme = 0
+    p_value = std_error = np.nan
+    try:
+        # Results are taken in task order and the stopping rule is checked after
+        # each task, so the answer does not depend on the number of workers
+        for round_start in range(0, n_tasks, workers if pool else 1):
+            round_tasks = tasks[round_start:round_start + (workers if pool else 1)]
+            results = pool.map(run_task, round_tasks) if pool else map(run_task, round_tasks)
+            for statistics in results:
+                done += len(statistics)
+                extreme += int(np.count_nonzero(statistics >= threshold))
+                p_value = (extreme + 1) / (done + 1)
+                std_error = np.sqrt(p_value * (1 - p_value) / done)
+                if std_error <= precision:
+                    return p_value, done, std_error
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+    return p_value, done, std_error
@@ -0,0 +1,133 @@
+"""
+All-pairs post-hoc tests between sentiment groups.
+
+After an omnibus test (ANOVA, Kruskal-Wallis) finds a difference, the
+post-hoc tests say which pairs of groups differ. posthoc_table() runs
+Mann-Whitney U, Welch's t and Dunn's z for every pair at once: the rank
+tests come from the shared ranking in a RankTests, and Welch's t from each
+group's count, mean and variance, so no test rescans the trades. The p-values
+of each test are then corrected for the number of pairs with Holm or
+Benjamini-Hochberg.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+from significance import mann_whitney_p
+
+POSTHOC_TESTS = {
+    'Mann-Whitney U': 'mann_whitney',
+    "Welch's t": 'welch',
+    "Dunn's z": 'dunn',
+}
+
+
+# =============================================================================
+# MULTIPLE-COMPARISON CORRECTIONS
+# =============================================================================
+
+def holm(p_values):
+    """Holm step-down adjusted p-values (NaN p-values are left out and kept)"""
+    p_values = np.asarray(p_values, dtype=np.float64)
+    adjusted = np.full_like(p_values, np.nan)
+    tested = np.flatnonzero(~np.isnan(p_values))
+    order = tested[np.argsort(p_values[tested], kind='stable')]
+    m = len(order)
+    scaled = (m - np.arange(m)) * p_values[order]
+    adjusted[order] = np.minimum(np.maximum.accumulate(scaled), 1.0)
+    return adjusted
+
+
+def benjamini_hochberg(p_values):
+    """Benjamini-Hochberg (false discovery rate) adjusted p-values"""
+    p_values = np.asarray(p_values, dtype=np.float64)
+    adjusted = np.full_like(p_values, np.nan)
+    tested = np.flatnonzero(~np.isnan(p_values))
+    order = tested[np.argsort(p_values[tested], kind='stable')]
+    m = len(order)
+    scaled = m / np.arange(1, m + 1) * p_values[order]
+    adjusted[order] = np.minimum(np.minimum.accumulate(scaled[::-1])[::-1], 1.0)
+    return adjusted
+
+
+CORRECTIONS = {
+    'Holm': holm,
+    'Benjamini-Hochberg': benjamini_hochberg,
+}
+
+
+# =============================================================================
+# PAIRWISE TESTS
+# =============================================================================
+
+def welch_t(n, mean, var):
+    """
+    Return (t, df, p) matrices of Welch's unequal-variance t test for every
+    pair of groups, as scipy.stats.ttest_ind(equal_var=False)
+    """
+    n, mean, var = (np.asarray(values, dtype=np.float64) for values in (n, mean, var))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        spread = var / n
+        pair_spread = spread[:, None] + spread[None, :]
+        t_stat = (mean[:, None] - mean[None, :]) / np.sqrt(pair_spread)
+        dof = pair_spread ** 2 / (
+            (spread ** 2 / (n - 1))[:, None] + (spread ** 2 / (n - 1))[None, :]
+        )
+        p_value = 2 * special.stdtr(dof, -np.abs(t_stat))
+    return t_stat, dof, p_value
+
+
+def dunn_z(rank_tests):
+    """Return (z, p) matrices of Dunn's test on the shared ranks, with tie correction"""
+    n_values, n = rank_tests.n_values, rank_tests.n
+    mean_ranks = rank_tests.rank_sums / n
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = n_values * (n_values + 1) / 12 - rank_tests.tie_term() / (12 * (n_values - 1))
+        z = (mean_ranks[:, None] - mean_ranks[None, :]) / np.sqrt(variance * (1 / n[:, None] + 1 / n[None, :]))
+    return z, 2 * special.ndtr(-np.abs(z))
+
+
+def posthoc_table(rank_tests, n, mean, var, correction='Holm'):
+    """
+    Every pair of the groups in `rank_tests` (in label order) with the
+    Mann-Whitney U, Welch's t and Dunn's z statistics, their p-values and
+    the p-values adjusted by `correction` within each test. `n`, `mean`
+    and `var` are the groups' value statistics in the same order.
+    """
+    first, second = np.triu_indices(len(rank_tests.labels), k=1)
+
+    u_stat = rank_tests.u_matrix()[first, second]
+    u_p = mann_whitney_p(u_stat, rank_tests.n[first], rank_tests.n[second],
+                         rank_tests.pair_tie_terms()[first, second])
+    for pair, (i, j) in enumerate(zip(first, second)):
+        if min(rank_tests.n[i], rank_tests.n[j]) <= 8:
+            # Tiny samples: let RankTests pick scipy's exact test where it applies
+            u_stat[pair], u_p[pair] = rank_tests.mann_whitney(rank_tests.labels[i], rank_tests.labels[j])
+
+    t_stat, t_dof, t_p = welch_t(n, mean, var)
+    z_stat, z_p = dunn_z(rank_tests)
+
+    labels = np.array(rank_tests.labels, dtype=object)
+    table = pd.DataFrame({
+        'group_1': labels[first],
+        'group_2': labels[second],
+        'mann_whitney_U': u_stat,
+        'mann_whitney_p': u_p,
+        'welch_t': t_stat[first, second],
+        'welch_df': t_dof[first, second],
+        'welch_p': t_p[first, second],
+        'dunn_z': z_stat[first, second],
+        'dunn_p': z_p[first, second],
+    })
+    for test in POSTHOC_TESTS.values():
+        table[f'{test}_p_adj'] = CORRECTIONS[correction](table[f'{test}_p'])
+    return table
+
+
+def p_value_matrix(table, column, labels):
+    """Square, symmetric matrix of one p-value column of a posthoc_table"""
+    matrix = pd.DataFrame(np.nan, index=labels, columns=labels)
+    for group_1, group_2, p_value in zip(table['group_1'], table['group_2'], table[column]):
+        matrix.loc[group_1, group_2] = matrix.loc[group_2, group_1] = p_value
+    return matrix
@@ -0,0 +1,88 @@
+"""
+Rolling statistics of a series for any window size, from prefix sums.
+
+RollingStats stores the running count, sum and sum of squares of a series
+once. The sum over any window is then the difference of two prefix values,
+so rolling mean, standard deviation, Sharpe ratio and z-score for a new
+window size are a pair of array lookups per point rather than another
+pandas rolling() pass.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Largest window offered by the dashboard, in days
+MAX_WINDOW = 365
+
+
+class RollingStats:
+    """Prefix sums of one series, answering rolling statistics for any window"""
+
+    def __init__(self, values, index=None):
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        self.values = values
+        self.index = index
+        # Centering on the overall mean keeps the prefix sums of squares small,
+        # so window variances do not cancel out in floating point
+        self.shift = values[valid].mean() if valid.any() else 0.0
+        centered = np.where(valid, values - self.shift, 0.0)
+        self.count = np.r_[0, np.cumsum(valid)]
+        self.sum = np.r_[0.0, np.cumsum(centered)]
+        self.sumsq = np.r_[0.0, np.cumsum(centered * centered)]
+        # (mean, std) per window size already asked for
+        self.moments = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def _moments(self, window):
+        """Return (mean, std) arrays of the window ending at each point"""
+        if window < 1:
+            raise ValueError(f"Window must be at least 1, got {window}")
+        if window not in self.moments:
+            self.moments[window] = self._compute_moments(window)
+        return self.moments[window]
+
+    def _compute_moments(self, window):
+        n_points = len(self.values)
+        mean = np.full(n_points, np.nan)
+        std = np.full(n_points, np.nan)
+        if window > n_points:
+            return mean, std
+
+        # Window sums are differences of prefix sums window apart
+        count = self.count[window:] - self.count[:-window]
+        total = self.sum[window:] - self.sum[:-window]
+        squares = self.sumsq[window:] - self.sumsq[:-window]
+        # Like rolling(window), only windows of `window` valid values count
+        full = count == window
+        window_mean = total / window
+        mean[window - 1:] = np.where(full, window_mean + self.shift, np.nan)
+        if window > 1:
+            variance = np.maximum(squares - total * window_mean, 0) / (window - 1)
+            std[window - 1:] = np.where(full, np.sqrt(variance), np.nan)
+        return mean, std
+
+    def _series(self, values):
+        return pd.Series(values, index=self.index)
+
+    def mean(self, window):
+        """Rolling mean, as Series.rolling(window).mean()"""
+        return self._series(self._moments(window)[0])
+
+    def std(self, window):
+        """Rolling sample standard deviation, as Series.rolling(window).std()"""
+        return self._series(self._moments(window)[1])
+
+    def sharpe(self, window):
+        """Rolling mean over rolling standard deviation (not annualized)"""
+        mean, std = self._moments(window)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._series(np.where(std > 0, mean / std, np.nan))
+
+    def zscore(self, window):
+        """Distance of each point from its window's mean, in window standard deviations"""
+        mean, std = self._moments(window)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._series(np.where(std > 0, (self.values - mean) / std, np.nan))
@@ -0,0 +1,201 @@
+"""
+Pre-aggregated OLAP cube over the merged trades.
+
+Trades are aggregated once into cells keyed by (Date, sentiment_category,
+Side, Trading_Session, Hour, is_profitable). Each cell stores the trade
+count, the winning trade count and, for Net_PnL, Size USD and Fee, the
+non-null count, sum, sum of squares, min and max. All of these combine
+across cells, so any dashboard groupby over the cube dimensions is answered
+by selecting and rolling up cells instead of scanning trades.
+"""
+
+import numpy as np
+import pandas as pd
+
+CUBE_DIMENSIONS = ['Date', 'sentiment_category', 'Side', 'Trading_Session', 'Hour', 'is_profitable']
+CUBE_MEASURES = ['Net_PnL', 'Size USD', 'Fee']
+
+# Cell columns combined by summing; the *_min / *_max columns combine by min / max
+ADDITIVE_COLUMNS = ['count', 'wins'] + [
+    f'{measure}_{stat}' for measure in CUBE_MEASURES for stat in ['n', 'sum', 'sumsq']
+]
+
+
+def _encode(series):
+    """
+    Return (int64 codes, labels) for one cube dimension. Dates are coded as
+    days since the first date; missing values get the extra code len(labels).
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        days = series.to_numpy().astype('datetime64[D]').view(np.int64)
+        first_day = days.min() if len(days) else 0
+        span = days.max() - first_day + 1 if len(days) else 0
+        labels = pd.DatetimeIndex((np.arange(span) + first_day).astype('datetime64[D]').astype('datetime64[s]'))
+        return days - first_day, labels
+
+    categories = pd.Categorical(series)
+    codes = categories.codes.astype(np.int64)
+    labels = categories.categories
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        labels = pd.CategoricalIndex(labels, dtype=series.dtype)
+    return np.where(codes < 0, len(labels), codes), labels
+
+
+def _reduce(ufunc, values, starts):
+    """ufunc.reduceat over sorted groups, tolerating zero groups"""
+    if len(starts) == 0:
+        return values[:0]
+    return ufunc.reduceat(values, starts)
+
+
+def _finish(stats, index=None):
+    """Derive win rate, means and standard deviations from combined cell statistics"""
+    result = {'count': stats['count'], 'wins': stats['wins']}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result['win_rate'] = stats['wins'] / stats['count']
+        for measure in CUBE_MEASURES:
+            n = stats[f'{measure}_n']
+            total = stats[f'{measure}_sum']
+            # Sample variance (ddof=1) from the sums, as pandas .std() reports it
+            squares = np.maximum(stats[f'{measure}_sumsq'] - total * total / n, 0)
+            result[f'{measure}_n'] = n
+            result[f'{measure}_sum'] = total
+            result[f'{measure}_sumsq'] = stats[f'{measure}_sumsq']
+            result[f'{measure}_mean'] = total / n
+            result[f'{measure}_std'] = np.where(n > 1, np.sqrt(squares / (n - 1)), np.nan)
+            result[f'{measure}_min'] = stats[f'{measure}_min']
+            result[f'{measure}_max'] = stats[f'{measure}_max']
+    return pd.DataFrame(result, index=index)
+
+
+class CubeView:
+    """The cells of a SentimentCube that match one filter selection"""
+
+    def __init__(self, cube, cells):
+        self.cube = cube
+        # Positions of the selected cells in the cube's per-cell arrays
+        self.cells = cells
+
+    def _combine(self, group, n_groups):
+        """Combine the selected cells per group id (0..n_groups-1)"""
+        stats = {}
+        for column in ADDITIVE_COLUMNS:
+            values = self.cube.stats[column][self.cells]
+            stats[column] = np.bincount(group, weights=values, minlength=n_groups)
+        for measure in CUBE_MEASURES:
+            for stat, ufunc, empty in [('min', np.fmin, np.inf), ('max', np.fmax, -np.inf)]:
+                column = f'{measure}_{stat}'
+                combined = np.full(n_groups, empty)
+                ufunc.at(combined, group, self.cube.stats[column][self.cells])
+                stats[column] = np.where(np.isinf(combined), np.nan, combined)
+        for column in ['count', 'wins'] + [f'{measure}_n' for measure in CUBE_MEASURES]:
+            stats[column] = stats[column].astype(np.int64)
+        return stats
+
+    def rollup(self, by):
+        """
+        Roll the selected cells up to the cube dimension(s) `by`, one row per
+        combination present, sorted. Returns count, wins, win_rate (0-1) and
+        per-measure n, sum, sumsq, mean, std, min and max columns, e.g.
+        'Net_PnL_mean'.
+        """
+        dimensions = [by] if isinstance(by, str) else list(by)
+        key = np.zeros(len(self.cells), dtype=np.int64)
+        for dimension in dimensions:
+            key = key * self.cube.sizes[dimension] + self.cube.codes[dimension][self.cells]
+        groups, group = np.unique(key, return_inverse=True)
+
+        # Decode each group key back into its dimension labels
+        levels = []
+        for dimension in reversed(dimensions):
+            size = self.cube.sizes[dimension]
+            codes = groups % size
+            groups = groups // size
+            labels = self.cube.labels[dimension]
+            if (codes == size - 1).any():
+                # The extra code holds missing values
+                codes = np.where(codes == size - 1, -1, codes)
+                levels.append(labels.take(codes, allow_fill=True, fill_value=np.nan).rename(dimension))
+            else:
+                levels.append(labels.take(codes).rename(dimension))
+        levels.reverse()
+        index = levels[0] if len(levels) == 1 else pd.MultiIndex.from_arrays(levels)
+
+        return _finish(self._combine(group, len(index)), index)
+
+    def totals(self):
+        """Roll every selected cell up into a single row (a Series)"""
+        group = np.zeros(len(self.cells), dtype=np.int64)
+        return _finish(self._combine(group, 1)).iloc[0]
+
+
+class SentimentCube:
+    """Trades aggregated once per process into cells over CUBE_DIMENSIONS"""
+
+    def __init__(self, merged_df):
+        n_rows = len(merged_df)
+        key = np.zeros(n_rows, dtype=np.int64)
+        self.labels, self.sizes = {}, {}
+        for dimension in CUBE_DIMENSIONS:
+            codes, labels = _encode(merged_df[dimension])
+            self.labels[dimension] = labels
+            self.sizes[dimension] = len(labels) + 1
+            key = key * self.sizes[dimension] + codes
+
+        # Sorting the mixed-radix key groups each cell's trades together,
+        # with Date as the most significant digit
+        order = np.argsort(key, kind='stable')
+        key = key[order]
+        starts = np.flatnonzero(np.r_[n_rows > 0, key[1:] != key[:-1]])
+
+        cell_key = key[starts]
+        self.codes = {}
+        for dimension in reversed(CUBE_DIMENSIONS):
+            self.codes[dimension] = cell_key % self.sizes[dimension]
+            cell_key = cell_key // self.sizes[dimension]
+
+        profitable = merged_df['is_profitable'].to_numpy(dtype=bool)[order]
+        self.stats = {
+            'count': np.diff(np.append(starts, n_rows)),
+            'wins': _reduce(np.add, profitable.astype(np.int64), starts),
+        }
+        for measure in CUBE_MEASURES:
+            values = merged_df[measure].to_numpy(dtype=np.float64)[order]
+            valid = ~np.isnan(values)
+            filled = np.where(valid, values, 0.0)
+            self.stats[f'{measure}_n'] = _reduce(np.add, valid.astype(np.int64), starts)
+            self.stats[f'{measure}_sum'] = _reduce(np.add, filled, starts)
+            self.stats[f'{measure}_sumsq'] = _reduce(np.add, filled * filled, starts)
+            self.stats[f'{measure}_min'] = _reduce(np.fmin, values, starts)
+            self.stats[f'{measure}_max'] = _reduce(np.fmax, values, starts)
+
+        self.n_cells = len(starts)
+        self.n_trades = n_rows
+        # Codes of the values present in each dimension, missing values excluded
+        self.present = {
+            dimension: np.setdiff1d(np.unique(codes), [self.sizes[dimension] - 1])
+            for dimension, codes in self.codes.items()
+        }
+
+    def select(self, start_date=None, end_date=None, selections=None):
+        """
+        Return a CubeView of the cells dated start_date..end_date (inclusive)
+        whose dimensions are in `selections` ({dimension: values}). As with
+        BitmapIndex.select, a dimension whose selection covers every value
+        present is not filtered.
+        """
+        # Cells are sorted by date, so the date range is a slice
+        day_codes = self.codes['Date']
+        labels = self.labels['Date']
+        start = 0 if start_date is None else np.searchsorted(
+            day_codes, labels.searchsorted(pd.Timestamp(start_date), side='left'), side='left')
+        stop = self.n_cells if end_date is None else np.searchsorted(
+            day_codes, labels.searchsorted(pd.Timestamp(end_date), side='right'), side='left')
+        cells = np.arange(start, max(start, stop))
+
+        for dimension, values in (selections or {}).items():
+            wanted = self.labels[dimension].get_indexer(list(values))
+            if np.isin(self.present[dimension], wanted).all():
+                continue
+            cells = cells[np.isin(self.codes[dimension][cells], wanted[wanted >= 0])]
+        return CubeView(self, cells)
@@ -0,0 +1,97 @@
+"""
+As-of join of the daily Fear & Greed Index onto individual trades.
+
+The index is turned once into a dense lookup table with one slot per
+calendar day between its first and last date. Days missing from the index
+are gap-filled with the last known reading, so attaching sentiment to any
+number of trades is a single integer take on the trade's day ordinal.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Classification labels in sentiment order; codes index into this list
+CLASSIFICATIONS = ['Extreme Fear', 'Fear', 'Neutral', 'Greed', 'Extreme Greed']
+
+SentimentLookup = namedtuple('SentimentLookup', [
+    'first_day',   # day ordinal (days since 1970-01-01) of slot 0
+    'values',      # float64 index value per day
+    'codes',       # int8 classification code per day
+    'labels',      # classification label per code
+    'source_days'  # day ordinal of the reading each slot was filled from
+])
+# Every lookup array ends with one extra "no coverage" slot (NaN / -1 / -1)
+# that unmatched trades are pointed at, so the join is a single take.
+
+
+def _day_ordinals(dates):
+    """Return int64 days since epoch and a mask of the non-NaT entries"""
+    days = pd.DatetimeIndex(dates).values.astype('datetime64[D]')
+    valid = ~np.isnat(days)
+    return days.view(np.int64), valid
+
+
+def build_sentiment_lookup(fear_greed_df):
+    """Build the gap-filled day-ordinal lookup table from fear_greed_df"""
+    days, valid = _day_ordinals(fear_greed_df['date'])
+    valid &= fear_greed_df['classification'].notna().to_numpy()
+    days = days[valid]
+    values = fear_greed_df['value'].to_numpy(dtype=np.float64)[valid]
+    classification = fear_greed_df['classification'].to_numpy(dtype=object)[valid]
+
+    extra = set(classification) - set(CLASSIFICATIONS)
+    labels = CLASSIFICATIONS + sorted(extra)
+    codes = pd.Categorical(classification, categories=labels).codes.astype(np.int8)
+
+    # Readings are placed at their day slot; later rows win on duplicate days
+    order = np.argsort(days, kind='stable')
+    days, values, codes = days[order], values[order], codes[order]
+    first_day = days[0] if len(days) else 0
+    n_slots = days[-1] - first_day + 1 if len(days) else 0
+    slot = np.full(n_slots + 1, -1, dtype=np.int64)
+    slot[days - first_day] = np.arange(len(days))
+
+    # Gap-fill: every slot points at the latest reading on or before it
+    slot[:-1] = np.maximum.accumulate(slot[:-1])
+
+    values = np.append(values, np.nan)
+    codes = np.append(codes, np.int8(-1))
+    days = np.append(days, -1)
+    return SentimentLookup(first_day, values[slot], codes[slot], labels, days[slot])
+
+
+def lookup_sentiment(lookup, dates):
+    """
+    Return (values, codes, source_days) for each date using the last known
+    reading on or before it. Dates before the first reading, and NaT, get
+    NaN / -1 / -1.
+    """
+    days, valid = _day_ordinals(dates)
+    n_slots = len(lookup.values) - 1
+
+    # Trades after the last reading keep using it
+    index = np.minimum(days - lookup.first_day, n_slots - 1)
+    index[~valid | (index < 0)] = n_slots
+    return lookup.values[index], lookup.codes[index], lookup.source_days[index]
+
+
+def attach_sentiment(trades_df, lookup, date_column='Date'):
+    """
+    Return the trades that have sentiment coverage with 'date', 'value' and
+    'classification' columns added. 'date' is the index date the sentiment
+    was taken from; 'classification' is categorical over lookup.labels, so
+    it is built straight from the codes without materializing strings.
+    """
+    values, codes, source_days = lookup_sentiment(lookup, trades_df[date_column])
+    keep = codes >= 0
+    if not keep.all():
+        trades_df = trades_df[keep]
+        values, codes, source_days = values[keep], codes[keep], source_days[keep]
+
+    return trades_df.assign(
+        date=source_days.astype('datetime64[D]').astype('datetime64[s]'),
+        value=values,
+        classification=pd.Categorical.from_codes(codes, categories=lookup.labels),
+    )
@@ -0,0 +1,211 @@
+"""
+Significance tests computed from group sufficient statistics.
+
+One-way ANOVA needs only each group's count, sum and sum of squares, and
+the chi-square test of independence only the contingency counts. Both are
+available from a SentimentCube rollup, so the Statistical Significance tab
+runs these tests on a handful of numbers instead of the raw trades.
+
+The rank tests (Kruskal-Wallis and Mann-Whitney U) share one sort: RankTests
+ranks all values once and keeps, per run of tied values, how many belong to
+each group. Every group's rank sum and every pair's U statistic and tie
+correction follow from those counts.
+
+Results match scipy.stats.f_oneway, chi2_contingency, kruskal and
+mannwhitneyu; p-values come straight from the distribution functions in
+scipy.special.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import special, stats
+
+
+def one_way_anova(count, total, sumsq):
+    """
+    Return (F, p, df_between, df_within) of a one-way ANOVA from per-group
+    counts, sums and sums of squares. Groups with no values are ignored.
+    """
+    count, total, sumsq = (np.asarray(values, dtype=np.float64) for values in (count, total, sumsq))
+    present = count > 0
+    count, total, sumsq = count[present], total[present], sumsq[present]
+
+    n_groups, n_values = len(count), count.sum()
+    df_between, df_within = n_groups - 1, n_values - n_groups
+    # Between-group variation: squared group sums against the grand sum
+    group_squares = total * total / count
+    ss_between = group_squares.sum() - total.sum() ** 2 / n_values
+    ss_within = np.maximum(sumsq - group_squares, 0).sum()
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        f_stat = (ss_between / df_between) / (ss_within / df_within)
+    return f_stat, special.fdtrc(df_between, df_within, f_stat), df_between, int(df_within)
+
+
+def chi_square_independence(observed, correction=True):
+    """
+    Return (chi2, p, dof, expected) of the chi-square test of independence
+    for a contingency table of counts (DataFrame or 2-D array). As in
+    scipy, Yates' correction is applied when dof is 1.
+    """
+    table = observed
+    observed = np.asarray(observed, dtype=np.float64)
+    expected = np.outer(observed.sum(axis=1), observed.sum(axis=0)) / observed.sum()
+    if isinstance(table, pd.DataFrame):
+        expected_table = pd.DataFrame(expected, index=table.index, columns=table.columns)
+    else:
+        expected_table = expected
+
+    dof = int(np.prod(observed.shape) - sum(observed.shape) + observed.ndim - 1)
+    if dof == 0:
+        return 0.0, 1.0, 0, expected_table
+    if (expected == 0).any():
+        raise ValueError("Every row and column of the contingency table needs a nonzero count")
+
+    difference = observed - expected
+    if correction and dof == 1:
+        # Yates: move each count up to half a unit towards its expected value
+        difference -= np.sign(difference) * np.minimum(0.5, np.abs(difference))
+    chi2 = (difference * difference / expected).sum()
+    return chi2, special.chdtrc(dof, chi2), dof, expected_table
+
+
+def profitability_table(rollup):
+    """
+    Sentiment x profitability contingency table (like pd.crosstab of
+    sentiment_category and is_profitable) from a cube rollup's count and
+    wins columns, keeping only the rows and columns that have trades.
+    """
+    table = pd.DataFrame({False: rollup['count'] - rollup['wins'], True: rollup['wins']})
+    table.columns.name = 'is_profitable'
+    table = table[table.sum(axis=1) > 0]
+    return table.loc[:, table.sum(axis=0) > 0]
+
+
+class RankTests:
+    """
+    Kruskal-Wallis and Mann-Whitney U tests over one shared ranking of
+    `values` split by `groups` (labels per value). Missing values and
+    values without a group are left out.
+    """
+
+    def __init__(self, values, groups):
+        values = np.asarray(values, dtype=np.float64)
+        categories = pd.Categorical(groups)
+        valid = ~np.isnan(values) & (categories.codes >= 0)
+        values = values[valid]
+
+        # Number the groups with values 0..n_groups-1
+        present = np.bincount(categories.codes[valid], minlength=len(categories.categories)) > 0
+        remap = np.cumsum(present) - 1
+        self.labels = list(categories.categories[present])
+
+        order = np.argsort(values, kind='stable')
+        values = values[order]
+        # Group of each value in sorted order
+        self.codes = remap[categories.codes[valid][order]].astype(np.int16)
+        # Tied values form one block sharing their average rank; sliced so no values give no blocks
+        breaks = np.r_[True, values[1:] != values[:-1]][:len(values)]
+        self.block = np.cumsum(breaks) - 1
+        starts = np.flatnonzero(breaks)
+        self.sizes = np.diff(np.append(starts, len(values)))
+        self.ranks = starts + (self.sizes + 1) / 2
+
+        n_groups = len(self.labels)
+        self.n = np.bincount(self.codes, minlength=n_groups).astype(np.float64)
+        self.n_values = len(values)
+        self.rank_sums = np.bincount(self.codes, weights=self.ranks[self.block], minlength=n_groups)
+        self._u = None
+        self._ties = None
+
+    def _column(self, label):
+        return self.labels.index(label)
+
+    def tie_term(self):
+        """Sum of t^3 - t over all blocks of t tied values"""
+        sizes = self.sizes.astype(np.float64)
+        return (sizes ** 3 - sizes).sum()
+
+    def kruskal(self):
+        """Return (H, p) of the Kruskal-Wallis H test across all groups"""
+        n_values = self.n_values
+        h_stat = (12 / (n_values * (n_values + 1)) * (self.rank_sums ** 2 / self.n).sum()
+                  - 3 * (n_values + 1))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            h_stat /= 1 - self.tie_term() / (n_values ** 3 - n_values)
+        return h_stat, special.chdtrc(len(self.labels) - 1, h_stat)
+
+    def u_matrix(self):
+        """
+        U[i, j]: Mann-Whitney U of group i against group j, the number of
+        (i, j) value pairs where i's value is larger, ties counting half
+        """
+        if self._u is None:
+            n_groups = len(self.labels)
+            self._u = np.zeros((n_groups, n_groups))
+            for column in range(n_groups):
+                # Values of group `column` below each block, plus half of those in it
+                in_block = np.bincount(self.block[self.codes == column], minlength=len(self.sizes))
+                below = np.cumsum(in_block) - in_block / 2
+                self._u[:, column] = np.bincount(self.codes, weights=below[self.block], minlength=n_groups)
+        return self._u
+
+    def pair_tie_terms(self):
+        """T[i, j]: sum of t^3 - t over the ties among the values of groups i and j"""
+        if self._ties is None:
+            n_groups = len(self.labels)
+            # Per-group counts in the blocks that hold ties: (group, tied block)
+            tied_blocks = self.sizes > 1
+            n_tied = int(tied_blocks.sum())
+            tied_ids = np.cumsum(tied_blocks) - 1
+            rows = tied_blocks[self.block]
+            counts = np.bincount(
+                self.codes[rows].astype(np.int64) * n_tied + tied_ids[self.block[rows]],
+                minlength=n_groups * n_tied
+            ).reshape(n_groups, n_tied).astype(np.float64)
+            # (a + b)^3 - (a + b) summed over blocks, for all pairs at once
+            cubes = (counts ** 3).sum(axis=1)
+            totals = counts.sum(axis=1)
+            cross = 3 * (counts ** 2) @ counts.T
+            self._ties = (cubes[:, None] + cubes[None, :] + cross + cross.T
+                          - totals[:, None] - totals[None, :])
+        return self._ties
+
+    def mann_whitney(self, first, second):
+        """
+        Return (U, p) of the two-sided Mann-Whitney U test of group `first`
+        against `second`, U being the statistic of `first`.
+        """
+        i, j = self._column(first), self._column(second)
+        n1, n2 = self.n[i], self.n[j]
+        ties = self.pair_tie_terms()[i, j]
+        if min(n1, n2) <= 8 and ties == 0:
+            # scipy uses the exact distribution here; the samples are tiny
+            return self._exact_mann_whitney(i, j)
+        return self.u_matrix()[i, j], mann_whitney_p(self.u_matrix()[i, j], n1, n2, ties)
+
+    def _exact_mann_whitney(self, i, j):
+        values = [self.ranks[self.block[self.codes == code]] for code in (i, j)]
+        result = stats.mannwhitneyu(*values, alternative='two-sided')
+        return result.statistic, result.pvalue
+
+    def pairwise(self):
+        """Mann-Whitney U and p for every pair of groups, in label order"""
+        rows = []
+        for i, first in enumerate(self.labels):
+            for second in self.labels[i + 1:]:
+                u_stat, p_value = self.mann_whitney(first, second)
+                rows.append({'group_1': first, 'group_2': second, 'U': u_stat, 'p_value': p_value})
+        return pd.DataFrame(rows, columns=['group_1', 'group_2', 'U', 'p_value'])
+
+
+def mann_whitney_p(u_stat, n1, n2, tie_term):
+    """
+    Two-sided p-value of Mann-Whitney U from the normal approximation with
+    tie and continuity correction, as scipy computes it (works on arrays)
+    """
+    n = n1 + n2
+    spread = np.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = (np.maximum(u_stat, n1 * n2 - u_stat) - n1 * n2 / 2 - 0.5) / spread
+    return np.minimum(2 * special.ndtr(-z), 1.0)
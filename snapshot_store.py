@@ -0,0 +1,183 @@
+"""
+Columnar snapshot store for the preprocessed datasets.
+
+The engineered DataFrames are written as Arrow IPC (Feather v2) files next
+to a small JSON manifest holding content hashes of the source CSV files.
+When the hashes still match, the frames are memory-mapped back instead of
+re-running the preprocessing pipeline.
+
+historical_data.csv is append-only, so the manifest also records how many
+bytes and rows of it are already in the snapshot. Rows appended later are
+stored as extra part files instead of rewriting the whole dataset.
+"""
+
+import hashlib
+import json
+import os
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - snapshots are simply disabled
+    pa = None
+    feather = None
+
+# Version 3 stores merged rows sorted by trade time
+SNAPSHOT_VERSION = 3
+MANIFEST_FILE = 'manifest.json'
+FEAR_GREED_FILE = 'fear_greed.arrow'
+MERGED_PART_FILE = 'merged_{:04d}.arrow'
+
+# Beyond this many parts the snapshot is rebuilt as a single file
+MAX_MERGED_PARTS = 32
+
+
+def _new_digest():
+    return hashlib.blake2b(digest_size=20)
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Return the BLAKE2b hex digest of a file's content"""
+    digest = _new_digest()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_appended(path, offset, prefix_digest, chunk_size=1 << 20):
+    """
+    Return (tail_bytes, new_offset, new_digest) for the bytes written to
+    `path` after `offset`, or None when the first `offset` bytes no longer
+    hash to `prefix_digest` (the file was rewritten, not appended to).
+    Pass offset=0 and prefix_digest=None to read the whole file.
+
+    The tail stops after its last newline: a row the writer has not
+    finished yet is left for the next read, so new_offset never lands
+    inside a row. The prefix is hashed in the same pass that reads the
+    tail, so new_digest covers everything up to new_offset without a
+    second read.
+    """
+    digest = _new_digest()
+    with open(path, 'rb') as f:
+        remaining = offset
+        while remaining:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                return None
+            digest.update(chunk)
+            remaining -= len(chunk)
+        if prefix_digest is not None and digest.hexdigest() != prefix_digest:
+            return None
+        tail = f.read()
+
+    tail = tail[:tail.rfind(b'\n') + 1]
+    digest.update(tail)
+    return tail, offset + len(tail), digest.hexdigest()
+
+
+def read_manifest(snapshot_dir):
+    """Return the snapshot manifest, or None when it is missing or stale"""
+    if pa is None:
+        return None
+    try:
+        with open(os.path.join(snapshot_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != SNAPSHOT_VERSION:
+        return None
+    return manifest
+
+
+def _write_manifest(snapshot_dir, manifest):
+    path = os.path.join(snapshot_dir, MANIFEST_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _remove_manifest(snapshot_dir):
+    # Drop the old manifest first so a half-written snapshot is never trusted
+    path = os.path.join(snapshot_dir, MANIFEST_FILE)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _write_table(table, path):
+    tmp_path = path + '.tmp'
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+
+
+def _read_table(path):
+    return feather.read_table(path, memory_map=True)
+
+
+def load_snapshot(snapshot_dir, manifest):
+    """Return (fear_greed_df, merged_df) for a manifest, or None if unreadable"""
+    try:
+        fear_greed_df = _read_table(os.path.join(snapshot_dir, FEAR_GREED_FILE)).to_pandas()
+        parts = [_read_table(os.path.join(snapshot_dir, name)) for name in manifest['merged_parts']]
+        merged_df = pa.concat_tables(parts).to_pandas()
+    except (OSError, KeyError, pa.ArrowException):
+        return None
+    return fear_greed_df, merged_df
+
+
+def save_snapshot(snapshot_dir, source, fear_greed_df, merged_df):
+    """
+    Write both frames as a fresh snapshot. `source` describes the CSV
+    content the frames were built from: fear_greed_digest,
+    historical_digest, historical_offset, historical_rows and
+    historical_columns.
+    """
+    if pa is None:
+        return False
+
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        _remove_manifest(snapshot_dir)
+        for name in os.listdir(snapshot_dir):
+            if name.startswith('merged_') and name.endswith('.arrow'):
+                os.remove(os.path.join(snapshot_dir, name))
+
+        first_part = MERGED_PART_FILE.format(0)
+        _write_table(pa.Table.from_pandas(fear_greed_df, preserve_index=False),
+                     os.path.join(snapshot_dir, FEAR_GREED_FILE))
+        _write_table(pa.Table.from_pandas(merged_df, preserve_index=False),
+                     os.path.join(snapshot_dir, first_part))
+        _write_manifest(snapshot_dir, dict(
+            source, version=SNAPSHOT_VERSION, rows=len(merged_df), merged_parts=[first_part]
+        ))
+    except (OSError, pa.ArrowException):
+        # A missing snapshot only costs a rebuild on the next cold start
+        return False
+    return True
+
+
+def append_snapshot(snapshot_dir, manifest, source, merged_tail_df):
+    """
+    Store engineered rows parsed from the appended tail as a new part file
+    and advance the manifest to `source`. Returns False when the rows do not
+    fit the stored schema or too many parts have piled up, in which case the
+    caller should rebuild the snapshot.
+    """
+    parts = list(manifest['merged_parts'])
+    if len(parts) >= MAX_MERGED_PARTS:
+        return False
+
+    try:
+        schema = _read_table(os.path.join(snapshot_dir, parts[0])).schema
+        table = pa.Table.from_pandas(merged_tail_df, schema=schema, preserve_index=False)
+        part = MERGED_PART_FILE.format(len(parts))
+        _write_table(table, os.path.join(snapshot_dir, part))
+    except (OSError, ValueError, TypeError, pa.ArrowException):
+        return False
+
+    parts.append(part)
+    _write_manifest(snapshot_dir, dict(
+        manifest, **source, rows=manifest['rows'] + len(merged_tail_df), merged_parts=parts
+    ))
+    return True
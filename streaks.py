@@ -0,0 +1,76 @@
+"""
+Run-length encoding of win/loss streaks.
+
+A streak is a maximal run of consecutive trades with the same outcome.
+find_streaks() finds every run with array operations: run boundaries come
+from comparing each trade with the previous one, per-run totals from
+np.add.reduceat, and each run's dominant sentiment from one bincount over
+(run, sentiment code) pairs. Streaks can be kept apart per Account, Coin
+or any other key in the same call.
+"""
+
+import numpy as np
+import pandas as pd
+
+from aggregation import group_codes
+
+
+def dominant_codes(run_ids, codes, n_runs, n_codes):
+    """
+    Most frequent code of each run, the lowest code on ties (as
+    Series.mode()[0] picks it), or -1 for runs with no valid code.
+    """
+    valid = codes >= 0
+    counts = np.bincount(
+        run_ids[valid] * n_codes + codes[valid], minlength=n_runs * n_codes
+    ).reshape(n_runs, n_codes)
+    return np.where(counts.any(axis=1), counts.argmax(axis=1), -1)
+
+
+def find_streaks(df, outcome='is_profitable', value='Net_PnL', category='sentiment_category',
+                 by=None, time_column='Timestamp IST'):
+    """
+    Return one row per streak of equal `outcome` in time order, with
+    columns start (position of the first trade in `df`), start_time,
+    length, is_win, total_pnl (sum of `value`) and dominant (the most
+    frequent `category` in the streak). With `by` (column names), streaks
+    are found separately within each group and the group keys are added.
+    """
+    n_rows = len(df)
+    times = df[time_column]
+    order = (np.arange(n_rows) if times.is_monotonic_increasing
+             else np.argsort(times.to_numpy(), kind='stable'))
+
+    # A streak starts at the first trade, a new group or a change of outcome
+    breaks = np.zeros(n_rows, dtype=bool)
+    breaks[:1] = True
+    if by is not None:
+        group, _, _ = group_codes(df, by)
+        order = order[np.argsort(group[order], kind='stable')]
+        group = group[order]
+        breaks[1:] = group[1:] != group[:-1]
+
+    wins = df[outcome].to_numpy(dtype=bool)[order]
+    breaks[1:] |= wins[1:] != wins[:-1]
+    starts = np.flatnonzero(breaks)
+    run_ids = np.cumsum(breaks) - 1
+    n_runs = len(starts)
+
+    values = df[value].to_numpy(dtype=np.float64)[order]
+    categories = pd.Categorical(df[category])
+    codes = categories.codes.astype(np.int64)[order]
+    dominant = dominant_codes(run_ids, codes, n_runs, len(categories.categories))
+
+    streaks = pd.DataFrame({
+        'start': order[starts],
+        'start_time': times.to_numpy()[order[starts]],
+        'length': np.diff(np.append(starts, n_rows)),
+        'is_win': wins[starts],
+        'total_pnl': np.add.reduceat(np.nan_to_num(values), starts) if n_runs else values[:0],
+        'dominant': pd.Categorical.from_codes(dominant, dtype=categories.dtype),
+    })
+    if by is not None:
+        keys = [by] if isinstance(by, str) else list(by)
+        for key in reversed(keys):
+            streaks.insert(0, key, df[key].iloc[order[starts]].reset_index(drop=True))
+    return streaks
@@ -12,6 +12,8 @@ from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 import warnings
 
+from trade_features import sentiment_category
+
 warnings.filterwarnings('ignore')
 
 # Page configuration
@@ -108,20 +110,8 @@ def load_data():
         merged_df['DayOfWeek'] = merged_df['Timestamp IST'].dt.dayofweek
         merged_df['Month'] = merged_df['Timestamp IST'].dt.month
         
-        # Categorize sentiment
-        def categorize_sentiment(classification):
-            if classification == 'Extreme Fear':
-                return 'Extreme Fear'
-            elif classification == 'Fear':
-                return 'Fear'
-            elif classification == 'Neutral':
-                return 'Neutral'
-            elif classification == 'Greed':
-                return 'Greed'
-            else:
-                return 'Extreme Greed'
-        
-        merged_df['sentiment_category'] = merged_df['classification'].apply(categorize_sentiment)
+        # Categorize sentiment (unknown classifications count as Extreme Greed)
+        merged_df['sentiment_category'] = sentiment_category(merged_df['classification'], default='Extreme Greed')
         
         return fear_greed_df, historical_df, merged_df
     
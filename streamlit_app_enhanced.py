@@ -21,6 +21,8 @@ from datetime import datetime, timedelta
 from scipy import stats
 import warnings
 
+from trade_features import sentiment_category, sentiment_score, trading_session
+
 warnings.filterwarnings('ignore')
 
 # Page configuration
@@ -168,40 +170,14 @@ def load_data():
         merged_df['Week'] = merged_df['Timestamp IST'].dt.isocalendar().week
         
         # Sentiment categorization
-        def categorize_sentiment(classification):
-            sentiment_map = {
-                'Extreme Fear': 'Extreme Fear',
-                'Fear': 'Fear',
-                'Neutral': 'Neutral',
-                'Greed': 'Greed',
-                'Extreme Greed': 'Extreme Greed'
-            }
-            return sentiment_map.get(classification, 'Neutral')
-        
-        merged_df['sentiment_category'] = merged_df['classification'].apply(categorize_sentiment)
+        merged_df['sentiment_category'] = sentiment_category(merged_df['classification'])
         
         # Advanced features
         merged_df['PnL_Percentage'] = (merged_df['Net_PnL'] / merged_df['Size USD']) * 100
         merged_df['Fee_Ratio'] = (merged_df['Fee'] / merged_df['Size USD']) * 100
         
-        sentiment_score_map = {
-            'Extreme Fear': 1,
-            'Fear': 2,
-            'Neutral': 3,
-            'Greed': 4,
-            'Extreme Greed': 5
-        }
-        merged_df['sentiment_score'] = merged_df['sentiment_category'].map(sentiment_score_map)
-        
-        def get_trading_session(hour):
-            if 0 <= hour < 8:
-                return 'Asian'
-            elif 8 <= hour < 16:
-                return 'European'
-            else:
-                return 'American'
-        
-        merged_df['Trading_Session'] = merged_df['Hour'].apply(get_trading_session)
+        merged_df['sentiment_score'] = sentiment_score(merged_df['sentiment_category'])
+        merged_df['Trading_Session'] = trading_session(merged_df['Hour'])
         merged_df['Win_Loss_Magnitude'] = merged_df['Net_PnL'].abs()
         
         return fear_greed_df, historical_df, merged_df
@@ -18,9 +18,27 @@ import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
-from scipy import stats
+from contextlib import contextmanager
+import time
 import warnings
 
+from data_pipeline import DatasetHandle
+from downsample import MAX_POINTS, downsample
+from aggregation import aggregate
+from bootstrap import bootstrap_ci
+from box_summary import box_summaries
+from filter_index import bitmap_from_range
+from histograms import histograms
+from streaks import find_streaks
+from drawdowns import drawdown_curve, find_drawdowns
+from equity_sim import ruin_summary, simulate_equity
+from figure_cache import FigureCache, fingerprint
+from permutation import permutation_test
+from rolling_stats import MAX_WINDOW, RollingStats
+from posthoc import CORRECTIONS, POSTHOC_TESTS, p_value_matrix, posthoc_table
+from significance import RankTests, chi_square_independence, one_way_anova, profitability_table
+from tail_risk import VAR_LEVELS, monte_carlo_var, tail_risk
+
 warnings.filterwarnings('ignore')
 
 # Page configuration
@@ -119,99 +137,184 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Cache data loading
-@st.cache_data(ttl=3600)
+# Shared data loading: one read-only copy per server process
+@st.cache_resource(show_spinner="Loading datasets...")
+def load_dataset_handle():
+    """Load the datasets once and share them across all sessions"""
+    return DatasetHandle.load()
+
 def load_data():
     """Load and preprocess the datasets with comprehensive error handling"""
     try:
-        # Load Fear & Greed Index
-        fear_greed_df = pd.read_csv('fear_greed_index.csv')
-        fear_greed_df['date'] = pd.to_datetime(fear_greed_df['date'])
-        fear_greed_df = fear_greed_df.sort_values('date').reset_index(drop=True)
-        
-        # Load Historical Trading Data
-        historical_df = pd.read_csv('historical_data.csv')
-        historical_df['Timestamp IST'] = pd.to_datetime(
-            historical_df['Timestamp IST'], 
-            format='%d-%m-%Y %H:%M', 
-            errors='coerce'
-        )
-        historical_df['Date'] = historical_df['Timestamp IST'].dt.date
-        historical_df['Date'] = pd.to_datetime(historical_df['Date'])
-        
-        # Clean numeric columns
-        historical_df['Closed PnL'] = pd.to_numeric(historical_df['Closed PnL'], errors='coerce')
-        historical_df['Size USD'] = pd.to_numeric(historical_df['Size USD'], errors='coerce')
-        historical_df['Fee'] = pd.to_numeric(historical_df['Fee'], errors='coerce')
-        historical_df = historical_df.dropna(subset=['Date'])
-        
-        # Merge datasets
-        merged_df = pd.merge(
-            historical_df,
-            fear_greed_df[['date', 'value', 'classification']],
-            left_on='Date',
-            right_on='date',
-            how='left'
-        )
-        
-        # Forward fill sentiment data
-        merged_df['classification'] = merged_df.groupby(merged_df['Date'].notna())['classification'].fillna(method='ffill')
-        merged_df['value'] = merged_df.groupby(merged_df['Date'].notna())['value'].fillna(method='ffill')
-        merged_df = merged_df.dropna(subset=['classification'])
-        
-        # Feature engineering
-        merged_df['Net_PnL'] = merged_df['Closed PnL'] - merged_df['Fee']
-        merged_df['is_profitable'] = merged_df['Net_PnL'] > 0
-        merged_df['Hour'] = merged_df['Timestamp IST'].dt.hour
-        merged_df['DayOfWeek'] = merged_df['Timestamp IST'].dt.dayofweek
-        merged_df['Month'] = merged_df['Timestamp IST'].dt.month
-        merged_df['Week'] = merged_df['Timestamp IST'].dt.isocalendar().week
-        
-        # Sentiment categorization
-        def categorize_sentiment(classification):
-            sentiment_map = {
-                'Extreme Fear': 'Extreme Fear',
-                'Fear': 'Fear',
-                'Neutral': 'Neutral',
-                'Greed': 'Greed',
-                'Extreme Greed': 'Extreme Greed'
-            }
-            return sentiment_map.get(classification, 'Neutral')
-        
-        merged_df['sentiment_category'] = merged_df['classification'].apply(categorize_sentiment)
-        
-        # Advanced features
-        merged_df['PnL_Percentage'] = (merged_df['Net_PnL'] / merged_df['Size USD']) * 100
-        merged_df['Fee_Ratio'] = (merged_df['Fee'] / merged_df['Size USD']) * 100
-        
-        sentiment_score_map = {
-            'Extreme Fear': 1,
-            'Fear': 2,
-            'Neutral': 3,
-            'Greed': 4,
-            'Extreme Greed': 5
-        }
-        merged_df['sentiment_score'] = merged_df['sentiment_category'].map(sentiment_score_map)
-        
-        def get_trading_session(hour):
-            if 0 <= hour < 8:
-                return 'Asian'
-            elif 8 <= hour < 16:
-                return 'European'
-            else:
-                return 'American'
-        
-        merged_df['Trading_Session'] = merged_df['Hour'].apply(get_trading_session)
-        merged_df['Win_Loss_Magnitude'] = merged_df['Net_PnL'].abs()
-        
-        return fear_greed_df, historical_df, merged_df
+        handle = load_dataset_handle()
+        if handle.is_stale():
+            # A source CSV changed on disk: drop the shared copy and reload
+            load_dataset_handle.clear()
+            handle = load_dataset_handle()
+        # Zero-copy views, so a rerun never copies merged_df
+        return handle.views()
     
     except FileNotFoundError as e:
         st.error(f"❌ Error: Required CSV files not found. Please ensure both 'fear_greed_index.csv' and 'historical_data.csv' are in the current directory.")
-        return None, None, None
+        return None, None
     except Exception as e:
         st.error(f"❌ Error loading data: {str(e)}")
-        return None, None, None
+        return None, None
+
+def cached_for_filters(name, filter_key, build):
+    """
+    Return this session's `name` object, rebuilt only when `filter_key`
+    changes; filter_key carries the dataset version, so a reload rebuilds it too
+    """
+    if st.session_state.get(f'{name}_key') != filter_key:
+        st.session_state[name] = build()
+        st.session_state[f'{name}_key'] = filter_key
+    return st.session_state[name]
+
+@st.cache_data(show_spinner="Bootstrapping confidence intervals...", max_entries=32)
+def load_bootstrap_ci(dataset_version, filter_key, n_resamples, _filtered_df):
+    """Per-sentiment bootstrap CIs, cached per dataset load, filter state and resample count"""
+    return bootstrap_ci(_filtered_df, n_resamples=n_resamples)
+
+@st.cache_data(show_spinner="Running permutation tests...", max_entries=32)
+def load_permutation_tests(dataset_version, filter_key, max_permutations, precision, _filtered_df, _rank_tests):
+    """Permutation (p, permutations, standard error) of ANOVA and Kruskal-Wallis, cached per filter state"""
+    return {
+        'anova': permutation_test(_filtered_df['Net_PnL'], _filtered_df['sentiment_category'],
+                                  max_permutations=max_permutations, precision=precision),
+        # Kruskal-Wallis is the same statistic on the shared ranks
+        'kruskal': permutation_test(_rank_tests.ranks[_rank_tests.block], _rank_tests.codes,
+                                    max_permutations=max_permutations, precision=precision),
+    }
+
+@st.cache_data(show_spinner="Simulating portfolio paths...", max_entries=32)
+def load_monte_carlo_var(dataset_version, filter_key, horizon, n_paths, _daily_regimes):
+    """Monte Carlo VaR/CVaR per sentiment regime, cached per filter state, horizon and path count"""
+    return monte_carlo_var(_daily_regimes['Net_PnL_sum'], _daily_regimes['sentiment_category'],
+                           horizon=horizon, n_paths=n_paths)
+
+@st.cache_data(show_spinner="Simulating equity curves...", max_entries=16)
+def load_equity_simulation(dataset_version, filter_key, n_trades, n_paths, block_size, mix, capital, ruin_level,
+                           _filtered_df):
+    """Monte Carlo equity paths from the filtered trades in time order, cached per filter state and settings"""
+    order = np.argsort(_filtered_df['Timestamp IST'].to_numpy(), kind='stable')
+    return simulate_equity(
+        _filtered_df['Net_PnL'].to_numpy()[order], _filtered_df['sentiment_category'].to_numpy()[order],
+        n_trades=n_trades, n_paths=n_paths, block_size=block_size, mix=dict(mix),
+        capital=capital, ruin_level=ruin_level, keep_paths=50
+    )
+
+def downsampled(x, y):
+    """x and y of a time series trace, cut to the sidebar's point budget"""
+    x, y = downsample(x, y, st.session_state.get('chart_points', MAX_POINTS))
+    return dict(x=x, y=y)
+
+def add_box_traces(fig, summary, outliers):
+    """One box per sentiment from precomputed box_summaries(), with its outlier sample as points"""
+    for sentiment in [s for s in sentiment_order if s in summary.index]:
+        box = summary.loc[sentiment]
+        fig.add_trace(go.Box(
+            x=[sentiment], q1=[box['q1']], median=[box['median']], q3=[box['q3']],
+            lowerfence=[box['lowerfence']], upperfence=[box['upperfence']],
+            mean=[box['mean']], sd=[box['sd']],
+            name=sentiment,
+            marker_color=colors_map[sentiment],
+            boxmean='sd',
+            boxpoints=False,
+            legendgroup=sentiment
+        ))
+        fig.add_trace(go.Scatter(
+            x=[sentiment] * len(outliers[sentiment]),
+            y=outliers[sentiment],
+            mode='markers',
+            marker=dict(color=colors_map[sentiment], size=4, opacity=0.6),
+            legendgroup=sentiment,
+            showlegend=False
+        ))
+
+def histogram_bar(hist, column, **trace):
+    """go.Bar of one count column of a histograms() table"""
+    return go.Bar(x=hist['center'], y=hist[column], width=hist['width'],
+                  customdata=hist[['left', 'right']],
+                  hovertemplate='%{customdata[0]:,.4g} to %{customdata[1]:,.4g}: %{y:,}<extra></extra>',
+                  **trace)
+
+def ci_error_bars(ci, metric, point, scale=1):
+    """Plotly error bars around `point` (by sentiment) from bootstrap CI columns, or None"""
+    if ci is None:
+        return None
+    ci = ci.reindex(point.index) * scale
+    return dict(
+        type='data',
+        symmetric=False,
+        array=(ci[f'{metric}_high'] - point).clip(lower=0).to_numpy(),
+        arrayminus=(point - ci[f'{metric}_low']).clip(lower=0).to_numpy(),
+        color='#555555'
+    )
+
+# =============================================================================
+# FIGURE CACHE
+# =============================================================================
+
+@st.cache_resource
+def get_figure_cache():
+    """One figure cache for the process, shared by all sessions"""
+    return FigureCache()
+
+def widget_values(keys):
+    """Current values of the widgets `keys`, None for one not rendered yet"""
+    return tuple(st.session_state.get(key) for key in keys)
+
+def chart_data(name, build):
+    """This session's CHART_DATA `name`, rebuilt only when the dataset, filters or its widgets change"""
+    return cached_for_filters(name, (filter_key, widget_values(CHART_DATA[name])), build)
+
+def show_chart(chart_id, build):
+    """
+    Draw a registered chart, reusing its cached figure while the dataset,
+    filters and the widgets of the chart and of its CHART_DATA are unchanged.
+    build() prepares the chart's data as well, so a hit skips both
+    """
+    data, widgets = CHARTS[chart_id]
+    keys = [key for name in data for key in CHART_DATA[name]] + widgets
+    key = fingerprint(chart_id, filter_key, widget_values(keys))
+    st.plotly_chart(get_figure_cache().figure(key, build), width='stretch')
+
+# =============================================================================
+# LAZY TABS
+# =============================================================================
+
+def tab_open(tab, widgets=()):
+    """
+    Whether `tab` is the selected one and its body should run. A hidden
+    tab's widgets are not rendered, so their values are stored again here
+    to survive until the tab is shown
+    """
+    if tab.open:
+        return True
+    for key in widgets:
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+    return False
+
+@contextmanager
+def timed_tab(tab):
+    """Run the body inside `tab` and note how long the tab took to compute"""
+    start = time.perf_counter()
+    with tab:
+        yield
+        st.caption(f"⏱️ Tab computed in {time.perf_counter() - start:.2f}s")
+
+def show_permutation_p(p_value, n_permutations, std_error):
+    """Metric row of one permutation test result"""
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Permutation P-Value", f"{p_value:.4f}", help=f"± {std_error:.4f} (standard error)")
+    with col2:
+        st.metric("Permutations", f"{n_permutations:,}")
+    with col3:
+        significance = "✅ SIGNIFICANT" if p_value < 0.05 else "❌ NOT SIGNIFICANT"
+        st.metric("Permutation Result (α=0.05)", significance)
 
 # Navigation
 st.sidebar.title("🧭 Navigation")
@@ -222,7 +325,7 @@ page = st.sidebar.radio(
 )
 
 # Load data
-fear_greed_df, historical_df, merged_df = load_data()
+fear_greed_df, merged_df = load_data()
 
 if merged_df is None:
     st.stop()
@@ -232,6 +335,71 @@ sentiment_order = ['Extreme Fear', 'Fear', 'Neutral', 'Greed', 'Extreme Greed']
 colors = ['#d32f2f', '#f57c00', '#fbc02d', '#689f38', '#388e3c']
 colors_map = dict(zip(sentiment_order, colors))
 
+CI_WIDGETS = ['show_ci', 'bootstrap_resamples']
+SIM_WIDGETS = ['sim_capital', 'sim_ruin_pct', 'sim_trades', 'sim_paths', 'sim_block'] + [
+    f'sim_mix_{sentiment}' for sentiment in sentiment_order
+]
+
+VAR_WIDGETS = ['var_method', 'var_group', 'var_horizon', 'var_paths']
+
+# Data prepared for charts, cached per session by chart_data(), with the widget
+# keys each depends on besides the dataset and filters
+CHART_DATA = {
+    'pnl_boxes': [],
+    'daily_perf': [],
+    'rolling_stats': [],
+    'posthoc': ['posthoc_correction'],
+    'daily_drawdown': [],
+    'sim_drawdown_hist': SIM_WIDGETS,
+    'streaks': [],
+    'streak_hist': [],
+    'var_table': VAR_WIDGETS,
+    'size_boxes': [],
+}
+
+# Every chart with the CHART_DATA it is built from and the widget keys its
+# figure depends on, besides the dataset and filters
+CHARTS = {
+    # Dashboard
+    'sentiment_distribution': ([], []),
+    'total_pnl_by_sentiment': ([], []),
+    'win_rate_by_sentiment': ([], CI_WIDGETS),
+    'avg_pnl_by_sentiment': ([], CI_WIDGETS),
+    'pnl_distribution': (['pnl_boxes'], []),
+    'cumulative_pnl_vs_sentiment': (['daily_perf'], ['chart_points']),
+    'rolling_average': (['daily_perf', 'rolling_stats'], ['rolling_window', 'chart_points']),
+    'rolling_sharpe': (['daily_perf', 'rolling_stats'], ['rolling_window', 'chart_points']),
+    'trade_count_by_sentiment': ([], []),
+    'avg_size_by_sentiment': ([], []),
+    'correlation_matrix': ([], []),
+    # Advanced Analytics
+    'posthoc_heatmap': (['posthoc'], ['posthoc_test']),
+    'pnl_volatility': ([], []),
+    'coefficient_of_variation': ([], []),
+    'drawdown_chart': (['daily_drawdown'], ['chart_points']),
+    'simulated_equity_curves': ([], SIM_WIDGETS + ['chart_points']),
+    'simulated_drawdowns': (['sim_drawdown_hist'], []),
+    'streak_lengths': (['streaks', 'streak_hist'], []),
+    'avg_streak_by_sentiment': (['streaks'], []),
+    # Risk Analysis
+    'sharpe_by_sentiment': ([], CI_WIDGETS),
+    'risk_return_profile': ([], []),
+    'tail_risk': (['var_table'], []),
+    'position_size_distribution': (['size_boxes'], []),
+    'position_size_vs_pnl': ([], []),
+    'position_size_by_outcome': ([], []),
+    'weekly_position_size': ([], ['chart_points']),
+    'pnl_by_hour': ([], []),
+    'pnl_by_weekday': ([], []),
+    'session_sentiment_heatmap': ([], []),
+    # Deep Dive
+    'side_pnl_by_sentiment': ([], []),
+    'side_win_rate_by_sentiment': ([], []),
+    'fees_by_sentiment': ([], []),
+    'fee_ratio_by_sentiment': ([], []),
+    'performance_radar': ([], []),
+}
+
 # =============================================================================
 # PAGE 1: ASSIGNMENT DETAILS
 # =============================================================================
@@ -411,11 +579,9 @@ if page == "📋 Assignment Details":
     # Key Findings Preview
     st.markdown('<h2 class="sub-header">🎯 Key Findings Preview</h2>', unsafe_allow_html=True)
     
-    sentiment_performance = merged_df.groupby('sentiment_category').agg({
-        'Net_PnL': ['sum', 'mean'],
-        'is_profitable': 'mean',
-        'Account': 'count'
-    }).round(2)
+    sentiment_performance = load_dataset_handle().cube.select().rollup('sentiment_category')[
+        ['Net_PnL_sum', 'Net_PnL_mean', 'win_rate', 'count']
+    ].round(2)
     sentiment_performance.columns = ['Total_PnL', 'Avg_PnL', 'Win_Rate', 'Trade_Count']
     sentiment_performance['Win_Rate'] = sentiment_performance['Win_Rate'] * 100
     sentiment_performance = sentiment_performance.reindex(sentiment_order)
@@ -544,9 +710,11 @@ if page != "📋 Assignment Details":
     st.sidebar.markdown("---")
     st.sidebar.title("🎛️ Filter Options")
     
-    # Date range filter
-    min_date = merged_df['Date'].min().date()
-    max_date = merged_df['Date'].max().date()
+    # Date range filter: merged_df is sorted, so dates map to row ranges
+    handle = load_dataset_handle()
+    day_index = handle.day_index
+    min_date = day_index.first_date
+    max_date = day_index.last_date
     
     date_range = st.sidebar.date_input(
         "📅 Select Date Range",
@@ -575,33 +743,66 @@ if page != "📋 Assignment Details":
         options=['All Trades', 'Profitable Only', 'Unprofitable Only']
     )
     
-    # Apply filters
+    # Apply filters: one combined bitset from the shared index, one take
+    filter_index = handle.filter_index
     if len(date_range) == 2:
         start_date, end_date = date_range
-        filtered_df = merged_df[
-            (merged_df['Date'].dt.date >= start_date) & 
-            (merged_df['Date'].dt.date <= end_date)
-        ]
+        date_rows = bitmap_from_range(*day_index.row_range(start_date, end_date), len(merged_df))
     else:
-        filtered_df = merged_df
+        start_date = end_date = None
+        date_rows = None
+    
+    pnl_values = {
+        'All Trades': [True, False],
+        'Profitable Only': [True],
+        'Unprofitable Only': [False]
+    }[pnl_filter]
+    
+    selections = {
+        'sentiment_category': selected_sentiments,
+        'Side': selected_sides,
+        'is_profitable': pnl_values
+    }
+    selected_rows = filter_index.select(selections, base=date_rows)
+    selected_positions = filter_index.rows(selected_rows)
+    filtered_df = merged_df.take(selected_positions)
     
-    filtered_df = filtered_df[filtered_df['sentiment_category'].isin(selected_sentiments)]
-    filtered_df = filtered_df[filtered_df['Side'].isin(selected_sides)]
+    # Identifies the loaded dataset and the filter state for per-session caches,
+    # so they are rebuilt when the CSVs are reloaded as well as when a filter changes
+    filter_key = (handle.loaded_at, start_date, end_date,
+                  tuple(selected_sentiments), tuple(selected_sides), tuple(pnl_values))
     
-    if pnl_filter == 'Profitable Only':
-        filtered_df = filtered_df[filtered_df['is_profitable']]
-    elif pnl_filter == 'Unprofitable Only':
-        filtered_df = filtered_df[~filtered_df['is_profitable']]
+    # Aggregate panels roll up the pre-built cube over the same selection
+    cube_view = handle.cube.select(start_date, end_date, selections)
     
     # Display filter summary
     st.sidebar.markdown("---")
     st.sidebar.markdown("### 📊 Current Filter")
     st.sidebar.info(f"""
     **Trades:** {len(filtered_df):,}  
-    **Date Range:** {len(filtered_df['Date'].dt.date.unique())} days  
+    **Date Range:** {day_index.day_count(selected_positions)} days  
     **Sentiments:** {len(selected_sentiments)}  
     **Sides:** {', '.join(selected_sides)}
     """)
+    
+    # Bootstrap confidence intervals for the per-sentiment metrics (opt-in, cached)
+    show_ci = st.sidebar.toggle("📏 Show 95% Confidence Intervals", value=False, key="show_ci")
+    n_resamples = st.sidebar.select_slider(
+        "Bootstrap resamples",
+        options=[200, 500, 1000, 2000, 5000, 10000],
+        value=1000,
+        key="bootstrap_resamples",
+        disabled=not show_ci
+    )
+    sentiment_ci = load_bootstrap_ci(handle.loaded_at, filter_key, n_resamples, filtered_df) if show_ci else None
+    
+    # Long time series are downsampled on the server before they reach the browser
+    st.sidebar.select_slider(
+        "📉 Chart points per series",
+        options=[500, 1000, 2000, 5000, 10000],
+        value=MAX_POINTS,
+        key="chart_points"
+    )
 
 # =============================================================================
 # PAGE 2: DASHBOARD
@@ -610,6 +811,9 @@ if page != "📋 Assignment Details":
 if page == "🏠 Dashboard":
     st.markdown('<h1 class="main-header">🏠 Performance Dashboard</h1>', unsafe_allow_html=True)
     
+    # Sentiment-level aggregates for this page, rolled up from the cube
+    by_sentiment = cube_view.rollup('sentiment_category')
+    
     st.markdown("""
     <div style='text-align: center; padding: 15px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
                 border-radius: 10px; margin-bottom: 25px; color: white;'>
@@ -624,11 +828,12 @@ if page == "🏠 Dashboard":
     
     col1, col2, col3, col4, col5 = st.columns(5)
     
-    total_trades = len(filtered_df)
-    total_pnl = filtered_df['Net_PnL'].sum()
-    win_rate = (filtered_df['is_profitable'].sum() / total_trades * 100) if total_trades > 0 else 0
-    avg_pnl = filtered_df['Net_PnL'].mean()
-    total_volume = filtered_df['Size USD'].sum()
+    totals = cube_view.totals()
+    total_trades = int(totals['count'])
+    total_pnl = totals['Net_PnL_sum']
+    win_rate = (totals['wins'] / total_trades * 100) if total_trades > 0 else 0
+    avg_pnl = totals['Net_PnL_mean']
+    total_volume = totals['Size USD_sum']
     
     with col1:
         st.metric("Total Trades", f"{total_trades:,}", 
@@ -654,319 +859,378 @@ if page == "🏠 Dashboard":
         "💰 Profitability", 
         "📈 Time Series",
         "🎯 Sentiment Analysis"
-    ])
+    ], key='dashboard_tab', on_change='rerun')
     
     # TAB 1: Overview
-    with tab1:
-        st.markdown('<h3 class="sub-header">Market Sentiment Distribution</h3>', unsafe_allow_html=True)
+    if tab_open(tab1):
+        with timed_tab(tab1):
+            st.markdown('<h3 class="sub-header">Market Sentiment Distribution</h3>', unsafe_allow_html=True)
         
-        col1, col2 = st.columns(2)
+            col1, col2 = st.columns(2)
         
-        with col1:
-            # Sentiment pie chart
-            sentiment_dist = filtered_df['sentiment_category'].value_counts().reindex(sentiment_order, fill_value=0)
+            with col1:
+                # Sentiment pie chart
+                def build_sentiment_distribution():
+                    sentiment_dist = by_sentiment['count'].reindex(sentiment_order, fill_value=0)
+                    fig = go.Figure(data=[go.Pie(
+                        labels=sentiment_dist.index,
+                        values=sentiment_dist.values,
+                        hole=0.4,
+                        marker=dict(colors=colors),
+                        textinfo='label+percent',
+                        textfont=dict(size=12, color='white'),
+                        hovertemplate='<b>%{label}</b><br>Trades: %{value}<br>Percentage: %{percent}<extra></extra>'
+                    )])
+                    fig.update_layout(
+                        title="Market Sentiment Distribution",
+                        height=400,
+                        showlegend=True,
+                        legend=dict(orientation="v", yanchor="middle", y=0.5)
+                    )
+                    return fig
             
-            fig = go.Figure(data=[go.Pie(
-                labels=sentiment_dist.index,
-                values=sentiment_dist.values,
-                hole=0.4,
-                marker=dict(colors=colors),
-                textinfo='label+percent',
-                textfont=dict(size=12, color='white'),
-                hovertemplate='<b>%{label}</b><br>Trades: %{value}<br>Percentage: %{percent}<extra></extra>'
-            )])
-            fig.update_layout(
-                title="Market Sentiment Distribution",
-                height=400,
-                showlegend=True,
-                legend=dict(orientation="v", yanchor="middle", y=0.5)
-            )
-            st.plotly_chart(fig, width='stretch')
+                show_chart('sentiment_distribution', build_sentiment_distribution)
         
-        with col2:
-            # PnL by sentiment
-            pnl_by_sentiment = filtered_df.groupby('sentiment_category')['Net_PnL'].sum().reindex(sentiment_order, fill_value=0)
+            with col2:
+                # PnL by sentiment
+                def build_total_pnl_by_sentiment():
+                    pnl_by_sentiment = by_sentiment['Net_PnL_sum'].reindex(sentiment_order, fill_value=0)
+                    fig = go.Figure(data=[go.Bar(
+                        x=pnl_by_sentiment.index,
+                        y=pnl_by_sentiment.values,
+                        marker=dict(
+                            color=pnl_by_sentiment.values,
+                            colorscale='RdYlGn',
+                            showscale=True,
+                            colorbar=dict(title="PnL ($)")
+                        ),
+                        text=[f'${v:,.0f}' for v in pnl_by_sentiment.values],
+                        textposition='outside',
+                        hovertemplate='<b>%{x}</b><br>Total PnL: $%{y:,.2f}<extra></extra>'
+                    )])
+                    fig.update_layout(
+                        title="Total PnL by Sentiment",
+                        xaxis_title="Sentiment",
+                        yaxis_title="Total Net PnL ($)",
+                        height=400
+                    )
+                    fig.add_hline(y=0, line_dash="dash", line_color="red", annotation_text="Break-even")
+                    return fig
             
-            fig = go.Figure(data=[go.Bar(
-                x=pnl_by_sentiment.index,
-                y=pnl_by_sentiment.values,
-                marker=dict(
-                    color=pnl_by_sentiment.values,
-                    colorscale='RdYlGn',
-                    showscale=True,
-                    colorbar=dict(title="PnL ($)")
-                ),
-                text=[f'${v:,.0f}' for v in pnl_by_sentiment.values],
-                textposition='outside',
-                hovertemplate='<b>%{x}</b><br>Total PnL: $%{y:,.2f}<extra></extra>'
-            )])
-            fig.update_layout(
-                title="Total PnL by Sentiment",
-                xaxis_title="Sentiment",
-                yaxis_title="Total Net PnL ($)",
-                height=400
+                show_chart('total_pnl_by_sentiment', build_total_pnl_by_sentiment)
+        
+            # Performance table
+            st.markdown('<h3 class="sub-header">Detailed Performance Breakdown</h3>', unsafe_allow_html=True)
+        
+            sentiment_performance = by_sentiment[[
+                'Net_PnL_sum', 'Net_PnL_mean', 'Net_PnL_std', 'Size USD_sum',
+                'Size USD_mean', 'Fee_sum', 'win_rate', 'count'
+            ]].round(2)
+        
+            sentiment_performance.columns = ['Total_PnL', 'Avg_PnL', 'Std_PnL', 'Total_Volume', 
+                                             'Avg_Trade_Size', 'Total_Fees', 'Win_Rate', 'Trade_Count']
+            sentiment_performance['Win_Rate'] = sentiment_performance['Win_Rate'] * 100
+            sentiment_performance = sentiment_performance.reindex(sentiment_order, fill_value=0)
+        
+            st.dataframe(
+                sentiment_performance.style.format({
+                    'Total_PnL': '${:,.2f}',
+                    'Avg_PnL': '${:,.2f}',
+                    'Std_PnL': '${:,.2f}',
+                    'Total_Volume': '${:,.2f}',
+                    'Avg_Trade_Size': '${:,.2f}',
+                    'Total_Fees': '${:,.2f}',
+                    'Win_Rate': '{:.2f}%',
+                    'Trade_Count': '{:,.0f}'
+                }).background_gradient(cmap='RdYlGn', subset=['Total_PnL', 'Win_Rate', 'Avg_PnL']),
+                width='stretch'
             )
-            fig.add_hline(y=0, line_dash="dash", line_color="red", annotation_text="Break-even")
-            st.plotly_chart(fig, width='stretch')
-        
-        # Performance table
-        st.markdown('<h3 class="sub-header">Detailed Performance Breakdown</h3>', unsafe_allow_html=True)
-        
-        sentiment_performance = filtered_df.groupby('sentiment_category').agg({
-            'Net_PnL': ['sum', 'mean', 'std'],
-            'Size USD': ['sum', 'mean'],
-            'Fee': 'sum',
-            'is_profitable': 'mean',
-            'Account': 'count'
-        }).round(2)
-        
-        sentiment_performance.columns = ['Total_PnL', 'Avg_PnL', 'Std_PnL', 'Total_Volume', 
-                                         'Avg_Trade_Size', 'Total_Fees', 'Win_Rate', 'Trade_Count']
-        sentiment_performance['Win_Rate'] = sentiment_performance['Win_Rate'] * 100
-        sentiment_performance = sentiment_performance.reindex(sentiment_order, fill_value=0)
-        
-        st.dataframe(
-            sentiment_performance.style.format({
-                'Total_PnL': '${:,.2f}',
-                'Avg_PnL': '${:,.2f}',
-                'Std_PnL': '${:,.2f}',
-                'Total_Volume': '${:,.2f}',
-                'Avg_Trade_Size': '${:,.2f}',
-                'Total_Fees': '${:,.2f}',
-                'Win_Rate': '{:.2f}%',
-                'Trade_Count': '{:,.0f}'
-            }).background_gradient(cmap='RdYlGn', subset=['Total_PnL', 'Win_Rate', 'Avg_PnL']),
-            width='stretch'
-        )
     
     # TAB 2: Profitability
-    with tab2:
-        st.markdown('<h3 class="sub-header">Profitability Analysis</h3>', unsafe_allow_html=True)
+    if tab_open(tab2):
+        with timed_tab(tab2):
+            st.markdown('<h3 class="sub-header">Profitability Analysis</h3>', unsafe_allow_html=True)
         
-        col1, col2 = st.columns(2)
+            col1, col2 = st.columns(2)
         
-        with col1:
-            # Win rate comparison
-            win_rate_by_sentiment = (filtered_df.groupby('sentiment_category')['is_profitable'].mean() * 100).reindex(sentiment_order, fill_value=0)
+            with col1:
+                # Win rate comparison
+                def build_win_rate_by_sentiment():
+                    win_rate_by_sentiment = (by_sentiment['win_rate'] * 100).reindex(sentiment_order, fill_value=0)
+                    fig = go.Figure(data=[go.Bar(
+                        x=win_rate_by_sentiment.index,
+                        y=win_rate_by_sentiment.values,
+                        marker=dict(color=colors),
+                        error_y=ci_error_bars(sentiment_ci, 'Win_Rate', win_rate_by_sentiment, scale=100),
+                        text=[f'{v:.1f}%' for v in win_rate_by_sentiment.values],
+                        textposition='outside'
+                    )])
+                    fig.update_layout(
+                        title="Win Rate by Sentiment",
+                        xaxis_title="Sentiment",
+                        yaxis_title="Win Rate (%)",
+                        height=400
+                    )
+                    fig.add_hline(y=50, line_dash="dash", line_color="red", annotation_text="50% Baseline")
+                    return fig
             
-            fig = go.Figure(data=[go.Bar(
-                x=win_rate_by_sentiment.index,
-                y=win_rate_by_sentiment.values,
-                marker=dict(color=colors),
-                text=[f'{v:.1f}%' for v in win_rate_by_sentiment.values],
-                textposition='outside'
-            )])
-            fig.update_layout(
-                title="Win Rate by Sentiment",
-                xaxis_title="Sentiment",
-                yaxis_title="Win Rate (%)",
-                height=400
-            )
-            fig.add_hline(y=50, line_dash="dash", line_color="red", annotation_text="50% Baseline")
-            st.plotly_chart(fig, width='stretch')
+                show_chart('win_rate_by_sentiment', build_win_rate_by_sentiment)
         
-        with col2:
-            # Average PnL
-            avg_pnl_by_sentiment = filtered_df.groupby('sentiment_category')['Net_PnL'].mean().reindex(sentiment_order, fill_value=0)
+            with col2:
+                # Average PnL
+                def build_avg_pnl_by_sentiment():
+                    avg_pnl_by_sentiment = by_sentiment['Net_PnL_mean'].reindex(sentiment_order, fill_value=0)
+                    fig = go.Figure(data=[go.Bar(
+                        x=avg_pnl_by_sentiment.index,
+                        y=avg_pnl_by_sentiment.values,
+                        marker=dict(color=colors),
+                        error_y=ci_error_bars(sentiment_ci, 'Avg_PnL', avg_pnl_by_sentiment),
+                        text=[f'${v:.2f}' for v in avg_pnl_by_sentiment.values],
+                        textposition='outside'
+                    )])
+                    fig.update_layout(
+                        title="Average PnL per Trade",
+                        xaxis_title="Sentiment",
+                        yaxis_title="Avg PnL ($)",
+                        height=400
+                    )
+                    fig.add_hline(y=0, line_dash="dash", line_color="black")
+                    return fig
             
-            fig = go.Figure(data=[go.Bar(
-                x=avg_pnl_by_sentiment.index,
-                y=avg_pnl_by_sentiment.values,
-                marker=dict(color=colors),
-                text=[f'${v:.2f}' for v in avg_pnl_by_sentiment.values],
-                textposition='outside'
-            )])
-            fig.update_layout(
-                title="Average PnL per Trade",
-                xaxis_title="Sentiment",
-                yaxis_title="Avg PnL ($)",
-                height=400
-            )
-            fig.add_hline(y=0, line_dash="dash", line_color="black")
-            st.plotly_chart(fig, width='stretch')
-        
-        # PnL Distribution
-        st.markdown('<h3 class="sub-header">PnL Distribution (1st-99th Percentile)</h3>', unsafe_allow_html=True)
-        
-        pnl_filtered = filtered_df[filtered_df['Net_PnL'].between(
-            filtered_df['Net_PnL'].quantile(0.01),
-            filtered_df['Net_PnL'].quantile(0.99)
-        )]
-        
-        fig = go.Figure()
-        for sentiment in sentiment_order:
-            if sentiment in pnl_filtered['sentiment_category'].values:
-                sentiment_data = pnl_filtered[pnl_filtered['sentiment_category'] == sentiment]['Net_PnL']
-                fig.add_trace(go.Box(
-                    y=sentiment_data,
-                    name=sentiment,
-                    marker_color=colors_map[sentiment],
-                    boxmean='sd'
-                ))
+                show_chart('avg_pnl_by_sentiment', build_avg_pnl_by_sentiment)
+        
+            # PnL Distribution
+            st.markdown('<h3 class="sub-header">PnL Distribution (1st-99th Percentile)</h3>', unsafe_allow_html=True)
+        
+            def build_pnl_distribution():
+                # Box statistics are computed here; only a few numbers per sentiment go to the browser
+                pnl_boxes, pnl_outliers = chart_data(
+                    'pnl_boxes',
+                    lambda: box_summaries(filtered_df[filtered_df['Net_PnL'].between(
+                        filtered_df['Net_PnL'].quantile(0.01),
+                        filtered_df['Net_PnL'].quantile(0.99)
+                    )], 'Net_PnL', 'sentiment_category')
+                )
+                fig = go.Figure()
+                add_box_traces(fig, pnl_boxes, pnl_outliers)
+        
+                fig.update_layout(
+                    title="PnL Distribution by Sentiment",
+                    yaxis_title="Net PnL ($)",
+                    height=500,
+                    showlegend=True
+                )
+                fig.add_hline(y=0, line_dash="dash", line_color="red")
+                return fig
         
-        fig.update_layout(
-            title="PnL Distribution by Sentiment",
-            yaxis_title="Net PnL ($)",
-            height=500,
-            showlegend=True
-        )
-        fig.add_hline(y=0, line_dash="dash", line_color="red")
-        st.plotly_chart(fig, width='stretch')
+            show_chart('pnl_distribution', build_pnl_distribution)
     
     # TAB 3: Time Series
-    with tab3:
-        st.markdown('<h3 class="sub-header">Temporal Analysis</h3>', unsafe_allow_html=True)
-        
-        # Daily cumulative PnL
-        daily_perf = filtered_df.groupby('Date').agg({
-            'Net_PnL': 'sum',
-            'value': 'first'
-        }).reset_index()
-        daily_perf['Cumulative_PnL'] = daily_perf['Net_PnL'].cumsum()
-        
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-        
-        fig.add_trace(
-            go.Scatter(
-                x=daily_perf['Date'],
-                y=daily_perf['Cumulative_PnL'],
-                name="Cumulative PnL",
-                line=dict(color='#1976d2', width=3),
-                fill='tonexty',
-                fillcolor='rgba(25, 118, 210, 0.1)'
-            ),
-            secondary_y=False
-        )
-        
-        fig.add_trace(
-            go.Scatter(
-                x=daily_perf['Date'],
-                y=daily_perf['value'],
-                name="Fear & Greed Index",
-                line=dict(color='#ff9800', width=2, dash='dot')
-            ),
-            secondary_y=True
-        )
-        
-        # Add sentiment zones
-        fig.add_hrect(y0=0, y1=25, fillcolor="red", opacity=0.1, layer="below", 
-                     line_width=0, secondary_y=True, annotation_text="Extreme Fear", annotation_position="left")
-        fig.add_hrect(y0=75, y1=100, fillcolor="green", opacity=0.1, layer="below",
-                     line_width=0, secondary_y=True, annotation_text="Extreme Greed", annotation_position="left")
-        
-        fig.update_xaxes(title_text="Date")
-        fig.update_yaxes(title_text="Cumulative PnL ($)", secondary_y=False)
-        fig.update_yaxes(title_text="Fear & Greed Index", secondary_y=True, range=[0, 100])
-        
-        fig.update_layout(
-            title="Cumulative PnL vs Market Sentiment",
-            height=500,
-            hovermode='x unified'
-        )
-        
-        st.plotly_chart(fig, width='stretch')
-        
-        # Rolling statistics
-        st.markdown('<h3 class="sub-header">Rolling Performance Metrics</h3>', unsafe_allow_html=True)
-        
-        window = st.slider("Rolling Window (days)", 1, 30, 7, key="rolling_window")
-        
-        daily_perf[f'{window}D_MA'] = daily_perf['Net_PnL'].rolling(window=window).mean()
-        daily_perf[f'{window}D_Std'] = daily_perf['Net_PnL'].rolling(window=window).std()
-        
-        fig = go.Figure()
+    if tab_open(tab3, ['rolling_window']):
+        with timed_tab(tab3):
+            st.markdown('<h3 class="sub-header">Temporal Analysis</h3>', unsafe_allow_html=True)
+        
+            # Daily cumulative PnL, rolled up only when a chart below is rebuilt
+            def daily_performance():
+                daily_perf = aggregate(filtered_df, 'Date', {
+                    'Net_PnL': ('Net_PnL', 'sum'),
+                    'value': ('value', 'first')
+                }).reset_index()
+                daily_perf['Cumulative_PnL'] = daily_perf['Net_PnL'].cumsum()
+                return daily_perf
+        
+            # Prefix sums are built once per filter; moving the slider only indexes them
+            def rolling_statistics():
+                daily_perf = chart_data('daily_perf', daily_performance)
+                return RollingStats(daily_perf['Net_PnL'], index=daily_perf['Date'])
+        
+            def build_cumulative_pnl_vs_sentiment():
+                daily_perf = chart_data('daily_perf', daily_performance)
+                fig = make_subplots(specs=[[{"secondary_y": True}]])
+        
+                fig.add_trace(
+                    go.Scatter(
+                        **downsampled(daily_perf['Date'], daily_perf['Cumulative_PnL']),
+                        name="Cumulative PnL",
+                        line=dict(color='#1976d2', width=3),
+                        fill='tonexty',
+                        fillcolor='rgba(25, 118, 210, 0.1)'
+                    ),
+                    secondary_y=False
+                )
         
-        fig.add_trace(go.Scatter(
-            x=daily_perf['Date'],
-            y=daily_perf['Net_PnL'],
-            name="Daily PnL",
-            line=dict(color='lightgray', width=1),
-            opacity=0.5
-        ))
+                fig.add_trace(
+                    go.Scatter(
+                        **downsampled(daily_perf['Date'], daily_perf['value']),
+                        name="Fear & Greed Index",
+                        line=dict(color='#ff9800', width=2, dash='dot')
+                    ),
+                    secondary_y=True
+                )
         
-        fig.add_trace(go.Scatter(
-            x=daily_perf['Date'],
-            y=daily_perf[f'{window}D_MA'],
-            name=f"{window}-Day MA",
-            line=dict(color='#1976d2', width=3)
-        ))
+                # Add sentiment zones
+                fig.add_hrect(y0=0, y1=25, fillcolor="red", opacity=0.1, layer="below", 
+                             line_width=0, secondary_y=True, annotation_text="Extreme Fear", annotation_position="left")
+                fig.add_hrect(y0=75, y1=100, fillcolor="green", opacity=0.1, layer="below",
+                             line_width=0, secondary_y=True, annotation_text="Extreme Greed", annotation_position="left")
+        
+                fig.update_xaxes(title_text="Date")
+                fig.update_yaxes(title_text="Cumulative PnL ($)", secondary_y=False)
+                fig.update_yaxes(title_text="Fear & Greed Index", secondary_y=True, range=[0, 100])
+        
+                fig.update_layout(
+                    title="Cumulative PnL vs Market Sentiment",
+                    height=500,
+                    hovermode='x unified'
+                )
+                return fig
+        
+            show_chart('cumulative_pnl_vs_sentiment', build_cumulative_pnl_vs_sentiment)
+        
+            # Rolling statistics
+            st.markdown('<h3 class="sub-header">Rolling Performance Metrics</h3>', unsafe_allow_html=True)
+        
+            window = st.slider("Rolling Window (days)", 1, MAX_WINDOW, 7, key="rolling_window")
+        
+            def build_rolling_average():
+                daily_perf = chart_data('daily_perf', daily_performance)
+                rolling_stats = chart_data('rolling_stats', rolling_statistics)
+                fig = go.Figure()
+        
+                fig.add_trace(go.Scatter(
+                    **downsampled(daily_perf['Date'], daily_perf['Net_PnL']),
+                    name="Daily PnL",
+                    line=dict(color='lightgray', width=1),
+                    opacity=0.5
+                ))
+        
+                fig.add_trace(go.Scatter(
+                    **downsampled(daily_perf['Date'], rolling_stats.mean(window)),
+                    name=f"{window}-Day MA",
+                    line=dict(color='#1976d2', width=3)
+                ))
         
-        fig.update_layout(
-            title=f"Daily PnL with {window}-Day Moving Average",
-            xaxis_title="Date",
-            yaxis_title="PnL ($)",
-            height=400,
-            hovermode='x unified'
-        )
+                fig.update_layout(
+                    title=f"Daily PnL with {window}-Day Moving Average",
+                    xaxis_title="Date",
+                    yaxis_title="PnL ($)",
+                    height=400,
+                    hovermode='x unified'
+                )
+                return fig
+        
+            show_chart('rolling_average', build_rolling_average)
+        
+            # Rolling risk-adjusted metrics over the same window
+            def build_rolling_sharpe():
+                daily_perf = chart_data('daily_perf', daily_performance)
+                rolling_stats = chart_data('rolling_stats', rolling_statistics)
+                fig = make_subplots(specs=[[{"secondary_y": True}]])
+        
+                fig.add_trace(
+                    go.Scatter(
+                        **downsampled(daily_perf['Date'], rolling_stats.sharpe(window)),
+                        name=f"{window}-Day Sharpe",
+                        line=dict(color='#4caf50', width=2)
+                    ),
+                    secondary_y=False
+                )
         
-        st.plotly_chart(fig, width='stretch')
+                fig.add_trace(
+                    go.Scatter(
+                        **downsampled(daily_perf['Date'], rolling_stats.zscore(window)),
+                        name="Daily PnL Z-Score",
+                        line=dict(color='#9c27b0', width=1, dash='dot')
+                    ),
+                    secondary_y=True
+                )
+        
+                fig.update_xaxes(title_text="Date")
+                fig.update_yaxes(title_text="Sharpe Ratio", secondary_y=False)
+                fig.update_yaxes(title_text="Z-Score", secondary_y=True)
+        
+                fig.update_layout(
+                    title=f"{window}-Day Rolling Sharpe Ratio and Z-Score",
+                    height=400,
+                    hovermode='x unified'
+                )
+                return fig
+        
+            show_chart('rolling_sharpe', build_rolling_sharpe)
     
     # TAB 4: Sentiment Analysis
-    with tab4:
-        st.markdown('<h3 class="sub-header">Sentiment Impact Analysis</h3>', unsafe_allow_html=True)
+    if tab_open(tab4):
+        with timed_tab(tab4):
+            st.markdown('<h3 class="sub-header">Sentiment Impact Analysis</h3>', unsafe_allow_html=True)
         
-        col1, col2 = st.columns(2)
+            col1, col2 = st.columns(2)
         
-        with col1:
-            # Trade distribution by sentiment
-            trade_counts = filtered_df['sentiment_category'].value_counts().reindex(sentiment_order, fill_value=0)
+            with col1:
+                # Trade distribution by sentiment
+                def build_trade_count_by_sentiment():
+                    trade_counts = by_sentiment['count'].reindex(sentiment_order, fill_value=0)
+                    fig = go.Figure(data=[go.Bar(
+                        x=trade_counts.index,
+                        y=trade_counts.values,
+                        marker=dict(color=colors),
+                        text=[f'{v:,}' for v in trade_counts.values],
+                        textposition='outside'
+                    )])
+                    fig.update_layout(
+                        title="Trade Count by Sentiment",
+                        xaxis_title="Sentiment",
+                        yaxis_title="Number of Trades",
+                        height=400
+                    )
+                    return fig
             
-            fig = go.Figure(data=[go.Bar(
-                x=trade_counts.index,
-                y=trade_counts.values,
-                marker=dict(color=colors),
-                text=[f'{v:,}' for v in trade_counts.values],
-                textposition='outside'
-            )])
-            fig.update_layout(
-                title="Trade Count by Sentiment",
-                xaxis_title="Sentiment",
-                yaxis_title="Number of Trades",
-                height=400
-            )
-            st.plotly_chart(fig, width='stretch')
+                show_chart('trade_count_by_sentiment', build_trade_count_by_sentiment)
         
-        with col2:
-            # Average position size
-            avg_position = filtered_df.groupby('sentiment_category')['Size USD'].mean().reindex(sentiment_order, fill_value=0)
+            with col2:
+                # Average position size
+                def build_avg_size_by_sentiment():
+                    avg_position = by_sentiment['Size USD_mean'].reindex(sentiment_order, fill_value=0)
+                    fig = go.Figure(data=[go.Bar(
+                        x=avg_position.index,
+                        y=avg_position.values,
+                        marker=dict(color=colors),
+                        text=[f'${v:,.0f}' for v in avg_position.values],
+                        textposition='outside'
+                    )])
+                    fig.update_layout(
+                        title="Average Position Size",
+                        xaxis_title="Sentiment",
+                        yaxis_title="Avg Size (USD)",
+                        height=400
+                    )
+                    return fig
             
-            fig = go.Figure(data=[go.Bar(
-                x=avg_position.index,
-                y=avg_position.values,
-                marker=dict(color=colors),
-                text=[f'${v:,.0f}' for v in avg_position.values],
-                textposition='outside'
-            )])
-            fig.update_layout(
-                title="Average Position Size",
-                xaxis_title="Sentiment",
-                yaxis_title="Avg Size (USD)",
-                height=400
-            )
-            st.plotly_chart(fig, width='stretch')
-        
-        # Correlation heatmap
-        st.markdown('<h3 class="sub-header">Feature Correlation Matrix</h3>', unsafe_allow_html=True)
-        
-        numeric_features = filtered_df[['value', 'Net_PnL', 'Size USD', 'Fee', 'Hour']].corr()
-        
-        fig = go.Figure(data=go.Heatmap(
-            z=numeric_features.values,
-            x=['Sentiment', 'PnL', 'Trade Size', 'Fee', 'Hour'],
-            y=['Sentiment', 'PnL', 'Trade Size', 'Fee', 'Hour'],
-            colorscale='RdBu',
-            zmid=0,
-            text=numeric_features.values.round(3),
-            texttemplate='%{text}',
-            textfont={"size": 12},
-            colorbar=dict(title="Correlation")
-        ))
+                show_chart('avg_size_by_sentiment', build_avg_size_by_sentiment)
+        
+            # Correlation heatmap
+            st.markdown('<h3 class="sub-header">Feature Correlation Matrix</h3>', unsafe_allow_html=True)
+        
+            def build_correlation_matrix():
+                numeric_features = filtered_df[['value', 'Net_PnL', 'Size USD', 'Fee', 'Hour']].corr()
+                fig = go.Figure(data=go.Heatmap(
+                    z=numeric_features.values,
+                    x=['Sentiment', 'PnL', 'Trade Size', 'Fee', 'Hour'],
+                    y=['Sentiment', 'PnL', 'Trade Size', 'Fee', 'Hour'],
+                    colorscale='RdBu',
+                    zmid=0,
+                    text=numeric_features.values.round(3),
+                    texttemplate='%{text}',
+                    textfont={"size": 12},
+                    colorbar=dict(title="Correlation")
+                ))
         
-        fig.update_layout(
-            title="Correlation Heatmap",
-            height=500
-        )
-        st.plotly_chart(fig, width='stretch')
+                fig.update_layout(
+                    title="Correlation Heatmap",
+                    height=500
+                )
+                return fig
+        
+            show_chart('correlation_matrix', build_correlation_matrix)
 
 # Continue to next page...
 
@@ -974,349 +1238,578 @@ if page == "🏠 Dashboard":
 if page == "📊 Advanced Analytics":
     st.markdown('<h1 class="main-header">📊 Advanced Analytics</h1>', unsafe_allow_html=True)
     
+    # Sentiment-level aggregates for this page, rolled up from the cube
+    by_sentiment = cube_view.rollup('sentiment_category')
+    
     tabs = st.tabs([
         "📈 Statistical Tests",
         "📉 Volatility Analysis",
         "💹 Drawdown Analysis",
         "🎯 Win/Loss Streaks"
-    ])
+    ], key='analytics_tab', on_change='rerun')
     
     # TAB 1: Statistical Significance
-    with tabs[0]:
-        st.markdown('<h3 class="sub-header">Statistical Significance Testing</h3>', unsafe_allow_html=True)
+    if tab_open(tabs[0], ['permutation_mode', 'max_permutations', 'permutation_precision',
+                          'posthoc_test', 'posthoc_correction']):
+        with timed_tab(tabs[0]):
+            st.markdown('<h3 class="sub-header">Statistical Significance Testing</h3>', unsafe_allow_html=True)
         
-        st.info("💡 **Purpose**: Determine if performance differences across sentiments are statistically significant or due to random chance.")
+            st.info("💡 **Purpose**: Determine if performance differences across sentiments are statistically significant or due to random chance.")
         
-        # Prepare sentiment groups
-        sentiment_groups = {}
-        for sentiment in sentiment_order:
-            if sentiment in filtered_df['sentiment_category'].values:
-                sentiment_groups[sentiment] = filtered_df[filtered_df['sentiment_category'] == sentiment]['Net_PnL'].dropna()
+            # Rank Net_PnL once per dataset load and filter state for all rank-based tests
+            rank_tests = cached_for_filters(
+                'rank_tests', filter_key,
+                lambda: RankTests(filtered_df['Net_PnL'], filtered_df['sentiment_category'])
+            )
         
-        if len(sentiment_groups) >= 2:
-            # ANOVA Test
-            st.markdown("#### 1️⃣ One-Way ANOVA Test")
-            st.markdown("Tests if mean PnL differs significantly across sentiment categories")
+            if len(rank_tests.labels) >= 2:
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    permutation_mode = st.toggle(
+                        "🔀 Permutation mode", value=False, key='permutation_mode',
+                        help="Shuffle sentiment labels against PnL for distribution-free ANOVA and Kruskal-Wallis p-values"
+                    )
+                with col2:
+                    max_permutations = st.select_slider(
+                        "Max permutations", options=[1000, 2000, 5000, 10000], value=2000,
+                        key='max_permutations', disabled=not permutation_mode
+                    )
+                with col3:
+                    precision = st.select_slider(
+                        "P-value precision (±)", options=[0.001, 0.0025, 0.005, 0.01, 0.02], value=0.01,
+                        key='permutation_precision', disabled=not permutation_mode,
+                        help="Stop shuffling once the p-value's standard error is this small"
+                    )
+                permutations = (
+                    load_permutation_tests(handle.loaded_at, filter_key, max_permutations, precision, filtered_df, rank_tests)
+                    if permutation_mode else None
+                )
             
-            f_stat, p_value = stats.f_oneway(*[sentiment_groups[s] for s in sentiment_groups.keys()])
+                # ANOVA Test
+                st.markdown("#### 1️⃣ One-Way ANOVA Test")
+                st.markdown("Tests if mean PnL differs significantly across sentiment categories")
             
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("F-Statistic", f"{f_stat:.4f}")
-            with col2:
-                st.metric("P-Value", f"{p_value:.6f}")
-            with col3:
-                significance = "✅ SIGNIFICANT" if p_value < 0.05 else "❌ NOT SIGNIFICANT"
-                st.metric("Result (α=0.05)", significance)
+                # From the per-sentiment count, sum and sum of squares in the cube
+                f_stat, p_value, _, _ = one_way_anova(
+                    by_sentiment['Net_PnL_n'], by_sentiment['Net_PnL_sum'], by_sentiment['Net_PnL_sumsq']
+                )
             
-            if p_value < 0.05:
-                st.success(f"**Conclusion**: PnL differs significantly across sentiments (p = {p_value:.6f} < 0.05)")
-            else:
-                st.warning(f"**Conclusion**: No significant difference detected (p = {p_value:.6f} ≥ 0.05)")
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("F-Statistic", f"{f_stat:.4f}")
+                with col2:
+                    st.metric("P-Value", f"{p_value:.6f}")
+                with col3:
+                    significance = "✅ SIGNIFICANT" if p_value < 0.05 else "❌ NOT SIGNIFICANT"
+                    st.metric("Result (α=0.05)", significance)
+                if permutations:
+                    show_permutation_p(*permutations['anova'])
             
-            # Kruskal-Wallis Test
-            st.markdown("---")
-            st.markdown("#### 2️⃣ Kruskal-Wallis Test (Non-Parametric)")
-            st.markdown("Alternative to ANOVA that doesn't assume normal distribution")
+                if p_value < 0.05:
+                    st.success(f"**Conclusion**: PnL differs significantly across sentiments (p = {p_value:.6f} < 0.05)")
+                else:
+                    st.warning(f"**Conclusion**: No significant difference detected (p = {p_value:.6f} ≥ 0.05)")
             
-            h_stat, p_value_kw = stats.kruskal(*[sentiment_groups[s] for s in sentiment_groups.keys()])
+                # Kruskal-Wallis Test
+                st.markdown("---")
+                st.markdown("#### 2️⃣ Kruskal-Wallis Test (Non-Parametric)")
+                st.markdown("Alternative to ANOVA that doesn't assume normal distribution")
             
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("H-Statistic", f"{h_stat:.4f}")
-            with col2:
-                st.metric("P-Value", f"{p_value_kw:.6f}")
-            with col3:
-                significance_kw = "✅ SIGNIFICANT" if p_value_kw < 0.05 else "❌ NOT SIGNIFICANT"
-                st.metric("Result (α=0.05)", significance_kw)
+                h_stat, p_value_kw = rank_tests.kruskal()
             
-            # Chi-Square Test
-            st.markdown("---")
-            st.markdown("#### 3️⃣ Chi-Square Test (Profitability vs Sentiment)")
-            st.markdown("Tests if profitability is independent of market sentiment")
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("H-Statistic", f"{h_stat:.4f}")
+                with col2:
+                    st.metric("P-Value", f"{p_value_kw:.6f}")
+                with col3:
+                    significance_kw = "✅ SIGNIFICANT" if p_value_kw < 0.05 else "❌ NOT SIGNIFICANT"
+                    st.metric("Result (α=0.05)", significance_kw)
+                if permutations:
+                    show_permutation_p(*permutations['kruskal'])
             
-            contingency_table = pd.crosstab(filtered_df['sentiment_category'], filtered_df['is_profitable'])
-            chi2, p_value_chi, dof, expected = stats.chi2_contingency(contingency_table)
+                # Chi-Square Test
+                st.markdown("---")
+                st.markdown("#### 3️⃣ Chi-Square Test (Profitability vs Sentiment)")
+                st.markdown("Tests if profitability is independent of market sentiment")
             
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("Chi-Square", f"{chi2:.4f}")
-            with col2:
-                st.metric("P-Value", f"{p_value_chi:.6f}")
-            with col3:
-                st.metric("DOF", f"{dof}")
-            with col4:
-                significance_chi = "✅ SIGNIFICANT" if p_value_chi < 0.05 else "❌ NOT SIGNIFICANT"
-                st.metric("Result", significance_chi)
+                contingency_table = profitability_table(by_sentiment)
+                chi2, p_value_chi, dof, expected = chi_square_independence(contingency_table)
+            
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Chi-Square", f"{chi2:.4f}")
+                with col2:
+                    st.metric("P-Value", f"{p_value_chi:.6f}")
+                with col3:
+                    st.metric("DOF", f"{dof}")
+                with col4:
+                    significance_chi = "✅ SIGNIFICANT" if p_value_chi < 0.05 else "❌ NOT SIGNIFICANT"
+                    st.metric("Result", significance_chi)
             
-            st.dataframe(contingency_table, width='stretch')
+                st.dataframe(contingency_table, width='stretch')
             
-            # Pairwise Comparison
-            if 'Extreme Fear' in sentiment_groups and 'Extreme Greed' in sentiment_groups:
-                st.markdown("---")
-                st.markdown("#### 4️⃣ Mann-Whitney U Test: Extreme Fear vs Extreme Greed")
+                # Pairwise Comparison
+                if 'Extreme Fear' in rank_tests.labels and 'Extreme Greed' in rank_tests.labels:
+                    st.markdown("---")
+                    st.markdown("#### 4️⃣ Mann-Whitney U Test: Extreme Fear vs Extreme Greed")
                 
-                stat, p_value_mw = stats.mannwhitneyu(
-                    sentiment_groups['Extreme Fear'],
-                    sentiment_groups['Extreme Greed'],
-                    alternative='two-sided'
-                )
+                    stat, p_value_mw = rank_tests.mann_whitney('Extreme Fear', 'Extreme Greed')
+                
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.metric("U-Statistic", f"{stat:.4f}")
+                    with col2:
+                        st.metric("P-Value", f"{p_value_mw:.6f}")
                 
+                    if p_value_mw < 0.05:
+                        st.success("**Conclusion**: Significant difference between Extreme Fear and Extreme Greed")
+                    else:
+                        st.warning("**Conclusion**: No significant difference detected")
+            
+                # Post-hoc tests for every pair of sentiments
+                st.markdown("---")
+                st.markdown("#### 5️⃣ Post-Hoc Pairwise Comparisons")
+                st.markdown("Tests every pair of sentiments, with p-values corrected for the number of comparisons")
+            
                 col1, col2 = st.columns(2)
                 with col1:
-                    st.metric("U-Statistic", f"{stat:.4f}")
+                    posthoc_test = st.selectbox("Pairwise test", list(POSTHOC_TESTS), key="posthoc_test")
                 with col2:
-                    st.metric("P-Value", f"{p_value_mw:.6f}")
-                
-                if p_value_mw < 0.05:
-                    st.success("**Conclusion**: Significant difference between Extreme Fear and Extreme Greed")
+                    correction = st.radio("Correction", list(CORRECTIONS), horizontal=True, key="posthoc_correction")
+            
+                group_stats = by_sentiment.reindex(rank_tests.labels)
+                posthoc = chart_data('posthoc', lambda: posthoc_table(
+                    rank_tests, group_stats['Net_PnL_n'], group_stats['Net_PnL_mean'],
+                    group_stats['Net_PnL_std'] ** 2, correction=correction
+                ))
+            
+                def build_posthoc_heatmap():
+                    p_matrix = p_value_matrix(posthoc, f'{POSTHOC_TESTS[posthoc_test]}_p_adj', rank_tests.labels)
+                    fig = go.Figure(data=go.Heatmap(
+                        z=p_matrix.values,
+                        x=p_matrix.columns,
+                        y=p_matrix.index,
+                        colorscale='RdYlGn_r',
+                        zmin=0,
+                        zmax=0.1,
+                        text=p_matrix.values.round(4),
+                        texttemplate='%{text}',
+                        textfont={"size": 12},
+                        colorbar=dict(title="Adjusted p")
+                    ))
+                    fig.update_layout(
+                        title=f"{posthoc_test} Adjusted P-Values ({correction})",
+                        height=450
+                    )
+                    return fig
+            
+                show_chart('posthoc_heatmap', build_posthoc_heatmap)
+            
+                significant_pairs = posthoc[posthoc[f'{POSTHOC_TESTS[posthoc_test]}_p_adj'] < 0.05]
+                if len(significant_pairs) > 0:
+                    pairs_text = ', '.join(f"{a} vs {b}" for a, b in zip(significant_pairs['group_1'], significant_pairs['group_2']))
+                    st.success(f"**Significant pairs (α=0.05)**: {pairs_text}")
                 else:
-                    st.warning("**Conclusion**: No significant difference detected")
+                    st.warning("**Conclusion**: No pair differs significantly after correction")
+            
+                with st.expander("📋 All pairwise statistics"):
+                    st.dataframe(posthoc.round(6), width='stretch', hide_index=True)
     
     # TAB 2: Volatility Analysis
-    with tabs[1]:
-        st.markdown('<h3 class="sub-header">Volatility & Risk Analysis</h3>', unsafe_allow_html=True)
-        
-        # Volatility by sentiment
-        volatility_data = filtered_df.groupby('sentiment_category')['Net_PnL'].std().reindex(sentiment_order, fill_value=0)
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            fig = go.Figure(data=[go.Bar(
-                x=volatility_data.index,
-                y=volatility_data.values,
-                marker=dict(color=colors),
-                text=[f'${v:,.2f}' for v in volatility_data.values],
-                textposition='outside'
-            )])
-            fig.update_layout(
-                title="PnL Volatility (Standard Deviation)",
-                xaxis_title="Sentiment",
-                yaxis_title="Std Dev ($)",
-                height=400
-            )
-            st.plotly_chart(fig, width='stretch')
+    if tab_open(tabs[1]):
+        with timed_tab(tabs[1]):
+            st.markdown('<h3 class="sub-header">Volatility & Risk Analysis</h3>', unsafe_allow_html=True)
         
-        with col2:
-            # Coefficient of Variation
-            cv_data = filtered_df.groupby('sentiment_category').agg({
-                'Net_PnL': ['mean', 'std']
-            })
-            cv_data['CV'] = (cv_data[('Net_PnL', 'std')] / cv_data[('Net_PnL', 'mean')].abs()) * 100
-            cv_values = cv_data['CV'].reindex(sentiment_order, fill_value=0)
+            # Volatility by sentiment
+            volatility_data = by_sentiment['Net_PnL_std'].reindex(sentiment_order, fill_value=0)
+        
+            col1, col2 = st.columns(2)
+        
+            with col1:
+                def build_pnl_volatility():
+                    fig = go.Figure(data=[go.Bar(
+                        x=volatility_data.index,
+                        y=volatility_data.values,
+                        marker=dict(color=colors),
+                        text=[f'${v:,.2f}' for v in volatility_data.values],
+                        textposition='outside'
+                    )])
+                    fig.update_layout(
+                        title="PnL Volatility (Standard Deviation)",
+                        xaxis_title="Sentiment",
+                        yaxis_title="Std Dev ($)",
+                        height=400
+                    )
+                    return fig
             
-            fig = go.Figure(data=[go.Bar(
-                x=cv_values.index,
-                y=cv_values.values,
-                marker=dict(color=colors),
-                text=[f'{v:.1f}%' for v in cv_values.values],
-                textposition='outside'
-            )])
-            fig.update_layout(
-                title="Coefficient of Variation (Risk/Return)",
-                xaxis_title="Sentiment",
-                yaxis_title="CV (%)",
-                height=400
-            )
-            st.plotly_chart(fig, width='stretch')
+                show_chart('pnl_volatility', build_pnl_volatility)
+        
+            with col2:
+                # Coefficient of Variation
+                cv_data = (by_sentiment['Net_PnL_std'] / by_sentiment['Net_PnL_mean'].abs()) * 100
+                cv_values = cv_data.reindex(sentiment_order, fill_value=0)
+            
+                def build_coefficient_of_variation():
+                    fig = go.Figure(data=[go.Bar(
+                        x=cv_values.index,
+                        y=cv_values.values,
+                        marker=dict(color=colors),
+                        text=[f'{v:.1f}%' for v in cv_values.values],
+                        textposition='outside'
+                    )])
+                    fig.update_layout(
+                        title="Coefficient of Variation (Risk/Return)",
+                        xaxis_title="Sentiment",
+                        yaxis_title="CV (%)",
+                        height=400
+                    )
+                    return fig
+            
+                show_chart('coefficient_of_variation', build_coefficient_of_variation)
         
-        # Volatility insights
-        st.markdown("---")
-        st.markdown("### 💡 Volatility Insights")
+            # Volatility insights
+            st.markdown("---")
+            st.markdown("### 💡 Volatility Insights")
         
-        most_volatile = volatility_data.idxmax()
-        least_volatile = volatility_data.idxmin()
+            most_volatile = volatility_data.idxmax()
+            least_volatile = volatility_data.idxmin()
         
-        col1, col2, col3 = st.columns(3)
+            col1, col2, col3 = st.columns(3)
         
-        with col1:
-            st.markdown(f"""
-            <div class="warning-box">
-                <h4>⚠️ Most Volatile</h4>
-                <h3>{most_volatile}</h3>
-                <p>Std Dev: ${volatility_data[most_volatile]:,.2f}</p>
-            </div>
-            """, unsafe_allow_html=True)
+            with col1:
+                st.markdown(f"""
+                <div class="warning-box">
+                    <h4>⚠️ Most Volatile</h4>
+                    <h3>{most_volatile}</h3>
+                    <p>Std Dev: ${volatility_data[most_volatile]:,.2f}</p>
+                </div>
+                """, unsafe_allow_html=True)
         
-        with col2:
-            st.markdown(f"""
-            <div class="success-box">
-                <h4>✅ Least Volatile</h4>
-                <h3>{least_volatile}</h3>
-                <p>Std Dev: ${volatility_data[least_volatile]:,.2f}</p>
-            </div>
-            """, unsafe_allow_html=True)
+            with col2:
+                st.markdown(f"""
+                <div class="success-box">
+                    <h4>✅ Least Volatile</h4>
+                    <h3>{least_volatile}</h3>
+                    <p>Std Dev: ${volatility_data[least_volatile]:,.2f}</p>
+                </div>
+                """, unsafe_allow_html=True)
         
-        with col3:
-            most_efficient = cv_values.idxmin()
-            st.markdown(f"""
-            <div class="insight-box">
-                <h4>🎯 Most Efficient</h4>
-                <h3>{most_efficient}</h3>
-                <p>CV: {cv_values[most_efficient]:.1f}%</p>
-            </div>
-            """, unsafe_allow_html=True)
+            with col3:
+                most_efficient = cv_values.idxmin()
+                st.markdown(f"""
+                <div class="insight-box">
+                    <h4>🎯 Most Efficient</h4>
+                    <h3>{most_efficient}</h3>
+                    <p>CV: {cv_values[most_efficient]:.1f}%</p>
+                </div>
+                """, unsafe_allow_html=True)
     
     # TAB 3: Drawdown Analysis
-    with tabs[2]:
-        st.markdown('<h3 class="sub-header">Maximum Drawdown Analysis</h3>', unsafe_allow_html=True)
-        
-        st.info("💡 **Drawdown**: The peak-to-trough decline during a specific period. Critical for understanding worst-case scenarios.")
-        
-        # Calculate drawdown
-        daily_pnl = filtered_df.groupby('Date')['Net_PnL'].sum().sort_index()
-        cumulative_pnl = daily_pnl.cumsum()
-        running_max = cumulative_pnl.expanding().max()
-        drawdown = cumulative_pnl - running_max
-        drawdown_pct = (drawdown / running_max.replace(0, np.nan)) * 100
-        
-        # Visualization
-        fig = make_subplots(
-            rows=2, cols=1,
-            subplot_titles=("Cumulative PnL with Drawdown", "Drawdown Percentage"),
-            row_heights=[0.6, 0.4],
-            shared_xaxes=True
-        )
-        
-        fig.add_trace(
-            go.Scatter(x=cumulative_pnl.index, y=cumulative_pnl.values,
-                      name="Cumulative PnL", line=dict(color='#1976d2', width=2)),
-            row=1, col=1
-        )
-        
-        fig.add_trace(
-            go.Scatter(x=running_max.index, y=running_max.values,
-                      name="Running Max", line=dict(color='#4caf50', width=2, dash='dash')),
-            row=1, col=1
-        )
-        
-        fig.add_trace(
-            go.Scatter(x=drawdown_pct.index, y=drawdown_pct.values,
-                      name="Drawdown %", fill='tozeroy', 
-                      line=dict(color='#f44336', width=1),
-                      fillcolor='rgba(244, 67, 54, 0.3)'),
-            row=2, col=1
-        )
-        
-        fig.update_xaxes(title_text="Date", row=2, col=1)
-        fig.update_yaxes(title_text="PnL ($)", row=1, col=1)
-        fig.update_yaxes(title_text="Drawdown (%)", row=2, col=1)
-        
-        fig.update_layout(height=600, hovermode='x unified', showlegend=True)
-        st.plotly_chart(fig, width='stretch')
-        
-        # Drawdown metrics
-        max_dd = drawdown.min()
-        max_dd_pct = drawdown_pct.min()
-        max_dd_date = drawdown.idxmin()
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.metric("Maximum Drawdown", f"${max_dd:,.2f}",
-                     delta=f"{max_dd_pct:.2f}%", delta_color="inverse")
-        with col2:
-            st.metric("Max DD Date", max_dd_date.strftime('%Y-%m-%d'))
-        with col3:
-            recovery_dates = cumulative_pnl[cumulative_pnl.index > max_dd_date]
-            peak_before = running_max.loc[max_dd_date]
-            if len(recovery_dates[recovery_dates >= peak_before]) > 0:
-                recovery_date = recovery_dates[recovery_dates >= peak_before].index[0]
-                recovery_days = (recovery_date - max_dd_date).days
-                st.metric("Recovery Time", f"{recovery_days} days")
+    if tab_open(tabs[2], ['drawdown_curve', 'drawdown_top_n'] + SIM_WIDGETS):
+        with timed_tab(tabs[2]):
+            st.markdown('<h3 class="sub-header">Maximum Drawdown Analysis</h3>', unsafe_allow_html=True)
+        
+            st.info("💡 **Drawdown**: The peak-to-trough decline during a specific period. Critical for understanding worst-case scenarios.")
+        
+            # Calculate drawdown
+            def daily_drawdown():
+                daily_pnl = cube_view.rollup('Date')['Net_PnL_sum']
+                cumulative_pnl, running_max, drawdown = drawdown_curve(daily_pnl.to_numpy())
+                return pd.DataFrame({
+                    'cumulative_pnl': cumulative_pnl,
+                    'running_max': running_max,
+                    'drawdown_pct': drawdown / np.where(running_max == 0, np.nan, running_max) * 100
+                }, index=daily_pnl.index)
+        
+            drawdown_data = chart_data('daily_drawdown', daily_drawdown)
+            episodes = cached_for_filters('drawdown_episodes', filter_key, lambda: find_drawdowns(filtered_df))
+        
+            # Visualization
+            def build_drawdown_chart():
+                cumulative_pnl, running_max, drawdown_pct = (
+                    drawdown_data['cumulative_pnl'], drawdown_data['running_max'], drawdown_data['drawdown_pct']
+                )
+                fig = make_subplots(
+                    rows=2, cols=1,
+                    subplot_titles=("Cumulative PnL with Drawdown", "Drawdown Percentage"),
+                    row_heights=[0.6, 0.4],
+                    shared_xaxes=True
+                )
+        
+                fig.add_trace(
+                    go.Scatter(**downsampled(cumulative_pnl.index, cumulative_pnl.values),
+                              name="Cumulative PnL", line=dict(color='#1976d2', width=2)),
+                    row=1, col=1
+                )
+        
+                fig.add_trace(
+                    go.Scatter(**downsampled(running_max.index, running_max.values),
+                              name="Running Max", line=dict(color='#4caf50', width=2, dash='dash')),
+                    row=1, col=1
+                )
+        
+                fig.add_trace(
+                    go.Scatter(**downsampled(drawdown_pct.index, drawdown_pct.values),
+                              name="Drawdown %", fill='tozeroy', 
+                              line=dict(color='#f44336', width=1),
+                              fillcolor='rgba(244, 67, 54, 0.3)'),
+                    row=2, col=1
+                )
+        
+                fig.update_xaxes(title_text="Date", row=2, col=1)
+                fig.update_yaxes(title_text="PnL ($)", row=1, col=1)
+                fig.update_yaxes(title_text="Drawdown (%)", row=2, col=1)
+        
+                fig.update_layout(height=600, hovermode='x unified', showlegend=True)
+                return fig
+        
+            show_chart('drawdown_chart', build_drawdown_chart)
+        
+            # Drawdown metrics, from the deepest episode
+            col1, col2, col3 = st.columns(3)
+        
+            if len(episodes) > 0:
+                worst = episodes.loc[episodes['depth'].idxmin()]
+                with col1:
+                    st.metric("Maximum Drawdown", f"${worst['depth']:,.2f}",
+                             delta=f"{drawdown_data['drawdown_pct'].min():.2f}%", delta_color="inverse")
+                with col2:
+                    st.metric("Max DD Date", worst['trough_date'].strftime('%Y-%m-%d'))
+                with col3:
+                    if worst['recovered']:
+                        st.metric("Recovery Time", f"{int(worst['recovery_days'])} days")
+                    else:
+                        st.metric("Recovery Time", "Not yet recovered", delta_color="inverse")
             else:
-                st.metric("Recovery Time", "Not yet recovered", delta_color="inverse")
+                with col1:
+                    st.metric("Maximum Drawdown", "$0.00")
+                with col2:
+                    st.metric("Max DD Date", "-")
+                with col3:
+                    st.metric("Recovery Time", "No drawdown")
+        
+            # Episode catalogue
+            st.markdown("#### 📉 Drawdown Episodes")
+        
+            col1, col2 = st.columns([2, 1])
+            with col1:
+                episode_curve = st.selectbox(
+                    "Drawdown curve",
+                    ["Portfolio", "Sentiment", "Account", "Coin"],
+                    key="drawdown_curve"
+                )
+            with col2:
+                top_n = st.slider("Top episodes", 5, 50, 10, key="drawdown_top_n")
+        
+            curve_columns = {'Sentiment': 'sentiment_category', 'Account': 'Account', 'Coin': 'Coin'}
+            if episode_curve != "Portfolio":
+                episodes = cached_for_filters(
+                    'curve_episodes', (filter_key, episode_curve),
+                    lambda: find_drawdowns(filtered_df, by=curve_columns[episode_curve])
+                )
+        
+            top_episodes = episodes.nsmallest(top_n, 'depth').drop(columns=['peak', 'trough'])
+            top_episodes = top_episodes.rename(columns={
+                'sentiment_category': 'Sentiment',
+                'peak_date': 'Peak', 'trough_date': 'Trough', 'recovery_date': 'Recovery',
+                'peak_pnl': 'Peak PnL', 'trough_pnl': 'Trough PnL', 'depth': 'Depth ($)',
+                'depth_pct': 'Depth (%)', 'duration_days': 'Duration (days)',
+                'recovery_days': 'Recovery (days)', 'recovered': 'Recovered',
+                'trough_sentiment': 'Sentiment at Trough'
+            })
+            st.caption(f"{len(episodes):,} drawdown episodes on the {episode_curve.lower()} curve(s)")
+            st.dataframe(top_episodes.style.format({
+                'Peak': lambda d: d.strftime('%Y-%m-%d'),
+                'Trough': lambda d: d.strftime('%Y-%m-%d'),
+                'Recovery': lambda d: d.strftime('%Y-%m-%d') if pd.notna(d) else '-',
+                'Peak PnL': '${:,.2f}', 'Trough PnL': '${:,.2f}', 'Depth ($)': '${:,.2f}',
+                'Depth (%)': '{:.1f}%', 'Recovery (days)': '{:.0f}'
+            }, na_rep='-'), width='stretch', hide_index=True)
+        
+            # Monte Carlo equity curves
+            st.markdown("---")
+            st.markdown("#### 🎲 Monte Carlo Equity Simulation & Risk of Ruin")
+            st.info("💡 **Simulation**: Resample the realized trades into thousands of alternative equity curves. Longer blocks keep win/loss streaks together.")
+        
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                sim_capital = st.number_input("Starting capital ($)", min_value=100, value=10000, step=1000, key='sim_capital')
+                sim_ruin_pct = st.slider("Ruin at (% of capital left)", 0, 90, 50, 5, key='sim_ruin_pct')
+            with col2:
+                sim_trades = st.select_slider("Trades per path", options=[250, 500, 1000, 2000], value=1000, key='sim_trades')
+                sim_paths = st.select_slider("Paths", options=[1000, 10000, 100000], value=10000, key='sim_paths')
+            with col3:
+                sim_block = st.select_slider("Block size (trades)", options=[1, 5, 10, 25, 50], value=1, key='sim_block',
+                                             help="1 resamples single trades; longer blocks keep streak structure")
+        
+            # With no trades every share is 0/0, so missing shares count as zero
+            regime_share = filtered_df['sentiment_category'].value_counts(normalize=True).fillna(0)
+            with st.expander("Sentiment regime mix (default: historical)"):
+                mix_columns = st.columns(len(sentiment_order))
+                sim_mix = []
+                for column, sentiment in zip(mix_columns, sentiment_order):
+                    with column:
+                        share = int(round(regime_share.get(sentiment, 0) * 100))
+                        weight = st.slider(sentiment, 0, 100, share, key=f'sim_mix_{sentiment}',
+                                           disabled=sentiment not in regime_share.index or regime_share[sentiment] == 0)
+                        sim_mix.append((sentiment, weight))
+        
+            if len(filtered_df) == 0:
+                st.warning("⚠️ No trades match the current filters to resample")
+            elif sum(weight for sentiment, weight in sim_mix if regime_share.get(sentiment, 0) > 0) == 0:
+                st.warning("⚠️ Give at least one sentiment with trades a positive weight")
+            else:
+                sim_paths_df, sample_curves = load_equity_simulation(
+                    handle.loaded_at, filter_key, sim_trades, sim_paths, sim_block, tuple(sim_mix),
+                    sim_capital, sim_capital * sim_ruin_pct / 100, filtered_df
+                )
+                summary = ruin_summary(sim_paths_df)
+            
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Probability of Ruin", f"{summary['probability_of_ruin']:.2%}")
+                with col2:
+                    st.metric("Median Max Drawdown", f"${summary['median_max_drawdown']:,.2f}")
+                with col3:
+                    st.metric("95th Pct Max Drawdown", f"${summary['p95_max_drawdown']:,.2f}")
+                with col4:
+                    recovery = summary['median_recovery_trades']
+                    st.metric("Median Recovery", f"{recovery:,.0f} trades" if pd.notna(recovery) else "Not recovered",
+                              help=f"{summary['unrecovered_share']:.1%} of paths end before recovering their max drawdown")
+            
+                col1, col2 = st.columns(2)
+                with col1:
+                    def build_simulated_equity_curves():
+                        fig = go.Figure()
+                        for curve in sample_curves:
+                            fig.add_trace(go.Scatter(**downsampled(np.arange(len(curve)), curve), mode='lines', line=dict(color='rgba(25, 118, 210, 0.25)', width=1),
+                                                     showlegend=False, hoverinfo='skip'))
+                        fig.add_hline(y=sim_capital * sim_ruin_pct / 100, line_dash="dash", line_color="red",
+                                      annotation_text="Ruin level")
+                        fig.update_layout(
+                            title=f"{len(sample_curves)} Simulated Equity Curves",
+                            xaxis_title="Trade",
+                            yaxis_title="Equity ($)",
+                            height=400
+                        )
+                        return fig
+                
+                    show_chart('simulated_equity_curves', build_simulated_equity_curves)
+            
+                with col2:
+                    def build_simulated_drawdowns():
+                        drawdown_hist = chart_data(
+                            'sim_drawdown_hist', lambda: histograms({'paths': sim_paths_df['max_drawdown']})
+                        )
+                        fig = go.Figure(data=[histogram_bar(drawdown_hist, 'paths', marker_color='#f44336', opacity=0.75)])
+                        fig.update_layout(
+                            title=f"Max Drawdown Distribution ({sim_paths:,} paths)",
+                            xaxis_title="Max Drawdown ($)",
+                            yaxis_title="Paths",
+                            height=400
+                        )
+                        return fig
+                
+                    show_chart('simulated_drawdowns', build_simulated_drawdowns)
     
     # TAB 4: Streak Analysis
-    with tabs[3]:
-        st.markdown('<h3 class="sub-header">Win/Loss Streak Analysis</h3>', unsafe_allow_html=True)
-        
-        st.info("💡 **Streaks**: Consecutive winning or losing trades. Understanding streaks helps identify momentum and potential reversals.")
-        
-        # Calculate streaks
-        sorted_df = filtered_df.sort_values('Timestamp IST').reset_index(drop=True)
-        sorted_df['streak_id'] = (sorted_df['is_profitable'] != sorted_df['is_profitable'].shift()).cumsum()
-        
-        streak_analysis = sorted_df.groupby('streak_id').agg({
-            'is_profitable': 'first',
-            'Net_PnL': ['sum', 'count'],
-            'sentiment_category': lambda x: x.mode()[0] if len(x.mode()) > 0 else x.iloc[0]
-        })
-        
-        streak_analysis.columns = ['is_win_streak', 'total_pnl', 'streak_length', 'dominant_sentiment']
-        
-        win_streaks = streak_analysis[streak_analysis['is_win_streak'] == True]['streak_length']
-        loss_streaks = streak_analysis[streak_analysis['is_win_streak'] == False]['streak_length']
-        
-        # Streak distribution
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            fig = go.Figure()
-            fig.add_trace(go.Histogram(x=win_streaks, name="Win Streaks",
-                                      marker_color='#4caf50', opacity=0.7, nbinsx=20))
-            fig.add_trace(go.Histogram(x=loss_streaks, name="Loss Streaks",
-                                      marker_color='#f44336', opacity=0.7, nbinsx=20))
-            fig.update_layout(
-                title="Streak Length Distribution",
-                xaxis_title="Streak Length (# trades)",
-                yaxis_title="Frequency",
-                barmode='overlay',
-                height=400
-            )
-            st.plotly_chart(fig, width='stretch')
+    if tab_open(tabs[3]):
+        with timed_tab(tabs[3]):
+            st.markdown('<h3 class="sub-header">Win/Loss Streak Analysis</h3>', unsafe_allow_html=True)
         
-        with col2:
-            # Streak metrics
-            st.markdown("### 📊 Streak Metrics")
-            st.markdown(f"""
-            <div class="success-box">
-                <h4>🏆 Win Streaks</h4>
-                <p><b>Longest:</b> {win_streaks.max()} trades</p>
-                <p><b>Average:</b> {win_streaks.mean():.2f} trades</p>
-                <p><b>Total Count:</b> {len(win_streaks)}</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown(f"""
-            <div class="warning-box">
-                <h4>📉 Loss Streaks</h4>
-                <p><b>Longest:</b> {loss_streaks.max()} trades</p>
-                <p><b>Average:</b> {loss_streaks.mean():.2f} trades</p>
-                <p><b>Total Count:</b> {len(loss_streaks)}</p>
-            </div>
-            """, unsafe_allow_html=True)
+            st.info("💡 **Streaks**: Consecutive winning or losing trades. Understanding streaks helps identify momentum and potential reversals.")
         
-        # Streak by sentiment
-        st.markdown("---")
-        st.markdown("### Streak Distribution by Sentiment")
+            # Calculate streaks (run-length encoded in trade order)
+            streak_analysis = chart_data('streaks', lambda: find_streaks(filtered_df).rename(columns={
+                'is_win': 'is_win_streak',
+                'length': 'streak_length',
+                'dominant': 'dominant_sentiment'
+            }))
         
-        streak_by_sentiment = streak_analysis.groupby(['dominant_sentiment', 'is_win_streak'])['streak_length'].mean().unstack(fill_value=0)
-        streak_by_sentiment = streak_by_sentiment.reindex(sentiment_order)
+            win_streaks = streak_analysis[streak_analysis['is_win_streak'] == True]['streak_length']
+            loss_streaks = streak_analysis[streak_analysis['is_win_streak'] == False]['streak_length']
         
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            name='Loss Streaks',
-            x=streak_by_sentiment.index,
-            y=streak_by_sentiment[False] if False in streak_by_sentiment.columns else [0]*len(streak_by_sentiment),
-            marker_color='#f44336'
-        ))
-        fig.add_trace(go.Bar(
-            name='Win Streaks',
-            x=streak_by_sentiment.index,
-            y=streak_by_sentiment[True] if True in streak_by_sentiment.columns else [0]*len(streak_by_sentiment),
-            marker_color='#4caf50'
-        ))
+            # Streak distribution
+            col1, col2 = st.columns(2)
+        
+            with col1:
+                def build_streak_lengths():
+                    # Shared whole-number bins for both streak types, counted here
+                    streak_hist = chart_data(
+                        'streak_hist',
+                        lambda: histograms({'win': win_streaks, 'loss': loss_streaks}, bins=20, integer=True)
+                    )
+                    fig = go.Figure()
+                    fig.add_trace(histogram_bar(streak_hist, 'win', name="Win Streaks",
+                                                marker_color='#4caf50', opacity=0.7))
+                    fig.add_trace(histogram_bar(streak_hist, 'loss', name="Loss Streaks",
+                                                marker_color='#f44336', opacity=0.7))
+                    fig.update_layout(
+                        title="Streak Length Distribution",
+                        xaxis_title="Streak Length (# trades)",
+                        yaxis_title="Frequency",
+                        barmode='overlay',
+                        height=400
+                    )
+                    return fig
+            
+                show_chart('streak_lengths', build_streak_lengths)
         
-        fig.update_layout(
-            title="Average Streak Length by Sentiment",
-            xaxis_title="Sentiment",
-            yaxis_title="Avg Streak Length",
-            barmode='group',
-            height=400
-        )
-        st.plotly_chart(fig, width='stretch')
+            with col2:
+                # Streak metrics
+                st.markdown("### 📊 Streak Metrics")
+                st.markdown(f"""
+                <div class="success-box">
+                    <h4>🏆 Win Streaks</h4>
+                    <p><b>Longest:</b> {win_streaks.max()} trades</p>
+                    <p><b>Average:</b> {win_streaks.mean():.2f} trades</p>
+                    <p><b>Total Count:</b> {len(win_streaks)}</p>
+                </div>
+                """, unsafe_allow_html=True)
+            
+                st.markdown(f"""
+                <div class="warning-box">
+                    <h4>📉 Loss Streaks</h4>
+                    <p><b>Longest:</b> {loss_streaks.max()} trades</p>
+                    <p><b>Average:</b> {loss_streaks.mean():.2f} trades</p>
+                    <p><b>Total Count:</b> {len(loss_streaks)}</p>
+                </div>
+                """, unsafe_allow_html=True)
+        
+            # Streak by sentiment
+            st.markdown("---")
+            st.markdown("### Streak Distribution by Sentiment")
+        
+            def build_avg_streak_by_sentiment():
+                streak_by_sentiment = aggregate(streak_analysis, ['dominant_sentiment', 'is_win_streak'], {
+                    'streak_length': ('streak_length', 'mean')
+                })['streak_length'].unstack(fill_value=0)
+                streak_by_sentiment = streak_by_sentiment.reindex(sentiment_order)
+                fig = go.Figure()
+                fig.add_trace(go.Bar(
+                    name='Loss Streaks',
+                    x=streak_by_sentiment.index,
+                    y=streak_by_sentiment[False] if False in streak_by_sentiment.columns else [0]*len(streak_by_sentiment),
+                    marker_color='#f44336'
+                ))
+                fig.add_trace(go.Bar(
+                    name='Win Streaks',
+                    x=streak_by_sentiment.index,
+                    y=streak_by_sentiment[True] if True in streak_by_sentiment.columns else [0]*len(streak_by_sentiment),
+                    marker_color='#4caf50'
+                ))
+        
+                fig.update_layout(
+                    title="Average Streak Length by Sentiment",
+                    xaxis_title="Sentiment",
+                    yaxis_title="Avg Streak Length",
+                    barmode='group',
+                    height=400
+                )
+                return fig
+        
+            show_chart('avg_streak_by_sentiment', build_avg_streak_by_sentiment)
 
 # =============================================================================
 # PAGE 4: RISK ANALYSIS
@@ -1325,397 +1818,491 @@ if page == "📊 Advanced Analytics":
 if page == "📈 Risk Analysis":
     st.markdown('<h1 class="main-header">📈 Risk & Performance Metrics</h1>', unsafe_allow_html=True)
     
+    # Sentiment-level aggregates for this page, rolled up from the cube
+    by_sentiment = cube_view.rollup('sentiment_category')
+    
     tabs = st.tabs([
         "⚖️ Risk-Reward",
         "💼 Position Sizing",
         "⏰ Time Analysis",
         "💡 Key Insights"
-    ])
+    ], key='risk_tab', on_change='rerun')
     
     # TAB 1: Risk-Reward
-    with tabs[0]:
-        st.markdown('<h3 class="sub-header">Risk-Adjusted Performance</h3>', unsafe_allow_html=True)
-        
-        risk_metrics = filtered_df.groupby('sentiment_category').agg({
-            'Net_PnL': ['mean', 'std', 'min', 'max'],
-            'Size USD': ['mean', 'std']
-        }).round(2)
-        
-        risk_metrics.columns = ['Avg_PnL', 'PnL_StdDev', 'Max_Loss', 'Max_Profit',
-                               'Avg_Trade_Size', 'Trade_Size_StdDev']
-        risk_metrics['Sharpe_Ratio'] = (risk_metrics['Avg_PnL'] / risk_metrics['PnL_StdDev']).round(3)
-        risk_metrics = risk_metrics.reindex(sentiment_order, fill_value=0)
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            fig = go.Figure(data=[go.Bar(
-                x=risk_metrics.index,
-                y=risk_metrics['Sharpe_Ratio'],
-                marker=dict(color=colors),
-                text=[f'{v:.3f}' for v in risk_metrics['Sharpe_Ratio']],
-                textposition='outside'
-            )])
-            fig.update_layout(
-                title="Sharpe Ratio by Sentiment",
-                xaxis_title="Sentiment",
-                yaxis_title="Sharpe Ratio",
-                height=400
-            )
-            fig.add_hline(y=0, line_dash="dash", line_color="red")
-            st.plotly_chart(fig, width='stretch')
-        
-        with col2:
-            # Risk-Return scatter
-            fig = go.Figure()
-            for i, sentiment in enumerate(sentiment_order):
-                if sentiment in risk_metrics.index:
-                    fig.add_trace(go.Scatter(
-                        x=[risk_metrics.loc[sentiment, 'PnL_StdDev']],
-                        y=[risk_metrics.loc[sentiment, 'Avg_PnL']],
-                        mode='markers+text',
-                        name=sentiment,
-                        marker=dict(size=20, color=colors[i]),
-                        text=[sentiment],
-                        textposition='top center'
-                    ))
+    if tab_open(tabs[0], VAR_WIDGETS):
+        with timed_tab(tabs[0]):
+            st.markdown('<h3 class="sub-header">Risk-Adjusted Performance</h3>', unsafe_allow_html=True)
+        
+            risk_metrics = by_sentiment[[
+                'Net_PnL_mean', 'Net_PnL_std', 'Net_PnL_min', 'Net_PnL_max',
+                'Size USD_mean', 'Size USD_std'
+            ]].round(2)
+        
+            risk_metrics.columns = ['Avg_PnL', 'PnL_StdDev', 'Max_Loss', 'Max_Profit',
+                                   'Avg_Trade_Size', 'Trade_Size_StdDev']
+            risk_metrics['Sharpe_Ratio'] = (risk_metrics['Avg_PnL'] / risk_metrics['PnL_StdDev']).round(3)
+            risk_metrics = risk_metrics.reindex(sentiment_order, fill_value=0)
+            if sentiment_ci is not None:
+                risk_metrics[['Sharpe_CI_Low', 'Sharpe_CI_High']] = sentiment_ci[
+                    ['Sharpe_Ratio_low', 'Sharpe_Ratio_high']
+                ].reindex(risk_metrics.index).to_numpy()
+        
+            col1, col2 = st.columns(2)
+        
+            with col1:
+                def build_sharpe_by_sentiment():
+                    fig = go.Figure(data=[go.Bar(
+                        x=risk_metrics.index,
+                        y=risk_metrics['Sharpe_Ratio'],
+                        marker=dict(color=colors),
+                        error_y=ci_error_bars(sentiment_ci, 'Sharpe_Ratio', risk_metrics['Sharpe_Ratio']),
+                        text=[f'{v:.3f}' for v in risk_metrics['Sharpe_Ratio']],
+                        textposition='outside'
+                    )])
+                    fig.update_layout(
+                        title="Sharpe Ratio by Sentiment",
+                        xaxis_title="Sentiment",
+                        yaxis_title="Sharpe Ratio",
+                        height=400
+                    )
+                    fig.add_hline(y=0, line_dash="dash", line_color="red")
+                    return fig
+            
+                show_chart('sharpe_by_sentiment', build_sharpe_by_sentiment)
+        
+            with col2:
+                # Risk-Return scatter
+                def build_risk_return_profile():
+                    fig = go.Figure()
+                    for i, sentiment in enumerate(sentiment_order):
+                        if sentiment in risk_metrics.index:
+                            fig.add_trace(go.Scatter(
+                                x=[risk_metrics.loc[sentiment, 'PnL_StdDev']],
+                                y=[risk_metrics.loc[sentiment, 'Avg_PnL']],
+                                mode='markers+text',
+                                name=sentiment,
+                                marker=dict(size=20, color=colors[i]),
+                                text=[sentiment],
+                                textposition='top center'
+                            ))
+            
+                    fig.update_layout(
+                        title="Risk-Return Profile",
+                        xaxis_title="Risk (Std Dev)",
+                        yaxis_title="Return (Avg PnL)",
+                        height=400,
+                        showlegend=False
+                    )
+                    fig.add_hline(y=0, line_dash="dash", line_color="black")
+                    return fig
             
-            fig.update_layout(
-                title="Risk-Return Profile",
-                xaxis_title="Risk (Std Dev)",
-                yaxis_title="Return (Avg PnL)",
-                height=400,
-                showlegend=False
+                show_chart('risk_return_profile', build_risk_return_profile)
+        
+            # Risk metrics table
+            st.markdown("---")
+            st.markdown("### Complete Risk Metrics Table")
+            st.dataframe(
+                risk_metrics.style.format({
+                    'Avg_PnL': '${:,.2f}',
+                    'PnL_StdDev': '${:,.2f}',
+                    'Max_Loss': '${:,.2f}',
+                    'Max_Profit': '${:,.2f}',
+                    'Avg_Trade_Size': '${:,.2f}',
+                    'Trade_Size_StdDev': '${:,.2f}',
+                    'Sharpe_Ratio': '{:.3f}',
+                    'Sharpe_CI_Low': '{:.3f}',
+                    'Sharpe_CI_High': '{:.3f}'
+                }).background_gradient(cmap='RdYlGn', subset=['Sharpe_Ratio', 'Avg_PnL']),
+                width='stretch'
             )
-            fig.add_hline(y=0, line_dash="dash", line_color="black")
-            st.plotly_chart(fig, width='stretch')
-        
-        # Risk metrics table
-        st.markdown("---")
-        st.markdown("### Complete Risk Metrics Table")
-        st.dataframe(
-            risk_metrics.style.format({
-                'Avg_PnL': '${:,.2f}',
-                'PnL_StdDev': '${:,.2f}',
-                'Max_Loss': '${:,.2f}',
-                'Max_Profit': '${:,.2f}',
-                'Avg_Trade_Size': '${:,.2f}',
-                'Trade_Size_StdDev': '${:,.2f}',
-                'Sharpe_Ratio': '{:.3f}'
-            }).background_gradient(cmap='RdYlGn', subset=['Sharpe_Ratio', 'Avg_PnL']),
-            width='stretch'
-        )
+        
+            # Tail risk
+            st.markdown("---")
+            st.markdown("### 🔻 Tail Risk: Value at Risk & Expected Shortfall")
+            st.info("💡 **VaR**: The loss exceeded only in the worst 5% (1%) of cases. **CVaR**: The average loss across those worst cases.")
+        
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                var_method = st.radio("Method", ['Historical', 'Monte Carlo'], horizontal=True, key='var_method')
+            if var_method == 'Historical':
+                with col2:
+                    var_group = st.selectbox("Per", ['Sentiment', 'Side', 'Account'], key='var_group')
+                var_column = {'Sentiment': 'sentiment_category', 'Side': 'Side', 'Account': 'Account'}[var_group]
+            
+                # Per-trade losses
+                def historical_var():
+                    var_table = tail_risk(filtered_df, var_column)
+                    if var_column == 'sentiment_category':
+                        var_table = var_table.reindex([s for s in sentiment_order if s in var_table.index])
+                    return var_table
+            
+                var_table = chart_data('var_table', historical_var)
+                var_title = f"Per-Trade VaR & CVaR by {var_group}"
+            else:
+                with col2:
+                    var_horizon = st.select_slider("Horizon (days)", options=[1, 5, 10, 20, 30], value=10, key='var_horizon')
+                with col3:
+                    var_paths = st.select_slider("Simulated paths", options=[1000, 5000, 10000, 50000], value=10000, key='var_paths')
+            
+                # Daily portfolio PnL of each sentiment regime, resampled into multi-day paths
+                def simulated_var():
+                    daily_regimes = cube_view.rollup(['Date', 'sentiment_category']).reset_index()
+                    var_table = load_monte_carlo_var(handle.loaded_at, filter_key, var_horizon, var_paths, daily_regimes)
+                    return var_table.reindex([s for s in sentiment_order if s in var_table.index])
+            
+                var_table = chart_data('var_table', simulated_var)
+                var_title = f"{var_horizon}-Day Portfolio VaR & CVaR by Sentiment Regime ({var_paths:,} paths)"
+        
+            if len(var_table) > 0:
+                def build_tail_risk():
+                    fig = go.Figure()
+                    for level, color in zip(VAR_LEVELS, ['#FFA726', '#D32F2F']):
+                        for measure, pattern in [('VaR', ''), ('CVaR', '/')]:
+                            column = f'{measure}_{level * 100:g}'
+                            fig.add_trace(go.Bar(
+                                x=var_table.index.astype(str),
+                                y=var_table[column],
+                                name=f'{measure} {level:.0%}',
+                                marker=dict(color=color, pattern_shape=pattern)
+                            ))
+                    fig.update_layout(
+                        title=var_title,
+                        xaxis_title=var_group if var_method == 'Historical' else "Sentiment",
+                        yaxis_title="Loss ($)",
+                        barmode='group',
+                        height=400
+                    )
+                    return fig
+            
+                show_chart('tail_risk', build_tail_risk)
+            
+                st.dataframe(
+                    var_table.style.format({column: '${:,.2f}' for column in var_table.columns[1:]}),
+                    width='stretch'
+                )
     
     # TAB 2: Position Sizing
-    with tabs[1]:
-        st.markdown('<h3 class="sub-header">Position Size Analysis</h3>', unsafe_allow_html=True)
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Position size distribution
-            fig = go.Figure()
-            for i, sentiment in enumerate(sentiment_order):
-                sentiment_data = filtered_df[filtered_df['sentiment_category'] == sentiment]
-                if len(sentiment_data) > 0:
-                    fig.add_trace(go.Box(
-                        y=sentiment_data['Size USD'],
-                        name=sentiment,
-                        marker_color=colors[i],
-                        boxmean='sd'
-                    ))
+    if tab_open(tabs[1]):
+        with timed_tab(tabs[1]):
+            st.markdown('<h3 class="sub-header">Position Size Analysis</h3>', unsafe_allow_html=True)
+        
+            col1, col2 = st.columns(2)
+        
+            with col1:
+                # Position size distribution
+                def build_position_size_distribution():
+                    size_boxes, size_outliers = chart_data(
+                        'size_boxes', lambda: box_summaries(filtered_df, 'Size USD', 'sentiment_category')
+                    )
+                    fig = go.Figure()
+                    add_box_traces(fig, size_boxes, size_outliers)
             
-            fig.update_layout(
-                title="Position Size Distribution by Sentiment",
-                yaxis_title="Position Size (USD)",
-                height=400
-            )
-            st.plotly_chart(fig, width='stretch')
-        
-        with col2:
-            # Position size vs PnL
-            fig = go.Figure()
-            for i, sentiment in enumerate(sentiment_order):
-                sentiment_data = filtered_df[filtered_df['sentiment_category'] == sentiment]
-                if len(sentiment_data) > 0:
-                    fig.add_trace(go.Scatter(
-                        x=sentiment_data['Size USD'],
-                        y=sentiment_data['Net_PnL'],
-                        mode='markers',
-                        name=sentiment,
-                        marker=dict(color=colors[i], size=8, opacity=0.6)
-                    ))
+                    fig.update_layout(
+                        title="Position Size Distribution by Sentiment",
+                        yaxis_title="Position Size (USD)",
+                        height=400
+                    )
+                    return fig
             
-            fig.update_layout(
-                title="Position Size vs PnL",
-                xaxis_title="Position Size (USD)",
-                yaxis_title="Net PnL (USD)",
-                height=400,
-                hovermode='closest'
-            )
-            fig.add_hline(y=0, line_dash="dash", line_color="black")
-            st.plotly_chart(fig, width='stretch')
-        
-        # Position size insights
-        st.markdown("---")
-        position_stats = filtered_df.groupby('sentiment_category').agg({
-            'Size USD': ['mean', 'median', 'std', 'min', 'max']
-        }).round(2)
-        position_stats.columns = ['Mean', 'Median', 'Std Dev', 'Min', 'Max']
-        position_stats = position_stats.reindex(sentiment_order, fill_value=0)
-        
-        st.markdown("### Position Size Statistics")
-        st.dataframe(
-            position_stats.style.format('${:,.2f}').background_gradient(cmap='Blues'),
-            width='stretch'
-        )
-        
-        # Average position by profitability
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            avg_size_profit = filtered_df.groupby(['sentiment_category', 'is_profitable'])['Size USD'].mean().unstack(fill_value=0)
-            avg_size_profit = avg_size_profit.reindex(sentiment_order)
+                show_chart('position_size_distribution', build_position_size_distribution)
+        
+            with col2:
+                # Position size vs PnL
+                def build_position_size_vs_pnl():
+                    fig = go.Figure()
+                    for i, sentiment in enumerate(sentiment_order):
+                        sentiment_data = filtered_df[filtered_df['sentiment_category'] == sentiment]
+                        if len(sentiment_data) > 0:
+                            fig.add_trace(go.Scatter(
+                                x=sentiment_data['Size USD'],
+                                y=sentiment_data['Net_PnL'],
+                                mode='markers',
+                                name=sentiment,
+                                marker=dict(color=colors[i], size=8, opacity=0.6)
+                            ))
             
-            fig = go.Figure()
-            fig.add_trace(go.Bar(
-                name='Losing Trades',
-                x=avg_size_profit.index,
-                y=avg_size_profit[False] if False in avg_size_profit.columns else [0]*len(avg_size_profit),
-                marker_color='#f44336'
-            ))
-            fig.add_trace(go.Bar(
-                name='Winning Trades',
-                x=avg_size_profit.index,
-                y=avg_size_profit[True] if True in avg_size_profit.columns else [0]*len(avg_size_profit),
-                marker_color='#4caf50'
-            ))
+                    fig.update_layout(
+                        title="Position Size vs PnL",
+                        xaxis_title="Position Size (USD)",
+                        yaxis_title="Net PnL (USD)",
+                        height=400,
+                        hovermode='closest'
+                    )
+                    fig.add_hline(y=0, line_dash="dash", line_color="black")
+                    return fig
             
-            fig.update_layout(
-                title="Average Position Size by Outcome",
-                xaxis_title="Sentiment",
-                yaxis_title="Avg Position Size (USD)",
-                barmode='group',
-                height=400
+                show_chart('position_size_vs_pnl', build_position_size_vs_pnl)
+        
+            # Position size insights
+            st.markdown("---")
+            position_stats = by_sentiment[['Size USD_mean', 'Size USD_std', 'Size USD_min', 'Size USD_max']].copy()
+            # The median does not roll up from cells, so it still comes from the trades
+            position_stats.insert(1, 'Size USD_median', aggregate(filtered_df, 'sentiment_category', {
+                'Size USD_median': ('Size USD', 'median')
+            })['Size USD_median'])
+            position_stats = position_stats.round(2)
+            position_stats.columns = ['Mean', 'Median', 'Std Dev', 'Min', 'Max']
+            position_stats = position_stats.reindex(sentiment_order, fill_value=0)
+        
+            st.markdown("### Position Size Statistics")
+            st.dataframe(
+                position_stats.style.format('${:,.2f}').background_gradient(cmap='Blues'),
+                width='stretch'
             )
-            st.plotly_chart(fig, width='stretch')
         
-        with col2:
-            # Position size over time
-            weekly_size = filtered_df.groupby(filtered_df['Date'].dt.to_period('W'))['Size USD'].mean()
-            weekly_size.index = weekly_size.index.to_timestamp()
+            # Average position by profitability
+            col1, col2 = st.columns(2)
+        
+            with col1:
+                def build_position_size_by_outcome():
+                    avg_size_profit = cube_view.rollup(['sentiment_category', 'is_profitable'])['Size USD_mean'].unstack(fill_value=0)
+                    avg_size_profit = avg_size_profit.reindex(sentiment_order)
+                    fig = go.Figure()
+                    fig.add_trace(go.Bar(
+                        name='Losing Trades',
+                        x=avg_size_profit.index,
+                        y=avg_size_profit[False] if False in avg_size_profit.columns else [0]*len(avg_size_profit),
+                        marker_color='#f44336'
+                    ))
+                    fig.add_trace(go.Bar(
+                        name='Winning Trades',
+                        x=avg_size_profit.index,
+                        y=avg_size_profit[True] if True in avg_size_profit.columns else [0]*len(avg_size_profit),
+                        marker_color='#4caf50'
+                    ))
             
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=weekly_size.index,
-                y=weekly_size.values,
-                mode='lines+markers',
-                line=dict(color='#1976d2', width=2),
-                marker=dict(size=8),
-                fill='tozeroy',
-                fillcolor='rgba(25, 118, 210, 0.1)'
-            ))
+                    fig.update_layout(
+                        title="Average Position Size by Outcome",
+                        xaxis_title="Sentiment",
+                        yaxis_title="Avg Position Size (USD)",
+                        barmode='group',
+                        height=400
+                    )
+                    return fig
             
-            fig.update_layout(
-                title="Average Weekly Position Size Trend",
-                xaxis_title="Week",
-                yaxis_title="Avg Position Size (USD)",
-                height=400,
-                hovermode='x'
-            )
-            st.plotly_chart(fig, width='stretch')
+                show_chart('position_size_by_outcome', build_position_size_by_outcome)
+        
+            with col2:
+                # Position size over time
+                def build_weekly_position_size():
+                    weekly_size = aggregate(filtered_df, filtered_df['Date'].dt.to_period('W'), {
+                        'Size USD': ('Size USD', 'mean')
+                    })['Size USD']
+                    weekly_size.index = weekly_size.index.to_timestamp()
+                    fig = go.Figure()
+                    fig.add_trace(go.Scatter(
+                        **downsampled(weekly_size.index, weekly_size.values),
+                        mode='lines+markers',
+                        line=dict(color='#1976d2', width=2),
+                        marker=dict(size=8),
+                        fill='tozeroy',
+                        fillcolor='rgba(25, 118, 210, 0.1)'
+                    ))
+            
+                    fig.update_layout(
+                        title="Average Weekly Position Size Trend",
+                        xaxis_title="Week",
+                        yaxis_title="Avg Position Size (USD)",
+                        height=400,
+                        hovermode='x'
+                    )
+                    return fig
+            
+                show_chart('weekly_position_size', build_weekly_position_size)
     
     # TAB 3: Time Analysis
-    with tabs[2]:
-        st.markdown('<h3 class="sub-header">Temporal Patterns</h3>', unsafe_allow_html=True)
-        
-        # Add time columns if not present
-        if 'Hour' not in filtered_df.columns:
-            filtered_df['Hour'] = pd.to_datetime(filtered_df['Timestamp IST']).dt.hour
-        if 'DayOfWeek' not in filtered_df.columns:
-            filtered_df['DayOfWeek'] = pd.to_datetime(filtered_df['Timestamp IST']).dt.day_name()
-        if 'Month' not in filtered_df.columns:
-            filtered_df['Month'] = pd.to_datetime(filtered_df['Timestamp IST']).dt.month_name()
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Hourly performance
-            hourly_pnl = filtered_df.groupby('Hour')['Net_PnL'].sum()
+    if tab_open(tabs[2]):
+        with timed_tab(tabs[2]):
+            st.markdown('<h3 class="sub-header">Temporal Patterns</h3>', unsafe_allow_html=True)
+        
+            # Add time columns if not present
+            if 'Hour' not in filtered_df.columns:
+                filtered_df['Hour'] = pd.to_datetime(filtered_df['Timestamp IST']).dt.hour
+            if 'DayOfWeek' not in filtered_df.columns:
+                filtered_df['DayOfWeek'] = pd.to_datetime(filtered_df['Timestamp IST']).dt.day_name()
+            if 'Month' not in filtered_df.columns:
+                filtered_df['Month'] = pd.to_datetime(filtered_df['Timestamp IST']).dt.month_name()
+        
+            col1, col2 = st.columns(2)
+        
+            with col1:
+                # Hourly performance
+                def build_pnl_by_hour():
+                    hourly_pnl = cube_view.rollup('Hour')['Net_PnL_sum']
+                    fig = go.Figure()
+                    fig.add_trace(go.Bar(
+                        x=hourly_pnl.index,
+                        y=hourly_pnl.values,
+                        marker_color=['#4caf50' if v > 0 else '#f44336' for v in hourly_pnl.values],
+                        text=[f'${v:,.0f}' for v in hourly_pnl.values],
+                        textposition='outside'
+                    ))
             
-            fig = go.Figure()
-            fig.add_trace(go.Bar(
-                x=hourly_pnl.index,
-                y=hourly_pnl.values,
-                marker_color=['#4caf50' if v > 0 else '#f44336' for v in hourly_pnl.values],
-                text=[f'${v:,.0f}' for v in hourly_pnl.values],
-                textposition='outside'
-            ))
+                    fig.update_layout(
+                        title="Total PnL by Hour of Day",
+                        xaxis_title="Hour (IST)",
+                        yaxis_title="Total PnL (USD)",
+                        height=400,
+                        xaxis=dict(tickmode='linear', tick0=0, dtick=2)
+                    )
+                    fig.add_hline(y=0, line_dash="dash", line_color="black")
+                    return fig
             
-            fig.update_layout(
-                title="Total PnL by Hour of Day",
-                xaxis_title="Hour (IST)",
-                yaxis_title="Total PnL (USD)",
-                height=400,
-                xaxis=dict(tickmode='linear', tick0=0, dtick=2)
-            )
-            fig.add_hline(y=0, line_dash="dash", line_color="black")
-            st.plotly_chart(fig, width='stretch')
+                show_chart('pnl_by_hour', build_pnl_by_hour)
         
-        with col2:
-            # Day of week performance
-            day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-            daily_pnl = filtered_df.groupby('DayOfWeek')['Net_PnL'].sum().reindex(day_order, fill_value=0)
+            with col2:
+                # Day of week performance
+                def build_pnl_by_weekday():
+                    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+                    daily_pnl = filtered_df.groupby('DayOfWeek')['Net_PnL'].sum().reindex(day_order, fill_value=0)
+                    fig = go.Figure()
+                    fig.add_trace(go.Bar(
+                        x=daily_pnl.index,
+                        y=daily_pnl.values,
+                        marker_color=['#4caf50' if v > 0 else '#f44336' for v in daily_pnl.values],
+                        text=[f'${v:,.0f}' for v in daily_pnl.values],
+                        textposition='outside'
+                    ))
             
-            fig = go.Figure()
-            fig.add_trace(go.Bar(
-                x=daily_pnl.index,
-                y=daily_pnl.values,
-                marker_color=['#4caf50' if v > 0 else '#f44336' for v in daily_pnl.values],
-                text=[f'${v:,.0f}' for v in daily_pnl.values],
-                textposition='outside'
-            ))
+                    fig.update_layout(
+                        title="Total PnL by Day of Week",
+                        xaxis_title="Day",
+                        yaxis_title="Total PnL (USD)",
+                        height=400
+                    )
+                    fig.add_hline(y=0, line_dash="dash", line_color="black")
+                    return fig
             
-            fig.update_layout(
-                title="Total PnL by Day of Week",
-                xaxis_title="Day",
-                yaxis_title="Total PnL (USD)",
-                height=400
-            )
-            fig.add_hline(y=0, line_dash="dash", line_color="black")
-            st.plotly_chart(fig, width='stretch')
-        
-        # Trading session analysis
-        st.markdown("---")
-        st.markdown("### 🌐 Trading Session Performance")
-        
-        session_perf = filtered_df.groupby('Trading_Session').agg({
-            'Net_PnL': ['sum', 'mean', 'count'],
-            'is_profitable': 'mean'
-        }).round(2)
-        session_perf.columns = ['Total_PnL', 'Avg_PnL', 'Trade_Count', 'Win_Rate']
-        session_perf['Win_Rate'] = (session_perf['Win_Rate'] * 100).round(1)
-        
-        # Heatmap: Session vs Sentiment
-        heatmap_data = filtered_df.pivot_table(
-            values='Net_PnL',
-            index='Trading_Session',
-            columns='sentiment_category',
-            aggfunc='mean'
-        ).reindex(columns=sentiment_order)
-        
-        fig = go.Figure(data=go.Heatmap(
-            z=heatmap_data.values,
-            x=heatmap_data.columns,
-            y=heatmap_data.index,
-            colorscale='RdYlGn',
-            zmid=0,
-            text=heatmap_data.values.round(2),
-            texttemplate='$%{text}',
-            textfont={"size": 10},
-            colorbar=dict(title="Avg PnL")
-        ))
+                show_chart('pnl_by_weekday', build_pnl_by_weekday)
+        
+            # Trading session analysis
+            st.markdown("---")
+            st.markdown("### 🌐 Trading Session Performance")
+        
+            session_perf = cube_view.rollup('Trading_Session')[
+                ['Net_PnL_sum', 'Net_PnL_mean', 'Net_PnL_n', 'win_rate']
+            ].round(2)
+            session_perf.columns = ['Total_PnL', 'Avg_PnL', 'Trade_Count', 'Win_Rate']
+            session_perf['Win_Rate'] = (session_perf['Win_Rate'] * 100).round(1)
+        
+            # Heatmap: Session vs Sentiment
+            def build_session_sentiment_heatmap():
+                heatmap_data = cube_view.rollup(['Trading_Session', 'sentiment_category'])[
+                    'Net_PnL_mean'
+                ].unstack().reindex(columns=sentiment_order)
+                fig = go.Figure(data=go.Heatmap(
+                    z=heatmap_data.values,
+                    x=heatmap_data.columns,
+                    y=heatmap_data.index,
+                    colorscale='RdYlGn',
+                    zmid=0,
+                    text=heatmap_data.values.round(2),
+                    texttemplate='$%{text}',
+                    textfont={"size": 10},
+                    colorbar=dict(title="Avg PnL")
+                ))
         
-        fig.update_layout(
-            title="Average PnL: Trading Session vs Sentiment",
-            xaxis_title="Sentiment",
-            yaxis_title="Trading Session",
-            height=400
-        )
-        st.plotly_chart(fig, width='stretch')
-        
-        # Session stats table
-        st.dataframe(
-            session_perf.style.format({
-                'Total_PnL': '${:,.2f}',
-                'Avg_PnL': '${:,.2f}',
-                'Trade_Count': '{:,.0f}',
-                'Win_Rate': '{:.1f}%'
-            }).background_gradient(cmap='RdYlGn', subset=['Total_PnL', 'Avg_PnL', 'Win_Rate']),
-            width='stretch'
-        )
+                fig.update_layout(
+                    title="Average PnL: Trading Session vs Sentiment",
+                    xaxis_title="Sentiment",
+                    yaxis_title="Trading Session",
+                    height=400
+                )
+                return fig
+        
+            show_chart('session_sentiment_heatmap', build_session_sentiment_heatmap)
+        
+            # Session stats table
+            st.dataframe(
+                session_perf.style.format({
+                    'Total_PnL': '${:,.2f}',
+                    'Avg_PnL': '${:,.2f}',
+                    'Trade_Count': '{:,.0f}',
+                    'Win_Rate': '{:.1f}%'
+                }).background_gradient(cmap='RdYlGn', subset=['Total_PnL', 'Avg_PnL', 'Win_Rate']),
+                width='stretch'
+            )
     
     # TAB 4: Key Insights
-    with tabs[3]:
-        st.markdown('<h3 class="sub-header">💡 Comprehensive Risk Insights</h3>', unsafe_allow_html=True)
-        
-        # Best/worst performers
-        sentiment_summary = filtered_df.groupby('sentiment_category').agg({
-            'Net_PnL': ['sum', 'mean', 'std'],
-            'is_profitable': 'mean',
-            'Size USD': 'mean'
-        }).round(2)
-        sentiment_summary.columns = ['Total_PnL', 'Avg_PnL', 'PnL_StdDev', 'Win_Rate', 'Avg_Size']
-        sentiment_summary['Sharpe'] = (sentiment_summary['Avg_PnL'] / sentiment_summary['PnL_StdDev']).round(3)
-        sentiment_summary = sentiment_summary.reindex(sentiment_order)
-        
-        col1, col2, col3 = st.columns(3)
-        
-        best_sharpe = sentiment_summary['Sharpe'].idxmax()
-        worst_sharpe = sentiment_summary['Sharpe'].idxmin()
-        most_consistent = sentiment_summary['PnL_StdDev'].idxmin()
-        
-        with col1:
-            st.markdown(f"""
-            <div class="success-box">
-                <h4>🏆 Best Risk-Adjusted</h4>
-                <h3>{best_sharpe}</h3>
-                <p><b>Sharpe Ratio:</b> {sentiment_summary.loc[best_sharpe, 'Sharpe']:.3f}</p>
-                <p><b>Avg PnL:</b> ${sentiment_summary.loc[best_sharpe, 'Avg_PnL']:,.2f}</p>
-            </div>
-            """, unsafe_allow_html=True)
+    if tab_open(tabs[3]):
+        with timed_tab(tabs[3]):
+            st.markdown('<h3 class="sub-header">💡 Comprehensive Risk Insights</h3>', unsafe_allow_html=True)
+        
+            # Best/worst performers
+            sentiment_summary = by_sentiment[
+                ['Net_PnL_sum', 'Net_PnL_mean', 'Net_PnL_std', 'win_rate', 'Size USD_mean']
+            ].round(2)
+            sentiment_summary.columns = ['Total_PnL', 'Avg_PnL', 'PnL_StdDev', 'Win_Rate', 'Avg_Size']
+            sentiment_summary['Sharpe'] = (sentiment_summary['Avg_PnL'] / sentiment_summary['PnL_StdDev']).round(3)
+            sentiment_summary = sentiment_summary.reindex(sentiment_order)
         
-        with col2:
-            st.markdown(f"""
-            <div class="warning-box">
-                <h4>⚠️ Worst Risk-Adjusted</h4>
-                <h3>{worst_sharpe}</h3>
-                <p><b>Sharpe Ratio:</b> {sentiment_summary.loc[worst_sharpe, 'Sharpe']:.3f}</p>
-                <p><b>Avg PnL:</b> ${sentiment_summary.loc[worst_sharpe, 'Avg_PnL']:,.2f}</p>
-            </div>
-            """, unsafe_allow_html=True)
+            col1, col2, col3 = st.columns(3)
         
-        with col3:
-            st.markdown(f"""
-            <div class="insight-box">
-                <h4>📊 Most Consistent</h4>
-                <h3>{most_consistent}</h3>
-                <p><b>Std Dev:</b> ${sentiment_summary.loc[most_consistent, 'PnL_StdDev']:,.2f}</p>
-                <p><b>Win Rate:</b> {sentiment_summary.loc[most_consistent, 'Win_Rate']*100:.1f}%</p>
-            </div>
-            """, unsafe_allow_html=True)
+            best_sharpe = sentiment_summary['Sharpe'].idxmax()
+            worst_sharpe = sentiment_summary['Sharpe'].idxmin()
+            most_consistent = sentiment_summary['PnL_StdDev'].idxmin()
+        
+            with col1:
+                st.markdown(f"""
+                <div class="success-box">
+                    <h4>🏆 Best Risk-Adjusted</h4>
+                    <h3>{best_sharpe}</h3>
+                    <p><b>Sharpe Ratio:</b> {sentiment_summary.loc[best_sharpe, 'Sharpe']:.3f}</p>
+                    <p><b>Avg PnL:</b> ${sentiment_summary.loc[best_sharpe, 'Avg_PnL']:,.2f}</p>
+                </div>
+                """, unsafe_allow_html=True)
+        
+            with col2:
+                st.markdown(f"""
+                <div class="warning-box">
+                    <h4>⚠️ Worst Risk-Adjusted</h4>
+                    <h3>{worst_sharpe}</h3>
+                    <p><b>Sharpe Ratio:</b> {sentiment_summary.loc[worst_sharpe, 'Sharpe']:.3f}</p>
+                    <p><b>Avg PnL:</b> ${sentiment_summary.loc[worst_sharpe, 'Avg_PnL']:,.2f}</p>
+                </div>
+                """, unsafe_allow_html=True)
         
-        # Actionable recommendations
-        st.markdown("---")
-        st.markdown("### 🎯 Actionable Recommendations")
+            with col3:
+                st.markdown(f"""
+                <div class="insight-box">
+                    <h4>📊 Most Consistent</h4>
+                    <h3>{most_consistent}</h3>
+                    <p><b>Std Dev:</b> ${sentiment_summary.loc[most_consistent, 'PnL_StdDev']:,.2f}</p>
+                    <p><b>Win Rate:</b> {sentiment_summary.loc[most_consistent, 'Win_Rate']*100:.1f}%</p>
+                </div>
+                """, unsafe_allow_html=True)
+        
+            # Actionable recommendations
+            st.markdown("---")
+            st.markdown("### 🎯 Actionable Recommendations")
         
-        recommendations = []
+            recommendations = []
         
-        # Check for high volatility
-        high_vol_sentiments = sentiment_summary[sentiment_summary['PnL_StdDev'] > sentiment_summary['PnL_StdDev'].median()].index.tolist()
-        if high_vol_sentiments:
-            recommendations.append(f"⚠️ **High Volatility Alert**: {', '.join(high_vol_sentiments)} show above-median volatility. Consider reducing position sizes.")
+            # Check for high volatility
+            high_vol_sentiments = sentiment_summary[sentiment_summary['PnL_StdDev'] > sentiment_summary['PnL_StdDev'].median()].index.tolist()
+            if high_vol_sentiments:
+                recommendations.append(f"⚠️ **High Volatility Alert**: {', '.join(high_vol_sentiments)} show above-median volatility. Consider reducing position sizes.")
         
-        # Check for negative Sharpe
-        negative_sharpe = sentiment_summary[sentiment_summary['Sharpe'] < 0].index.tolist()
-        if negative_sharpe:
-            recommendations.append(f"❌ **Negative Sharpe Ratios**: {', '.join(negative_sharpe)} have negative risk-adjusted returns. Re-evaluate strategy.")
+            # Check for negative Sharpe
+            negative_sharpe = sentiment_summary[sentiment_summary['Sharpe'] < 0].index.tolist()
+            if negative_sharpe:
+                recommendations.append(f"❌ **Negative Sharpe Ratios**: {', '.join(negative_sharpe)} have negative risk-adjusted returns. Re-evaluate strategy.")
         
-        # Check for best opportunities
-        positive_sharpe = sentiment_summary[sentiment_summary['Sharpe'] > 0.5].index.tolist()
-        if positive_sharpe:
-            recommendations.append(f"✅ **Strong Opportunities**: {', '.join(positive_sharpe)} show favorable risk-adjusted returns (Sharpe > 0.5).")
+            # Check for best opportunities
+            positive_sharpe = sentiment_summary[sentiment_summary['Sharpe'] > 0.5].index.tolist()
+            if positive_sharpe:
+                recommendations.append(f"✅ **Strong Opportunities**: {', '.join(positive_sharpe)} show favorable risk-adjusted returns (Sharpe > 0.5).")
         
-        # Position sizing recommendation
-        avg_pos_size = filtered_df['Size USD'].mean()
-        if sentiment_summary.loc[best_sharpe, 'Avg_Size'] < avg_pos_size:
-            recommendations.append(f"💡 **Position Sizing**: Best performer ({best_sharpe}) uses below-average position sizes. Consider conservative sizing.")
+            # Position sizing recommendation
+            avg_pos_size = filtered_df['Size USD'].mean()
+            if sentiment_summary.loc[best_sharpe, 'Avg_Size'] < avg_pos_size:
+                recommendations.append(f"💡 **Position Sizing**: Best performer ({best_sharpe}) uses below-average position sizes. Consider conservative sizing.")
         
-        for i, rec in enumerate(recommendations, 1):
-            st.markdown(f"{i}. {rec}")
+            for i, rec in enumerate(recommendations, 1):
+                st.markdown(f"{i}. {rec}")
         
-        if not recommendations:
-            st.success("✅ No major risk concerns detected. Performance appears balanced across sentiments.")
+            if not recommendations:
+                st.success("✅ No major risk concerns detected. Performance appears balanced across sentiments.")
 
 # =============================================================================
 # Footer for all pages (except Assignment Details)
@@ -1737,352 +2324,377 @@ if page != "📋 Assignment Details":
 if page == "🔍 Deep Dive":
     st.markdown('<h1 class="main-header">🔍 Deep Dive Analysis</h1>', unsafe_allow_html=True)
     
+    # Sentiment-level aggregates for this page, rolled up from the cube
+    by_sentiment = cube_view.rollup('sentiment_category')
+    
     tabs = st.tabs([
         "📊 Trade Explorer",
         "🔄 Trade Sides",
         "💰 Fee Analysis",
         "📈 Advanced Metrics"
-    ])
+    ], key='deep_dive_tab', on_change='rerun')
     
     # TAB 1: Trade Explorer
-    with tabs[0]:
-        st.markdown('<h3 class="sub-header">Individual Trade Analysis</h3>', unsafe_allow_html=True)
-        
-        # Filters for trade exploration
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            pnl_threshold = st.slider("Min Absolute PnL ($)", 0, 500, 0, 10)
-        with col2:
-            selected_side = st.selectbox("Trade Side", ["All", "BUY", "SELL"])
-        with col3:
-            sort_by = st.selectbox("Sort By", ["Net_PnL", "Size USD", "Fee", "PnL_Percentage"])
-        
-        # Filter trades
-        explore_df = filtered_df.copy()
-        if pnl_threshold > 0:
-            explore_df = explore_df[abs(explore_df['Net_PnL']) >= pnl_threshold]
-        if selected_side != "All":
-            explore_df = explore_df[explore_df['Side'] == selected_side]
-        
-        explore_df = explore_df.sort_values(sort_by, ascending=False)
-        
-        # Top trades
-        st.markdown(f"### 🔝 Top 10 Trades (Sorted by {sort_by})")
-        
-        display_cols = ['Timestamp IST', 'sentiment_category', 'Side', 'Size USD', 
-                       'Closed PnL', 'Fee', 'Net_PnL', 'PnL_Percentage', 'Trading_Session']
-        
-        top_10 = explore_df.head(10)[display_cols].reset_index(drop=True)
-        
-        st.dataframe(
-            top_10.style.format({
-                'Size USD': '${:,.2f}',
-                'Closed PnL': '${:,.2f}',
-                'Fee': '${:,.2f}',
-                'Net_PnL': '${:,.2f}',
-                'PnL_Percentage': '{:.2f}%'
-            }).background_gradient(cmap='RdYlGn', subset=['Net_PnL', 'PnL_Percentage']),
-            width='stretch',
-            height=400
-        )
-        
-        # Download button
-        csv = explore_df[display_cols].to_csv(index=False)
-        st.download_button(
-            label="📥 Download Filtered Trades as CSV",
-            data=csv,
-            file_name=f"filtered_trades_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv"
-        )
-        
-        # Summary stats
-        st.markdown("---")
-        col1, col2, col3, col4, col5 = st.columns(5)
-        
-        with col1:
-            st.metric("Filtered Trades", f"{len(explore_df):,}")
-        with col2:
-            st.metric("Total PnL", f"${explore_df['Net_PnL'].sum():,.2f}")
-        with col3:
-            st.metric("Avg PnL", f"${explore_df['Net_PnL'].mean():,.2f}")
-        with col4:
-            st.metric("Win Rate", f"{(explore_df['is_profitable'].mean() * 100):.1f}%")
-        with col5:
-            st.metric("Total Fees", f"${explore_df['Fee'].sum():,.2f}")
+    if tab_open(tabs[0], ['explorer_min_pnl', 'explorer_side', 'explorer_sort']):
+        with timed_tab(tabs[0]):
+            st.markdown('<h3 class="sub-header">Individual Trade Analysis</h3>', unsafe_allow_html=True)
+        
+            # Filters for trade exploration
+            col1, col2, col3 = st.columns(3)
+        
+            with col1:
+                pnl_threshold = st.slider("Min Absolute PnL ($)", 0, 500, 0, 10, key="explorer_min_pnl")
+            with col2:
+                selected_side = st.selectbox("Trade Side", ["All", "BUY", "SELL"], key="explorer_side")
+            with col3:
+                sort_by = st.selectbox("Sort By", ["Net_PnL", "Size USD", "Fee", "PnL_Percentage"], key="explorer_sort")
+        
+            # Filter trades
+            explore_df = filtered_df.copy()
+            if pnl_threshold > 0:
+                explore_df = explore_df[abs(explore_df['Net_PnL']) >= pnl_threshold]
+            if selected_side != "All":
+                explore_df = explore_df[explore_df['Side'] == selected_side]
+        
+            explore_df = explore_df.sort_values(sort_by, ascending=False)
+        
+            # Top trades
+            st.markdown(f"### 🔝 Top 10 Trades (Sorted by {sort_by})")
+        
+            display_cols = ['Timestamp IST', 'sentiment_category', 'Side', 'Size USD', 
+                           'Closed PnL', 'Fee', 'Net_PnL', 'PnL_Percentage', 'Trading_Session']
+        
+            top_10 = explore_df.head(10)[display_cols].reset_index(drop=True)
+        
+            st.dataframe(
+                top_10.style.format({
+                    'Size USD': '${:,.2f}',
+                    'Closed PnL': '${:,.2f}',
+                    'Fee': '${:,.2f}',
+                    'Net_PnL': '${:,.2f}',
+                    'PnL_Percentage': '{:.2f}%'
+                }).background_gradient(cmap='RdYlGn', subset=['Net_PnL', 'PnL_Percentage']),
+                width='stretch',
+                height=400
+            )
+        
+            # Download button
+            csv = explore_df[display_cols].to_csv(index=False)
+            st.download_button(
+                label="📥 Download Filtered Trades as CSV",
+                data=csv,
+                file_name=f"filtered_trades_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv"
+            )
+        
+            # Summary stats
+            st.markdown("---")
+            col1, col2, col3, col4, col5 = st.columns(5)
+        
+            with col1:
+                st.metric("Filtered Trades", f"{len(explore_df):,}")
+            with col2:
+                st.metric("Total PnL", f"${explore_df['Net_PnL'].sum():,.2f}")
+            with col3:
+                st.metric("Avg PnL", f"${explore_df['Net_PnL'].mean():,.2f}")
+            with col4:
+                st.metric("Win Rate", f"{(explore_df['is_profitable'].mean() * 100):.1f}%")
+            with col5:
+                st.metric("Total Fees", f"${explore_df['Fee'].sum():,.2f}")
     
     # TAB 2: Trade Sides Analysis
-    with tabs[1]:
-        st.markdown('<h3 class="sub-header">BUY vs SELL Performance</h3>', unsafe_allow_html=True)
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Side performance by sentiment
-            side_sentiment = filtered_df.pivot_table(
-                values='Net_PnL',
-                index='sentiment_category',
-                columns='Side',
-                aggfunc='sum'
-            ).reindex(sentiment_order, fill_value=0)
+    if tab_open(tabs[1]):
+        with timed_tab(tabs[1]):
+            st.markdown('<h3 class="sub-header">BUY vs SELL Performance</h3>', unsafe_allow_html=True)
+        
+            col1, col2 = st.columns(2)
+        
+            with col1:
+                # Side performance by sentiment
+                def build_side_pnl_by_sentiment():
+                    side_sentiment = cube_view.rollup(['sentiment_category', 'Side'])[
+                        'Net_PnL_sum'
+                    ].unstack().reindex(sentiment_order, fill_value=0)
+                    fig = go.Figure()
+                    for side in side_sentiment.columns:
+                        fig.add_trace(go.Bar(
+                            name=side,
+                            x=side_sentiment.index,
+                            y=side_sentiment[side],
+                            text=[f'${v:,.0f}' for v in side_sentiment[side]],
+                            textposition='outside'
+                        ))
             
-            fig = go.Figure()
-            for side in side_sentiment.columns:
-                fig.add_trace(go.Bar(
-                    name=side,
-                    x=side_sentiment.index,
-                    y=side_sentiment[side],
-                    text=[f'${v:,.0f}' for v in side_sentiment[side]],
-                    textposition='outside'
-                ))
+                    fig.update_layout(
+                        title="Total PnL: BUY vs SELL by Sentiment",
+                        xaxis_title="Sentiment",
+                        yaxis_title="Total PnL (USD)",
+                        barmode='group',
+                        height=400
+                    )
+                    fig.add_hline(y=0, line_dash="dash", line_color="black")
+                    return fig
             
-            fig.update_layout(
-                title="Total PnL: BUY vs SELL by Sentiment",
-                xaxis_title="Sentiment",
-                yaxis_title="Total PnL (USD)",
-                barmode='group',
-                height=400
-            )
-            fig.add_hline(y=0, line_dash="dash", line_color="black")
-            st.plotly_chart(fig, width='stretch')
+                show_chart('side_pnl_by_sentiment', build_side_pnl_by_sentiment)
         
-        with col2:
-            # Win rate by side
-            side_winrate = filtered_df.groupby(['sentiment_category', 'Side'])['is_profitable'].mean().unstack(fill_value=0) * 100
-            side_winrate = side_winrate.reindex(sentiment_order)
+            with col2:
+                # Win rate by side
+                def build_side_win_rate_by_sentiment():
+                    side_winrate = cube_view.rollup(['sentiment_category', 'Side'])['win_rate'].unstack(fill_value=0) * 100
+                    side_winrate = side_winrate.reindex(sentiment_order)
+                    fig = go.Figure()
+                    for side in side_winrate.columns:
+                        fig.add_trace(go.Bar(
+                            name=side,
+                            x=side_winrate.index,
+                            y=side_winrate[side],
+                            text=[f'{v:.1f}%' for v in side_winrate[side]],
+                            textposition='outside'
+                        ))
             
-            fig = go.Figure()
-            for side in side_winrate.columns:
-                fig.add_trace(go.Bar(
-                    name=side,
-                    x=side_winrate.index,
-                    y=side_winrate[side],
-                    text=[f'{v:.1f}%' for v in side_winrate[side]],
-                    textposition='outside'
-                ))
+                    fig.update_layout(
+                        title="Win Rate: BUY vs SELL by Sentiment",
+                        xaxis_title="Sentiment",
+                        yaxis_title="Win Rate (%)",
+                        barmode='group',
+                        height=400
+                    )
+                    fig.add_hline(y=50, line_dash="dash", line_color="red", annotation_text="50% Baseline")
+                    return fig
             
-            fig.update_layout(
-                title="Win Rate: BUY vs SELL by Sentiment",
-                xaxis_title="Sentiment",
-                yaxis_title="Win Rate (%)",
-                barmode='group',
-                height=400
+                show_chart('side_win_rate_by_sentiment', build_side_win_rate_by_sentiment)
+        
+            # Side comparison table
+            st.markdown("---")
+            st.markdown("### 📊 Detailed Side Comparison")
+        
+            side_comparison = cube_view.rollup('Side')[[
+                'Net_PnL_sum', 'Net_PnL_mean', 'Net_PnL_std', 'Size USD_mean',
+                'Fee_sum', 'win_rate', 'count'
+            ]].round(2)
+        
+            side_comparison.columns = ['Total_PnL', 'Avg_PnL', 'PnL_StdDev', 'Avg_Position', 'Total_Fees', 'Win_Rate', 'Trade_Count']
+            side_comparison['Win_Rate'] = (side_comparison['Win_Rate'] * 100).round(1)
+        
+            st.dataframe(
+                side_comparison.style.format({
+                    'Total_PnL': '${:,.2f}',
+                    'Avg_PnL': '${:,.2f}',
+                    'PnL_StdDev': '${:,.2f}',
+                    'Avg_Position': '${:,.2f}',
+                    'Total_Fees': '${:,.2f}',
+                    'Win_Rate': '{:.1f}%',
+                    'Trade_Count': '{:,.0f}'
+                }).background_gradient(cmap='RdYlGn', subset=['Total_PnL', 'Avg_PnL', 'Win_Rate']),
+                width='stretch'
             )
-            fig.add_hline(y=50, line_dash="dash", line_color="red", annotation_text="50% Baseline")
-            st.plotly_chart(fig, width='stretch')
-        
-        # Side comparison table
-        st.markdown("---")
-        st.markdown("### 📊 Detailed Side Comparison")
-        
-        side_comparison = filtered_df.groupby('Side').agg({
-            'Net_PnL': ['sum', 'mean', 'std'],
-            'Size USD': 'mean',
-            'Fee': 'sum',
-            'is_profitable': 'mean',
-            'Timestamp IST': 'count'
-        }).round(2)
-        
-        side_comparison.columns = ['Total_PnL', 'Avg_PnL', 'PnL_StdDev', 'Avg_Position', 'Total_Fees', 'Win_Rate', 'Trade_Count']
-        side_comparison['Win_Rate'] = (side_comparison['Win_Rate'] * 100).round(1)
-        
-        st.dataframe(
-            side_comparison.style.format({
-                'Total_PnL': '${:,.2f}',
-                'Avg_PnL': '${:,.2f}',
-                'PnL_StdDev': '${:,.2f}',
-                'Avg_Position': '${:,.2f}',
-                'Total_Fees': '${:,.2f}',
-                'Win_Rate': '{:.1f}%',
-                'Trade_Count': '{:,.0f}'
-            }).background_gradient(cmap='RdYlGn', subset=['Total_PnL', 'Avg_PnL', 'Win_Rate']),
-            width='stretch'
-        )
     
     # TAB 3: Fee Analysis
-    with tabs[2]:
-        st.markdown('<h3 class="sub-header">Trading Fee Impact</h3>', unsafe_allow_html=True)
+    if tab_open(tabs[2]):
+        with timed_tab(tabs[2]):
+            st.markdown('<h3 class="sub-header">Trading Fee Impact</h3>', unsafe_allow_html=True)
+        
+            # Trade-level metrics the cube does not hold, in one pass over filtered_df
+            trade_metrics = aggregate(filtered_df, 'sentiment_category', {
+                'Fee_Ratio_mean': ('Fee_Ratio', 'mean'),
+                'Closed_PnL_sum': ('Closed PnL', 'sum')
+            })
         
-        total_fees = filtered_df['Fee'].sum()
-        total_gross_profit = filtered_df['Closed PnL'].sum()
-        fee_percentage = (total_fees / total_gross_profit * 100) if total_gross_profit != 0 else 0
+            total_fees = cube_view.totals()['Fee_sum']
+            total_gross_profit = trade_metrics['Closed_PnL_sum'].sum()
+            fee_percentage = (total_fees / total_gross_profit * 100) if total_gross_profit != 0 else 0
         
-        col1, col2, col3 = st.columns(3)
+            col1, col2, col3 = st.columns(3)
         
-        with col1:
-            st.metric("Total Fees Paid", f"${total_fees:,.2f}")
-        with col2:
-            st.metric("Gross Profit", f"${total_gross_profit:,.2f}")
-        with col3:
-            st.metric("Fees as % of Profit", f"{fee_percentage:.2f}%")
+            with col1:
+                st.metric("Total Fees Paid", f"${total_fees:,.2f}")
+            with col2:
+                st.metric("Gross Profit", f"${total_gross_profit:,.2f}")
+            with col3:
+                st.metric("Fees as % of Profit", f"{fee_percentage:.2f}%")
         
-        # Fee analysis by sentiment
-        col1, col2 = st.columns(2)
+            # Fee analysis by sentiment
+            col1, col2 = st.columns(2)
         
-        with col1:
-            fee_by_sentiment = filtered_df.groupby('sentiment_category')['Fee'].sum().reindex(sentiment_order, fill_value=0)
+            with col1:
+                def build_fees_by_sentiment():
+                    fee_by_sentiment = by_sentiment['Fee_sum'].reindex(sentiment_order, fill_value=0)
+                    fig = go.Figure(data=[go.Bar(
+                        x=fee_by_sentiment.index,
+                        y=fee_by_sentiment.values,
+                        marker=dict(color=colors),
+                        text=[f'${v:,.2f}' for v in fee_by_sentiment.values],
+                        textposition='outside'
+                    )])
             
-            fig = go.Figure(data=[go.Bar(
-                x=fee_by_sentiment.index,
-                y=fee_by_sentiment.values,
-                marker=dict(color=colors),
-                text=[f'${v:,.2f}' for v in fee_by_sentiment.values],
-                textposition='outside'
-            )])
+                    fig.update_layout(
+                        title="Total Fees by Sentiment",
+                        xaxis_title="Sentiment",
+                        yaxis_title="Total Fees (USD)",
+                        height=400
+                    )
+                    return fig
             
-            fig.update_layout(
-                title="Total Fees by Sentiment",
-                xaxis_title="Sentiment",
-                yaxis_title="Total Fees (USD)",
-                height=400
-            )
-            st.plotly_chart(fig, width='stretch')
+                show_chart('fees_by_sentiment', build_fees_by_sentiment)
         
-        with col2:
-            # Fee ratio by sentiment
-            fee_ratio = filtered_df.groupby('sentiment_category')['Fee_Ratio'].mean().reindex(sentiment_order, fill_value=0) * 100
+            with col2:
+                # Fee ratio by sentiment
+                def build_fee_ratio_by_sentiment():
+                    fee_ratio = trade_metrics['Fee_Ratio_mean'].reindex(sentiment_order, fill_value=0) * 100
+                    fig = go.Figure(data=[go.Bar(
+                        x=fee_ratio.index,
+                        y=fee_ratio.values,
+                        marker=dict(color=colors),
+                        text=[f'{v:.2f}%' for v in fee_ratio.values],
+                        textposition='outside'
+                    )])
             
-            fig = go.Figure(data=[go.Bar(
-                x=fee_ratio.index,
-                y=fee_ratio.values,
-                marker=dict(color=colors),
-                text=[f'{v:.2f}%' for v in fee_ratio.values],
-                textposition='outside'
-            )])
+                    fig.update_layout(
+                        title="Average Fee Ratio by Sentiment",
+                        xaxis_title="Sentiment",
+                        yaxis_title="Fee Ratio (%)",
+                        height=400
+                    )
+                    return fig
             
-            fig.update_layout(
-                title="Average Fee Ratio by Sentiment",
-                xaxis_title="Sentiment",
-                yaxis_title="Fee Ratio (%)",
-                height=400
-            )
-            st.plotly_chart(fig, width='stretch')
+                show_chart('fee_ratio_by_sentiment', build_fee_ratio_by_sentiment)
         
-        # Fee impact insights
-        st.markdown("---")
-        st.markdown("### 💡 Fee Impact Insights")
+            # Fee impact insights
+            st.markdown("---")
+            st.markdown("### 💡 Fee Impact Insights")
         
-        high_fee_trades = filtered_df[filtered_df['Fee_Ratio'] > filtered_df['Fee_Ratio'].quantile(0.75)]
-        low_fee_trades = filtered_df[filtered_df['Fee_Ratio'] <= filtered_df['Fee_Ratio'].quantile(0.25)]
+            high_fee_trades = filtered_df[filtered_df['Fee_Ratio'] > filtered_df['Fee_Ratio'].quantile(0.75)]
+            low_fee_trades = filtered_df[filtered_df['Fee_Ratio'] <= filtered_df['Fee_Ratio'].quantile(0.25)]
         
-        col1, col2 = st.columns(2)
+            col1, col2 = st.columns(2)
         
-        with col1:
-            st.markdown(f"""
-            <div class="warning-box">
-                <h4>⚠️ High Fee Ratio Trades (Top 25%)</h4>
-                <p><b>Count:</b> {len(high_fee_trades):,}</p>
-                <p><b>Avg Fee Ratio:</b> {high_fee_trades['Fee_Ratio'].mean()*100:.2f}%</p>
-                <p><b>Avg Net PnL:</b> ${high_fee_trades['Net_PnL'].mean():,.2f}</p>
-            </div>
-            """, unsafe_allow_html=True)
+            with col1:
+                st.markdown(f"""
+                <div class="warning-box">
+                    <h4>⚠️ High Fee Ratio Trades (Top 25%)</h4>
+                    <p><b>Count:</b> {len(high_fee_trades):,}</p>
+                    <p><b>Avg Fee Ratio:</b> {high_fee_trades['Fee_Ratio'].mean()*100:.2f}%</p>
+                    <p><b>Avg Net PnL:</b> ${high_fee_trades['Net_PnL'].mean():,.2f}</p>
+                </div>
+                """, unsafe_allow_html=True)
         
-        with col2:
-            st.markdown(f"""
-            <div class="success-box">
-                <h4>✅ Low Fee Ratio Trades (Bottom 25%)</h4>
-                <p><b>Count:</b> {len(low_fee_trades):,}</p>
-                <p><b>Avg Fee Ratio:</b> {low_fee_trades['Fee_Ratio'].mean()*100:.2f}%</p>
-                <p><b>Avg Net PnL:</b> ${low_fee_trades['Net_PnL'].mean():,.2f}</p>
-            </div>
-            """, unsafe_allow_html=True)
+            with col2:
+                st.markdown(f"""
+                <div class="success-box">
+                    <h4>✅ Low Fee Ratio Trades (Bottom 25%)</h4>
+                    <p><b>Count:</b> {len(low_fee_trades):,}</p>
+                    <p><b>Avg Fee Ratio:</b> {low_fee_trades['Fee_Ratio'].mean()*100:.2f}%</p>
+                    <p><b>Avg Net PnL:</b> ${low_fee_trades['Net_PnL'].mean():,.2f}</p>
+                </div>
+                """, unsafe_allow_html=True)
     
     # TAB 4: Advanced Metrics
-    with tabs[3]:
-        st.markdown('<h3 class="sub-header">Advanced Performance Metrics</h3>', unsafe_allow_html=True)
-        
-        # Calculate advanced metrics
-        metrics_df = filtered_df.groupby('sentiment_category').agg({
-            'Net_PnL': ['sum', 'mean', 'std', 'count'],
-            'Win_Loss_Magnitude': 'mean',
-            'is_profitable': 'mean',
-            'Size USD': 'mean'
-        }).round(2)
-        
-        metrics_df.columns = ['Total_PnL', 'Avg_PnL', 'Volatility', 'Trades', 'Avg_Magnitude', 'Win_Rate', 'Avg_Size']
-        metrics_df['Sharpe_Ratio'] = (metrics_df['Avg_PnL'] / metrics_df['Volatility']).round(3)
-        metrics_df['Profit_Factor'] = metrics_df['Total_PnL'] / (metrics_df['Trades'] * metrics_df['Volatility'])
-        metrics_df = metrics_df.reindex(sentiment_order)
-        
-        # Radar chart for comprehensive view
-        fig = go.Figure()
-        
-        # Normalize metrics for radar chart
-        for sentiment in sentiment_order[:3]:  # Top 3 sentiments for clarity
-            if sentiment in metrics_df.index:
-                normalized_sharpe = (metrics_df.loc[sentiment, 'Sharpe_Ratio'] + 2) / 4 * 100  # Scale to 0-100
-                normalized_winrate = metrics_df.loc[sentiment, 'Win_Rate'] * 100
-                normalized_magnitude = metrics_df.loc[sentiment, 'Avg_Magnitude'] / metrics_df['Avg_Magnitude'].max() * 100
+    if tab_open(tabs[3]):
+        with timed_tab(tabs[3]):
+            st.markdown('<h3 class="sub-header">Advanced Performance Metrics</h3>', unsafe_allow_html=True)
+        
+            # Calculate advanced metrics
+            # |Net_PnL| sums to winning PnL minus losing PnL, so the magnitude rolls up too
+            outcome_pnl = cube_view.rollup(['sentiment_category', 'is_profitable'])['Net_PnL_sum'].unstack(fill_value=0)
+            magnitude = outcome_pnl.get(True, 0) - outcome_pnl.get(False, 0)
+            metrics_df = by_sentiment[['Net_PnL_sum', 'Net_PnL_mean', 'Net_PnL_std', 'Net_PnL_n']].copy()
+            metrics_df['Avg_Magnitude'] = magnitude / by_sentiment['Net_PnL_n']
+            metrics_df[['win_rate', 'Size USD_mean']] = by_sentiment[['win_rate', 'Size USD_mean']]
+            metrics_df = metrics_df.round(2)
+        
+            metrics_df.columns = ['Total_PnL', 'Avg_PnL', 'Volatility', 'Trades', 'Avg_Magnitude', 'Win_Rate', 'Avg_Size']
+            metrics_df['Sharpe_Ratio'] = (metrics_df['Avg_PnL'] / metrics_df['Volatility']).round(3)
+            metrics_df['Profit_Factor'] = metrics_df['Total_PnL'] / (metrics_df['Trades'] * metrics_df['Volatility'])
+            metrics_df = metrics_df.reindex(sentiment_order)
+            if sentiment_ci is not None:
+                metrics_df[['Profit_Factor_CI_Low', 'Profit_Factor_CI_High']] = sentiment_ci[
+                    ['Profit_Factor_low', 'Profit_Factor_high']
+                ].reindex(metrics_df.index).to_numpy()
+        
+            # Radar chart for comprehensive view
+            def build_performance_radar():
+                fig = go.Figure()
+        
+                # Normalize metrics for radar chart
+                for sentiment in sentiment_order[:3]:  # Top 3 sentiments for clarity
+                    if sentiment in metrics_df.index:
+                        normalized_sharpe = (metrics_df.loc[sentiment, 'Sharpe_Ratio'] + 2) / 4 * 100  # Scale to 0-100
+                        normalized_winrate = metrics_df.loc[sentiment, 'Win_Rate'] * 100
+                        normalized_magnitude = metrics_df.loc[sentiment, 'Avg_Magnitude'] / metrics_df['Avg_Magnitude'].max() * 100
                 
-                fig.add_trace(go.Scatterpolar(
-                    r=[normalized_winrate, normalized_sharpe, normalized_magnitude],
-                    theta=['Win Rate', 'Sharpe Ratio', 'Magnitude'],
-                    fill='toself',
-                    name=sentiment
-                ))
+                        fig.add_trace(go.Scatterpolar(
+                            r=[normalized_winrate, normalized_sharpe, normalized_magnitude],
+                            theta=['Win Rate', 'Sharpe Ratio', 'Magnitude'],
+                            fill='toself',
+                            name=sentiment
+                        ))
+        
+                fig.update_layout(
+                    polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
+                    title="Performance Radar: Top 3 Sentiments",
+                    height=500
+                )
+                return fig
         
-        fig.update_layout(
-            polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
-            title="Performance Radar: Top 3 Sentiments",
-            height=500
-        )
-        st.plotly_chart(fig, width='stretch')
-        
-        # Complete metrics table
-        st.markdown("---")
-        st.markdown("### 📊 Complete Advanced Metrics")
-        
-        st.dataframe(
-            metrics_df.style.format({
-                'Total_PnL': '${:,.2f}',
-                'Avg_PnL': '${:,.2f}',
-                'Volatility': '${:,.2f}',
-                'Trades': '{:,.0f}',
-                'Avg_Magnitude': '{:.2f}',
-                'Win_Rate': '{:.2%}',
-                'Avg_Size': '${:,.2f}',
-                'Sharpe_Ratio': '{:.3f}',
-                'Profit_Factor': '{:.3f}'
-            }).background_gradient(cmap='RdYlGn', subset=['Total_PnL', 'Sharpe_Ratio', 'Win_Rate']),
-            width='stretch'
-        )
-        
-        # Final summary
-        st.markdown("---")
-        st.markdown("### 🎯 Final Performance Summary")
-        
-        best_overall = metrics_df['Total_PnL'].idxmax()
-        best_sharpe = metrics_df['Sharpe_Ratio'].idxmax()
-        best_winrate = metrics_df['Win_Rate'].idxmax()
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.markdown(f"""
-            <div class="success-box">
-                <h4>💰 Best Total Return</h4>
-                <h3>{best_overall}</h3>
-                <p>${metrics_df.loc[best_overall, 'Total_PnL']:,.2f}</p>
-            </div>
-            """, unsafe_allow_html=True)
+            show_chart('performance_radar', build_performance_radar)
         
-        with col2:
-            st.markdown(f"""
-            <div class="success-box">
-                <h4>📈 Best Risk-Adjusted</h4>
-                <h3>{best_sharpe}</h3>
-                <p>Sharpe: {metrics_df.loc[best_sharpe, 'Sharpe_Ratio']:.3f}</p>
-            </div>
-            """, unsafe_allow_html=True)
+            # Complete metrics table
+            st.markdown("---")
+            st.markdown("### 📊 Complete Advanced Metrics")
+        
+            st.dataframe(
+                metrics_df.style.format({
+                    'Total_PnL': '${:,.2f}',
+                    'Avg_PnL': '${:,.2f}',
+                    'Volatility': '${:,.2f}',
+                    'Trades': '{:,.0f}',
+                    'Avg_Magnitude': '{:.2f}',
+                    'Win_Rate': '{:.2%}',
+                    'Avg_Size': '${:,.2f}',
+                    'Sharpe_Ratio': '{:.3f}',
+                    'Profit_Factor': '{:.3f}',
+                    'Profit_Factor_CI_Low': '{:.3f}',
+                    'Profit_Factor_CI_High': '{:.3f}'
+                }).background_gradient(cmap='RdYlGn', subset=['Total_PnL', 'Sharpe_Ratio', 'Win_Rate']),
+                width='stretch'
+            )
         
-        with col3:
-            st.markdown(f"""
-            <div class="success-box">
-                <h4>🎯 Best Win Rate</h4>
-                <h3>{best_winrate}</h3>
-                <p>{metrics_df.loc[best_winrate, 'Win_Rate']*100:.1f}%</p>
-            </div>
-            """, unsafe_allow_html=True)
+            # Final summary
+            st.markdown("---")
+            st.markdown("### 🎯 Final Performance Summary")
+        
+            best_overall = metrics_df['Total_PnL'].idxmax()
+            best_sharpe = metrics_df['Sharpe_Ratio'].idxmax()
+            best_winrate = metrics_df['Win_Rate'].idxmax()
+        
+            col1, col2, col3 = st.columns(3)
+        
+            with col1:
+                st.markdown(f"""
+                <div class="success-box">
+                    <h4>💰 Best Total Return</h4>
+                    <h3>{best_overall}</h3>
+                    <p>${metrics_df.loc[best_overall, 'Total_PnL']:,.2f}</p>
+                </div>
+                """, unsafe_allow_html=True)
+        
+            with col2:
+                st.markdown(f"""
+                <div class="success-box">
+                    <h4>📈 Best Risk-Adjusted</h4>
+                    <h3>{best_sharpe}</h3>
+                    <p>Sharpe: {metrics_df.loc[best_sharpe, 'Sharpe_Ratio']:.3f}</p>
+                </div>
+                """, unsafe_allow_html=True)
+        
+            with col3:
+                st.markdown(f"""
+                <div class="success-box">
+                    <h4>🎯 Best Win Rate</h4>
+                    <h3>{best_winrate}</h3>
+                    <p>{metrics_df.loc[best_winrate, 'Win_Rate']*100:.1f}%</p>
+                </div>
+                """, unsafe_allow_html=True)
 
 
 # =============================================================================
@@ -84,6 +84,8 @@ from plotly.subplots import make_subplots
 import scipy.stats as stats
 from datetime import datetime, timedelta
 import warnings
+
+from trade_features import sentiment_score, trading_session
 warnings.filterwarnings('ignore')
 
 # =============================================================================
@@ -281,28 +283,13 @@ def load_data():
         merged_df['Fee_Ratio'] = (merged_df['Fee USD'] / merged_df['Size USD']).round(4)
         
         # Sentiment score (numerical version of classification)
-        sentiment_mapping = {
-            'Extreme Fear': 1,
-            'Fear': 2,
-            'Neutral': 3,
-            'Greed': 4,
-            'Extreme Greed': 5
-        }
-        merged_df['sentiment_score'] = merged_df['sentiment_category'].map(sentiment_mapping)
+        merged_df['sentiment_score'] = sentiment_score(merged_df['sentiment_category'])
         
         # Trading session (based on hour of day in IST)
         merged_df['Hour'] = merged_df['Timestamp IST'].dt.hour
-        def get_session(hour):
-            if 0 <= hour < 6:
-                return 'Night'
-            elif 6 <= hour < 12:
-                return 'Morning'
-            elif 12 <= hour < 18:
-                return 'Afternoon'
-            else:
-                return 'Evening'
-        
-        merged_df['Trading_Session'] = merged_df['Hour'].apply(get_session)
+        merged_df['Trading_Session'] = trading_session(merged_df['Hour'], sessions=[
+            (0, 'Night'), (6, 'Morning'), (12, 'Afternoon'), (18, 'Evening')
+        ])
         
         # Win/Loss magnitude
         merged_df['Win_Loss_Magnitude'] = merged_df['Net_PnL'].abs()
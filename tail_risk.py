@@ -0,0 +1,153 @@
+"""
+Tail risk: Value at Risk and Conditional Value at Risk (expected shortfall).
+
+VaR at level 95% is the loss exceeded by only the worst 5% of outcomes, and
+CVaR the average loss across those worst 5%. Both are reported as positive
+losses. Historical figures come straight from the observed PnL per group;
+np.partition places the tail order statistics in linear time, so no group
+is fully sorted.
+
+The Monte Carlo mode simulates multi-day portfolio PnL per sentiment
+regime: each path adds up `horizon` days drawn with replacement from the
+days of that regime. Paths are drawn in batches as (paths x days) index
+matrices and split into seeded tasks, which run on a thread pool for
+large simulations with the same result as running them one by one. Every task
+reads the same regime-ordered days in place and names its regime's slice.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from task_pool import task_pool
+
+VAR_LEVELS = [0.95, 0.99]
+
+# Simulated paths per task; tasks are the unit of seeding and of parallel work
+PATHS_PER_TASK = 2_000
+
+# Index matrix elements per batch (paths x days), about 32 MB of int64
+BATCH_ELEMENTS = 1 << 22
+
+# Simulated path-days (paths x horizon, all regimes) from which a thread pool pays off
+PARALLEL_DRAWS = 50_000_000
+
+
+def var_columns(levels=VAR_LEVELS):
+    """Output column names, e.g. VaR_95 and CVaR_95 per level"""
+    return [f'{measure}_{level * 100:g}' for level in levels for measure in ('VaR', 'CVaR')]
+
+
+def value_at_risk(values, levels=VAR_LEVELS):
+    """
+    Historical (VaR, CVaR) per level of one array of PnL, as positive
+    losses. The tail at level a holds the ceil((1 - a) * n) worst values;
+    VaR is the best of them and CVaR their mean.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return [(np.nan, np.nan) for _ in levels]
+    tails = [max(int(np.ceil((1 - level) * len(values) - 1e-9)), 1) for level in levels]
+    # One partition places every tail boundary, with the smaller values before it
+    values = np.partition(values, sorted({tail - 1 for tail in tails}))
+    return [(-values[tail - 1], -values[:tail].mean()) for tail in tails]
+
+
+def _var_row(values, levels):
+    row = {}
+    for level, (var, cvar) in zip(levels, value_at_risk(values, levels)):
+        row[f'VaR_{level * 100:g}'], row[f'CVaR_{level * 100:g}'] = var, cvar
+    return row
+
+
+def tail_risk(df, by, value='Net_PnL', levels=VAR_LEVELS):
+    """
+    Historical VaR and CVaR of `value` per group of `by`, one row per
+    group with a trade count and the var_columns() columns
+    """
+    values = df[value].to_numpy(dtype=np.float64)
+    groups = pd.Categorical(df[by])
+    order = np.argsort(groups.codes, kind='stable')
+    bounds = np.searchsorted(groups.codes[order], np.arange(len(groups.categories) + 1))
+
+    rows, present = [], []
+    for code in range(len(groups.categories)):
+        group_values = values[order[bounds[code]:bounds[code + 1]]]
+        if len(group_values) == 0:
+            continue
+        present.append(code)
+        rows.append({'Trades': len(group_values), **_var_row(group_values, levels)})
+
+    index = pd.Index(groups.categories[present], name=by)
+    if isinstance(df[by].dtype, pd.CategoricalDtype):
+        index = pd.CategoricalIndex(index, dtype=df[by].dtype, name=by)
+    return pd.DataFrame(rows, index=index, columns=['Trades'] + var_columns(levels))
+
+
+# =============================================================================
+# MONTE CARLO
+# =============================================================================
+
+def _simulate_paths(daily_pnl, horizon, n_paths, seed):
+    """Total PnL of `n_paths` paths of `horizon` days drawn from `daily_pnl`"""
+    rng = np.random.Generator(np.random.SFC64(seed))
+    totals = np.empty(n_paths)
+    batch = max(1, BATCH_ELEMENTS // horizon)
+    for start in range(0, n_paths, batch):
+        stop = min(start + batch, n_paths)
+        days = rng.integers(0, len(daily_pnl), size=(stop - start, horizon))
+        totals[start:stop] = daily_pnl[days].sum(axis=1)
+    return totals
+
+
+def monte_carlo_var(daily_pnl, regimes, horizon=1, n_paths=10_000, levels=VAR_LEVELS,
+                    seed=42, workers=None):
+    """
+    Monte Carlo VaR and CVaR of `horizon`-day portfolio PnL per regime.
+    `daily_pnl` and `regimes` are aligned per day; each regime's paths draw
+    only from that regime's days. One row per regime with its number of
+    historical days and the var_columns() columns. `workers` caps the
+    thread pool (default: CPU count), used only for large simulations.
+    """
+    daily_pnl = np.asarray(daily_pnl, dtype=np.float64)
+    groups = pd.Categorical(regimes)
+    valid = ~np.isnan(daily_pnl) & (groups.codes >= 0)
+    codes = groups.codes[valid]
+    daily_pnl = daily_pnl[valid]
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(groups.categories) + 1))
+    present = [code for code in range(len(groups.categories)) if bounds[code + 1] > bounds[code]]
+    # Days laid out regime by regime
+    daily_pnl = daily_pnl[order]
+
+    # One task per PATHS_PER_TASK paths of a regime, each with its own seed
+    n_tasks = -(-n_paths // PATHS_PER_TASK)
+    regime_seeds = np.random.SeedSequence(seed).spawn(len(present))
+    tasks = []
+    for code, regime_seed in zip(present, regime_seeds):
+        for task, task_seed in enumerate(regime_seed.spawn(n_tasks)):
+            size = min(PATHS_PER_TASK, n_paths - task * PATHS_PER_TASK)
+            tasks.append((bounds[code], bounds[code + 1], horizon, size, task_seed))
+
+    def run_task(task):
+        start, stop, horizon, size, task_seed = task
+        return _simulate_paths(daily_pnl[start:stop], horizon, size, task_seed)
+
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+    if workers > 1 and n_paths * horizon * len(present) >= PARALLEL_DRAWS:
+        with task_pool(workers) as pool:
+            results = list(pool.map(run_task, tasks))
+    else:
+        results = [run_task(task) for task in tasks]
+
+    rows = []
+    for position, code in enumerate(present):
+        totals = np.concatenate(results[position * n_tasks:(position + 1) * n_tasks])
+        rows.append({'Days': int(bounds[code + 1] - bounds[code]), **_var_row(totals, levels)})
+
+    index = pd.Index(groups.categories[present], name=getattr(regimes, 'name', None))
+    if isinstance(getattr(regimes, 'dtype', None), pd.CategoricalDtype):
+        index = pd.CategoricalIndex(index, dtype=regimes.dtype, name=regimes.name)
+    return pd.DataFrame(rows, index=index, columns=['Days'] + var_columns(levels))
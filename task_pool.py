@@ -0,0 +1,18 @@
+"""
+Worker pool for seeded Monte Carlo tasks.
+
+The resampling modules split their work into tasks with their own seeds,
+so a task gives the same result on any worker. The tasks' NumPy kernels
+(random draws, gathers, reductions) release the GIL, so a thread pool runs
+them in parallel while every thread reads the same arrays in place:
+nothing is pickled per task, and no process is forked or spawned from the
+Streamlit server. Spawned workers would not help either, since Streamlit
+installs the app script as __main__ and every new process would re-run it.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+def task_pool(workers):
+    """Executor running tasks on `workers` threads that share this process's arrays"""
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='task-pool')
@@ -0,0 +1,82 @@
+"""
+Vectorized feature engineering shared by all dashboard variants.
+
+Every feature is computed column-at-a-time with NumPy/pandas operations:
+sentiment labels go through categorical codes, trading sessions through a
+24-entry hour lookup table, and the PnL ratios through plain array
+arithmetic. No Python function is called per row.
+"""
+
+import numpy as np
+import pandas as pd
+
+SENTIMENT_ORDER = ['Extreme Fear', 'Fear', 'Neutral', 'Greed', 'Extreme Greed']
+
+# Score of each sentiment, 1 (Extreme Fear) to 5 (Extreme Greed)
+SENTIMENT_SCORES = dict(zip(SENTIMENT_ORDER, range(1, len(SENTIMENT_ORDER) + 1)))
+
+# Trading sessions as (start hour, label) pairs in IST, each running until
+# the next start; these are the sessions used by streamlit_app_final.py
+TRADING_SESSIONS = [(0, 'Asian'), (8, 'European'), (16, 'American')]
+
+
+def sentiment_category(classification, default='Neutral'):
+    """
+    Map Fear & Greed classifications to the five sentiment categories.
+    Unknown or missing classifications become `default`.
+    """
+    categories = pd.Categorical(classification, categories=SENTIMENT_ORDER)
+    codes = np.where(categories.codes < 0, SENTIMENT_ORDER.index(default), categories.codes)
+    return pd.Categorical.from_codes(codes, categories=SENTIMENT_ORDER)
+
+
+def sentiment_score(category):
+    """Return the 1-5 sentiment score for each sentiment category"""
+    codes = pd.Categorical(category, categories=SENTIMENT_ORDER).codes
+    scores = codes.astype(np.int64) + 1
+    if (codes < 0).any():
+        scores = np.where(codes < 0, np.nan, scores)
+    return scores
+
+
+def trading_session(hour, sessions=TRADING_SESSIONS):
+    """Return the trading session of each hour of day as a categorical"""
+    starts = [start for start, _ in sessions]
+    labels = [label for _, label in sessions]
+    # Lookup table: session code for every hour 0-23, plus -1 for invalid hours
+    table = np.append(np.searchsorted(starts, np.arange(24), side='right') - 1, -1)
+
+    hour = np.asarray(hour, dtype=np.float64)
+    index = np.where((hour >= 0) & (hour < 24), hour, 24).astype(np.int64)
+    return pd.Categorical.from_codes(table[index], categories=labels)
+
+
+def add_time_features(df, timestamp_column='Timestamp IST'):
+    """Add Hour, DayOfWeek, Month and Week columns from a timestamp column"""
+    timestamps = df[timestamp_column].dt
+    df['Hour'] = timestamps.hour
+    df['DayOfWeek'] = timestamps.dayofweek
+    df['Month'] = timestamps.month
+    df['Week'] = timestamps.isocalendar().week
+    return df
+
+
+def add_trade_features(df, default_sentiment='Neutral'):
+    """
+    Add the PnL, time, sentiment and session features to merged trades.
+    Expects the 'Closed PnL', 'Fee', 'Size USD', 'Timestamp IST' and
+    'classification' columns.
+    """
+    df['Net_PnL'] = df['Closed PnL'] - df['Fee']
+    df['is_profitable'] = df['Net_PnL'] > 0
+    add_time_features(df)
+
+    df['sentiment_category'] = sentiment_category(df['classification'], default_sentiment)
+
+    # Advanced features
+    df['PnL_Percentage'] = (df['Net_PnL'] / df['Size USD']) * 100
+    df['Fee_Ratio'] = (df['Fee'] / df['Size USD']) * 100
+    df['sentiment_score'] = sentiment_score(df['sentiment_category'])
+    df['Trading_Session'] = trading_session(df['Hour'])
+    df['Win_Loss_Magnitude'] = df['Net_PnL'].abs()
+    return df
@@ -0,0 +1,102 @@
+"""
+Declared dtypes for the merged trade dataset.
+
+Low-cardinality string columns are stored as pandas categoricals with a
+fixed category order where one exists (sentiment, side, session), calendar
+fields as sized integers, and the derived ratios optionally as float32.
+The dataset is held once per Streamlit server process, so these dtypes
+decide most of its resident memory.
+"""
+
+import numpy as np
+import pandas as pd
+
+from sentiment_join import CLASSIFICATIONS
+from trade_features import SENTIMENT_ORDER, TRADING_SESSIONS
+
+# Columns whose categories are known up front, in display order
+FIXED_CATEGORIES = {
+    'sentiment_category': SENTIMENT_ORDER,
+    'classification': CLASSIFICATIONS,
+    'Side': ['BUY', 'SELL'],
+    'Trading_Session': [label for _, label in TRADING_SESSIONS],
+}
+
+# Columns whose categories are discovered from the data
+OPEN_CATEGORIES = ['Account', 'Coin', 'Direction']
+
+INTEGER_COLUMNS = {
+    'Hour': np.int8,
+    'DayOfWeek': np.int8,
+    'Month': np.int8,
+    'Week': np.int8,
+    'sentiment_score': np.int8,
+}
+
+# Derived ratios that tolerate float32 precision
+RATIO_COLUMNS = ['PnL_Percentage', 'Fee_Ratio']
+
+
+def apply_schema(df, float32_ratios=False):
+    """Convert the columns of a merged trade frame to their declared dtypes"""
+    for column, categories in FIXED_CATEGORIES.items():
+        if column in df.columns:
+            # Labels outside the fixed list (e.g. new index classifications) are kept
+            extra = [c for c in pd.unique(df[column].dropna()) if c not in categories]
+            df[column] = pd.Categorical(df[column], categories=list(categories) + sorted(extra))
+
+    for column in OPEN_CATEGORIES:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+
+    for column, dtype in INTEGER_COLUMNS.items():
+        if column in df.columns and not df[column].isna().any():
+            df[column] = df[column].astype(dtype)
+
+    if float32_ratios:
+        for column in RATIO_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].astype(np.float32)
+    return df
+
+
+def concat_trades(frames):
+    """
+    Concatenate merged trade frames, unioning the categories of categorical
+    columns so no label is lost (pd.concat falls back to object otherwise).
+    """
+    frames = [frame for frame in frames if len(frame) > 0] or frames[:1]
+    if len(frames) == 1:
+        return frames[0]
+
+    frames = [frame.copy(deep=False) for frame in frames]
+    for column in frames[0].columns:
+        if not isinstance(frames[0][column].dtype, pd.CategoricalDtype):
+            continue
+        categories = list(frames[0][column].cat.categories)
+        seen = set(categories)
+        for frame in frames[1:]:
+            new = [c for c in frame[column].astype('category').cat.categories if c not in seen]
+            categories.extend(new)
+            seen.update(new)
+        for frame in frames:
+            frame[column] = pd.Categorical(frame[column], categories=categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+def memory_report(before_df, after_df):
+    """Per-column resident memory of two versions of the same frame, in MB"""
+    before = before_df.memory_usage(deep=True, index=False) / 1024**2
+    after = after_df.memory_usage(deep=True, index=False) / 1024**2
+    report = pd.DataFrame({
+        'Before_dtype': before_df.dtypes.astype(str),
+        'After_dtype': after_df.dtypes.reindex(before_df.columns).astype(str),
+        'Before_MB': before,
+        'After_MB': after.reindex(before.index),
+    })
+    report['Saved_MB'] = report['Before_MB'] - report['After_MB']
+    report = report.sort_values('Saved_MB', ascending=False)
+    report.loc['TOTAL', ['Before_MB', 'After_MB', 'Saved_MB']] = report[
+        ['Before_MB', 'After_MB', 'Saved_MB']
+    ].sum()
+    return report